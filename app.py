@@ -20,8 +20,9 @@ from vision.depth_estimator import DepthEstimator
 from vision.scene_analyzer import SceneAnalyzer
 from audio.voice_engine import VoiceEngine
 from core.dristi_system import DristiSystem
+from core.frame_source import CameraSource, open_source
 
-def main(headless=False):
+def main(headless=False, source=None):
     print("=" * 70)
     print("🚀 DRISTI - Vision-Based Voice Assistant")
     print("   For Visually Impaired Users")
@@ -61,19 +62,10 @@ def main(headless=False):
     
     voice.speak("All systems ready. I am Dristi, your vision assistant.", async_mode=True)
     
-    # Open camera (auto-detect available camera)
-    cap = None
-    for camera_index in range(5):
-        test_cap = cv2.VideoCapture(camera_index)
-        if test_cap.isOpened():
-            ret, frame = test_cap.read()
-            if ret:
-                print(f"✅ Using camera {camera_index}")
-                cap = test_cap
-                break
-            test_cap.release()
+    # Open frame source (auto-detects a camera by default)
+    cap = open_source(source)
     
-    if cap is None:
+    if cap is None or not cap.isOpened():
         print("❌ Camera not accessible!")
         voice.speak("Error. Camera not accessible. Please check connection.")
         sys.exit(1)
@@ -81,16 +73,21 @@ def main(headless=False):
     voice.speak("Camera active. I am ready to assist you.")
     
     # Get camera properties
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    print(f"✅ Camera ready! Resolution: {width}x{height}")
+    if isinstance(cap, CameraSource):
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        print(f"✅ Using camera {cap.index}")
+        print(f"✅ Camera ready! Resolution: {width}x{height}")
+    else:
+        print(f"✅ Frame source ready: {type(cap).__name__}")
     
     # Initialize Dristi System
     system = DristiSystem(
         object_detector=detector,
         depth_estimator=depth,
         scene_analyzer=analyzer,
-        voice_engine=voice
+        voice_engine=voice,
+        render=not headless
     )
     
     # Print controls
@@ -115,7 +112,8 @@ def main(headless=False):
     
     try:
         while True:
-            ret, frame = cap.read()
+            with system.metrics.measure('capture'):
+                ret, frame = cap.read()
             if not ret:
                 print("❌ Failed to grab frame")
                 break
@@ -126,13 +124,15 @@ def main(headless=False):
             annotated_frame, detected_objects, current_scene = system.process_frame(frame)
             
             # Add visual overlay
-            annotated_frame = system.add_overlay(annotated_frame)
+            if not headless:
+                annotated_frame = system.add_overlay(annotated_frame)
             
             # Display depth map if toggled (and available)
             if not headless:
                 try:
                     if show_depth and depth and depth.get_colored_depth() is not None:
                         depth_colored = depth.get_colored_depth()
+                        depth_colored = cv2.resize(depth_colored, (annotated_frame.shape[1], annotated_frame.shape[0]))
                         blended = cv2.addWeighted(annotated_frame, 0.5, depth_colored, 0.5, 0)
                         cv2.imshow('Dristi - Voice Assistant (Depth View)', blended)
                     else:
@@ -190,4 +190,8 @@ if __name__ == '__main__':
     headless = '--display' not in sys.argv
     if '--headless' in sys.argv:
         headless = True
-    main(headless=headless)
+    # --source SPEC: camera index, video file, image folder or 'synthetic'
+    source = None
+    if '--source' in sys.argv:
+        source = sys.argv[sys.argv.index('--source') + 1]
+    main(headless=headless, source=source)
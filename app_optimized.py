@@ -6,7 +6,7 @@ Complete application with performance improvements
 import os
 import sys
 import time
-import threading
+from multiprocessing import AuthenticationError
 
 # Disable OpenCV GUI if no display available
 if not os.getenv('DISPLAY') and not os.getenv('WAYLAND_DISPLAY'):
@@ -22,13 +22,35 @@ from vision.depth_estimator import DepthEstimator
 from vision.scene_analyzer import SceneAnalyzer
 from audio.voice_engine import VoiceEngine
 from core.dristi_system import DristiSystem
+from core.frame_source import CameraSource, open_source
+from core.hazard_watch import HazardWatcher
+from core.config import load_config
+from core.metrics import LatencyMonitor
+from core.model_server import connect_models, settings_from_config
+from core.motion import MotionGate
+from core.multi_stream import MultiStreamSystem
+from core.scheduler import AdaptiveScheduler
+from vision.tiling import TilePass
+from vision.tracker import ObjectTracker
+from vision.quantization import load_calibration_frames
 
 class OptimizedDristiApp:
     """Optimized Dristi application with performance improvements"""
     
     def __init__(self, enable_depth=False, enable_scene=True, 
-                 target_fps=15, frame_width=640, headless=False):
-        """Initialize with optimization parameters"""
+                 target_fps=15, frame_width=640, headless=False, pipelined=False,
+                 metrics_path=None, profile=None, source=None, pacing=None, streams=None,
+                 model_server=False):
+        """
+        Initialize with optimization parameters
+        
+        source: frame source spec (None = first camera, 'camera:N', video file,
+                image folder or 'synthetic'); pacing: 'realtime' or 'max'
+        streams: several source specs served by one set of models (multi-stream mode,
+                 replaces source)
+        model_server: use the models of a running serve_models.py (see config.yaml model_server)
+        """
+        self.config = load_config(profile=profile)
         self.target_fps = target_fps
         self.frame_width = frame_width
         self.enable_depth = enable_depth
@@ -46,12 +68,111 @@ class OptimizedDristiApp:
         self.voice.speak("Initializing Dristi. Please wait.", async_mode=True)
         
         # Initialize Vision Modules
-        print("\n📦 Loading AI models...")
+        if model_server:
+            print("\n📦 Connecting to the model server...")
+            model_server = self._connect_model_server()
+        if not model_server:
+            print("\n📦 Loading AI models...")
+            self._load_models()
+        
+        self.voice.speak("Systems ready. Camera starting.", async_mode=True)
         
+        # Open frame source(s) (auto-detects a camera by default)
+        specs = streams or [source]
         try:
-            # Smaller input size = faster detection, GPU accelerated
-            self.detector = ObjectDetector(model_path='yolov8n.pt', confidence=0.5, input_size=320, device='cuda')
-            print("✅ YOLO Object Detector loaded (GPU optimized)")
+            self.sources = [open_source(spec, pacing=pacing, width=frame_width, fps=target_fps) for spec in specs]
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        
+        if any(cap is None or not cap.isOpened() for cap in self.sources):
+            print("❌ Camera not accessible!")
+            self.voice.speak("Error. Camera not accessible.")
+            sys.exit(1)
+        self.cap = self.sources[0]
+        
+        # Max-throughput replay: do not throttle the main loop to target_fps
+        self.throttle = pacing != 'max'
+        self.last_frame = None
+        
+        if isinstance(self.cap, CameraSource):
+            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            print(f"✅ Using camera {self.cap.index}")
+            print(f"✅ Camera ready! Resolution: {width}x{height}")
+        else:
+            print(f"✅ Frame source ready: {type(self.cap).__name__} ({self.cap.pacing} pacing)")
+        
+        # Initialize Dristi System (an ObjectTracker without tracks is falsy, so test for None)
+        tracker = ObjectTracker.from_config(self.config)
+        self.system = DristiSystem(
+            object_detector=self.detector,
+            depth_estimator=self.depth,
+            scene_analyzer=self.analyzer,
+            voice_engine=self.voice,
+            render=not headless,
+            metrics=LatencyMonitor(dump_path=metrics_path),
+            # Module frequencies adapt to measured latency within the target_fps budget
+            scheduler=AdaptiveScheduler.from_config(self.config, target_fps=target_fps),
+            # Tracking bridges the frames where detection is skipped (False = disabled)
+            tracker=False if tracker is None else tracker,
+            # Static scenes skip model runs (False = disabled)
+            motion_gate=MotionGate.from_config(self.config) or False,
+            # New or approaching hazards are spoken immediately (False = disabled)
+            hazard_watcher=HazardWatcher.from_config(self.config) or False,
+            # Small objects: full-resolution tile pass when there is spare budget
+            tile_pass=TilePass.from_config(self.config)
+        )
+        self.metrics = self.system.metrics
+        
+        # Multi-stream mode: each source keeps its own objects, scene and timers,
+        # detection is batched across the streams
+        self.multi_stream = None
+        self.stream_systems = {}
+        if streams:
+            self.multi_stream = MultiStreamSystem(self.system)
+            for index, (spec, cap) in enumerate(zip(streams, self.sources)):
+                name = f"{index}:{spec}"
+                self.stream_systems[name] = self.multi_stream.add_stream(name, cap, width=frame_width)
+            print(f"✅ Multi-stream mode: {len(streams)} streams sharing one set of models")
+            if pipelined:
+                print("⚠️  --pipeline is not supported with --streams, ignored")
+                pipelined = False
+        
+        # Pipeline mode: each model runs on its own worker, display never waits on them
+        if pipelined:
+            self.system.start_pipeline()
+            print("✅ Pipelined processing enabled")
+        
+        self.show_depth = False
+        self.running = True
+    
+    def _load_models(self):
+        """Load the detector, and depth and scene models if enabled, in this process"""
+        modules_config = self.config.get('modules') or {}
+        detection_config = modules_config.get('object_detection') or {}
+        depth_config = modules_config.get('depth_estimation') or {}
+        calibration_frames = self._load_calibration_frames(detection_config, depth_config)
+        
+        try:
+            # Smaller input size = faster detection, GPU accelerated (or ONNX Runtime on CPU)
+            precision = detection_config.get('precision', 'fp32')
+            backend = 'onnx' if precision == 'int8' else detection_config.get('backend', 'torch')
+            self.detector = ObjectDetector(
+                model_path=detection_config.get('model', 'yolov8n.pt'),
+                confidence=detection_config.get('confidence', 0.5),
+                input_size=detection_config.get('input_size', 320),
+                device='cuda',
+                backend=backend,
+                num_threads=detection_config.get('num_threads') or None,
+                precision=precision,
+                calibration_frames=calibration_frames,
+                candidate_confidence=self._candidate_confidence()
+            )
+            runtime = 'ONNX Runtime' if backend == 'onnx' else 'GPU optimized'
+            if precision == 'int8':
+                runtime += ', INT8'
+            print(f"✅ YOLO Object Detector loaded ({runtime})")
         except Exception as e:
             print(f"❌ Failed to load YOLO: {e}")
             self.voice.speak("Error loading object detection model.")
@@ -61,8 +182,15 @@ class OptimizedDristiApp:
         self.depth = None
         if self.enable_depth:
             try:
-                self.depth = DepthEstimator(device='cuda')
-                print("✅ MiDaS Depth Estimator loaded (optimized)")
+                self.depth = DepthEstimator(
+                    device='cuda',
+                    backend=depth_config.get('backend', 'torch'),
+                    precision=depth_config.get('precision', 'fp32'),
+                    calibration_frames=calibration_frames,
+                    num_threads=depth_config.get('num_threads') or None
+                )
+                suffix = ', INT8' if self.depth.precision == 'int8' else ''
+                print(f"✅ MiDaS Depth Estimator loaded (optimized{suffix})")
             except Exception as e:
                 print(f"⚠️  Depth estimation not available: {e}")
         
@@ -70,54 +198,61 @@ class OptimizedDristiApp:
         self.analyzer = None
         if self.enable_scene:
             try:
-                self.analyzer = SceneAnalyzer(device='cuda', model_name='ViT-B/32')
+                scene_config = modules_config.get('scene_analysis') or {}
+                self.analyzer = SceneAnalyzer(
+                    device='cuda', model_name='ViT-B/32',
+                    thumbnail_threshold=scene_config.get('thumbnail_threshold', 0.04),
+                    embedding_similarity=scene_config.get('embedding_similarity', 0.92),
+                    max_scene_age=scene_config.get('max_scene_age', 60.0),
+                    prompt_banks=scene_config.get('prompt_banks')
+                )
                 print("✅ CLIP Scene Analyzer loaded (GPU)")
             except Exception as e:
                 print(f"⚠️  Scene analysis not available: {e}")
-        
-        self.voice.speak("Systems ready. Camera starting.", async_mode=True)
-        
-        # Open camera (auto-detect available camera)
-        self.cap = None
-        for camera_index in range(5):
-            test_cap = cv2.VideoCapture(camera_index)
-            if test_cap.isOpened():
-                ret, frame = test_cap.read()
-                if ret:
-                    print(f"✅ Using camera {camera_index}")
-                    self.cap = test_cap
-                    break
-                test_cap.release()
-        
-        if self.cap is None:
-            print("❌ Camera not accessible!")
-            self.voice.speak("Error. Camera not accessible.")
-            sys.exit(1)
-        
-        # Set camera resolution
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, frame_width)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(frame_width * 9 / 16))
-        self.cap.set(cv2.CAP_PROP_FPS, target_fps)
-        
-        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        print(f"✅ Camera ready! Resolution: {width}x{height}")
-        
-        # Initialize Dristi System
-        self.system = DristiSystem(
-            object_detector=self.detector,
-            depth_estimator=self.depth,
-            scene_analyzer=self.analyzer,
-            voice_engine=self.voice
-        )
-        
-        # Optimize processing intervals (GPU accelerated, can afford faster)
-        self.system.detection_interval = 1  # Every frame (GPU is fast)
-        self.system.scene_analysis_interval = 30  # Every 30 frames (GPU accelerated)
-        self.system.depth_estimation_interval = 2  # Every 2 frames (GPU accelerated)
-        
-        self.show_depth = False
-        self.running = True
+    
+    def _connect_model_server(self):
+        """
+        Use the models of a running model server (serve_models.py) instead of loading them
+        Returns: False if the server cannot be used (the caller loads the models itself)
+        """
+        address = (self.config.get('model_server') or {}).get('address') or 'the default socket'
+        try:
+            address, authkey = settings_from_config(self.config)
+            self.detector, depth, analyzer = connect_models(address, authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            print(f"⚠️  Model server not usable at {address}: {e} - loading the models here instead")
+            return False
+        if self.detector is None:
+            print("⚠️  The model server does not host an object detector - loading the models here instead")
+            return False
+        self.depth = depth if self.enable_depth else None
+        self.analyzer = analyzer if self.enable_scene else None
+        hosted = ['YOLO'] + ['MiDaS'] * (self.depth is not None) + ['CLIP'] * (self.analyzer is not None)
+        print(f"✅ Using {', '.join(hosted)} from the model server at {address}")
+        return True
+    
+    def _load_calibration_frames(self, detection_config, depth_config):
+        """Frames for static INT8 calibration (None = dynamic quantization or fp32)"""
+        if 'int8' not in (detection_config.get('precision'), depth_config.get('precision')):
+            return None
+        quantization_config = self.config.get('quantization') or {}
+        calibration_source = quantization_config.get('calibration_source')
+        if not calibration_source:
+            return None
+        try:
+            return load_calibration_frames(
+                calibration_source, count=quantization_config.get('calibration_frames', 32)
+            )
+        except Exception as e:
+            print(f"⚠️  Calibration source not available, using dynamic INT8: {e}")
+            return None
+    
+    def _candidate_confidence(self):
+        """Lower threshold for boxes that earn a tile in the tile pass (None = no candidate tiles)"""
+        tiling_config = self.config.get('tiling') or {}
+        if not tiling_config.get('enabled', False) or not tiling_config.get('use_candidates', True):
+            return None
+        return tiling_config.get('candidate_confidence', 0.25)
     
     def print_controls(self):
         """Print control information"""
@@ -141,9 +276,11 @@ class OptimizedDristiApp:
     
     def run(self):
         """Main loop"""
+        if self.multi_stream is not None:
+            return self.run_streams()
         self.print_controls()
         
-        frame_time = 1.0 / self.target_fps
+        frame_time = 1.0 / self.target_fps if self.throttle else 0.0
         last_frame_time = time.time()
         
         try:
@@ -159,23 +296,27 @@ class OptimizedDristiApp:
                 last_frame_time = current_time
                 
                 # Read frame
-                ret, frame = self.cap.read()
+                with self.metrics.measure('capture'):
+                    ret, frame = self.cap.read()
+                capture_time = time.perf_counter()
                 if not ret:
-                    print("❌ Failed to grab frame")
+                    print("❌ Failed to grab frame (or end of source)")
                     break
+                self.last_frame = frame
                 
                 # Resize frame for faster processing
                 h, w = frame.shape[:2]
                 if w != self.frame_width:
-                    scale = self.frame_width / w
-                    frame = cv2.resize(frame, (self.frame_width, int(h * scale)))
+                    with self.metrics.measure('resize'):
+                        scale = self.frame_width / w
+                        frame = cv2.resize(frame, (self.frame_width, int(h * scale)))
                 
                 # Process frame
-                annotated_frame, _, _ = self.system.process_frame(frame)
-                annotated_frame = self.system.add_overlay(annotated_frame)
+                annotated_frame, _, _ = self.system.process_frame(frame, capture_time)
                 
-                # Display (skip if headless)
+                # Display (skip if headless - nothing is drawn or copied then)
                 if not self.headless:
+                    annotated_frame = self.system.add_overlay(annotated_frame)
                     try:
                         if self.show_depth and self.depth and self.depth.get_colored_depth() is not None:
                             depth_colored = self.depth.get_colored_depth()
@@ -205,6 +346,44 @@ class OptimizedDristiApp:
         finally:
             self.cleanup()
     
+    def run_streams(self):
+        """Main loop of multi-stream mode: one window per stream, commands go to the first"""
+        self.print_controls()
+        self.system = next(iter(self.stream_systems.values()))
+        last_report = time.time()
+        
+        try:
+            while self.running and not self.multi_stream.finished:
+                for name, frame, annotated_frame, _, _ in self.multi_stream.step():
+                    self.last_frame = frame
+                    if not self.headless:
+                        try:
+                            annotated_frame = self.stream_systems[name].add_overlay(annotated_frame)
+                            cv2.imshow(f'Dristi - {name}', annotated_frame)
+                        except:
+                            pass  # Skip display if not available
+                
+                try:
+                    key = cv2.waitKey(1) & 0xFF if not self.headless else -1
+                except:
+                    key = -1
+                current_time = time.time()
+                self.handle_key(key, current_time)
+                
+                if current_time - last_report >= 5.0:
+                    last_report = current_time
+                    for name, stats in self.multi_stream.stats().items():
+                        print(f"📊 {name}: {stats['processed']} frames, {stats['fps']:.1f} FPS, "
+                              f"{stats['batched']} batched, {stats['dropped']} dropped")
+            if self.multi_stream.finished:
+                print("✅ All streams finished")
+        
+        except KeyboardInterrupt:
+            print("\n⚠️  Interrupted by user")
+        
+        finally:
+            self.cleanup()
+    
     def handle_key(self, key, current_time):
         """Handle keyboard input"""
         if key == ord('q'):
@@ -216,19 +395,20 @@ class OptimizedDristiApp:
             self.voice.speak(f"Depth view {status}")
         elif key == ord('s'):
             filename = f"dristi_opt_{self.system.frame_count}.jpg"
-            self.cap.release()
-            cap_temp = cv2.VideoCapture(0)
-            ret, frame = cap_temp.read()
-            if ret:
-                cv2.imwrite(filename, frame)
+            if self.last_frame is not None:
+                cv2.imwrite(filename, self.last_frame)
                 self.voice.speak("Screenshot saved.")
-            self.cap = cap_temp
         else:
             self.system.handle_command(key, current_time)
     
     def cleanup(self):
         """Cleanup resources"""
-        self.cap.release()
+        self.system.stop_pipeline()
+        if self.multi_stream is not None:
+            self.multi_stream.stop()
+        self.metrics.dump()  # final report (no-op without --metrics-json)
+        for cap in self.sources:
+            cap.release()
         if not self.headless:
             cv2.destroyAllWindows()
         self.voice.speak("Dristi closed. Thank you.", async_mode=True)
@@ -240,13 +420,42 @@ def main():
     headless = '--display' not in sys.argv
     if '--headless' in sys.argv:
         headless = True
+    pipelined = '--pipeline' in sys.argv
+    # --metrics-json PATH: periodically dump per-stage latency percentiles
+    metrics_path = None
+    if '--metrics-json' in sys.argv:
+        metrics_path = sys.argv[sys.argv.index('--metrics-json') + 1]
+    # --source SPEC: camera index, video file, image folder or 'synthetic'
+    source = None
+    if '--source' in sys.argv:
+        source = sys.argv[sys.argv.index('--source') + 1]
+    # --pacing realtime|max: replay at source fps or as fast as possible
+    pacing = None
+    if '--pacing' in sys.argv:
+        pacing = sys.argv[sys.argv.index('--pacing') + 1]
+    # --profile NAME: apply a config.yaml profile (low_power, balanced, high_quality)
+    profile = None
+    if '--profile' in sys.argv:
+        profile = sys.argv[sys.argv.index('--profile') + 1]
+    # --model-server: use the models of a running serve_models.py instead of loading them
+    model_server = '--model-server' in sys.argv
+    # --streams SPEC SPEC ...: several sources served by one set of models
+    streams = None
+    if '--streams' in sys.argv:
+        streams = []
+        for arg in sys.argv[sys.argv.index('--streams') + 1:]:
+            if arg.startswith('--'):
+                break
+            streams.append(arg)
     
     # Skip interactive prompt in headless mode
     if headless:
         print("\n⚙️  OPTIMIZATION SETTINGS")
         print("-" * 70)
         print("Running in headless mode with defaults: 15 FPS, 640px width, Scene analysis ON, Depth OFF")
-        app = OptimizedDristiApp(headless=headless)
+        app = OptimizedDristiApp(headless=headless, pipelined=pipelined, metrics_path=metrics_path,
+                                 profile=profile, source=source, pacing=pacing, streams=streams,
+                                 model_server=model_server)
     else:
         # Configuration options
         print("\n⚙️  OPTIMIZATION SETTINGS")
@@ -267,12 +476,19 @@ def main():
                 width = max(320, min(1280, width))
                 
                 app = OptimizedDristiApp(enable_depth=depth, enable_scene=scene, 
-                                         target_fps=fps, frame_width=width, headless=headless)
+                                         target_fps=fps, frame_width=width, headless=headless,
+                                         pipelined=pipelined, metrics_path=metrics_path,
+                                         profile=profile, source=source, pacing=pacing, streams=streams,
+                                         model_server=model_server)
             except Exception as e:
                 print(f"Invalid input: {e}, using defaults")
-                app = OptimizedDristiApp(headless=headless)
+                app = OptimizedDristiApp(headless=headless, pipelined=pipelined, metrics_path=metrics_path,
+                                         profile=profile, source=source, pacing=pacing, streams=streams,
+                                         model_server=model_server)
         else:
-            app = OptimizedDristiApp(headless=headless)
+            app = OptimizedDristiApp(headless=headless, pipelined=pipelined, metrics_path=metrics_path,
+                                     profile=profile, source=source, pacing=pacing, streams=streams,
+                                     model_server=model_server)
     
     app.run()
 
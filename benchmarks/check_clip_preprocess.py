@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+DRISTI - CLIP preprocessing tolerance check
+
+Compares SceneAnalyzer.preprocess_frame (OpenCV/torch, no PIL) with CLIP's
+reference PIL/torchvision preprocess on the same frames: per-pixel
+difference of the normalized input tensors, cosine similarity of the image
+embeddings and agreement of the top scene label. Also times both paths.
+Exits with status 1 if the fast path is outside the tolerances.
+
+Examples:
+    python benchmarks/check_clip_preprocess.py
+    python benchmarks/check_clip_preprocess.py --clips walk.mp4 frames/ --sizes 640 1280
+"""
+import argparse
+import os
+import sys
+
+import cv2
+import torch
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from harness import time_callable
+from run_benchmarks import load_frames
+from vision.scene_analyzer import SceneAnalyzer
+
+def reference_input(analyzer, frame):
+    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return analyzer.preprocess(image).unsqueeze(0).to(analyzer.device, dtype=analyzer.model.dtype)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', nargs='*', default=['synthetic'], help='video files, image folders or synthetic')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[640, 1280], help='frame widths')
+    parser.add_argument('--frames', type=int, default=30, help='frames per clip and size')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--max-mean-diff', type=float, default=0.05, help='mean |diff| of normalized inputs')
+    parser.add_argument('--min-cosine', type=float, default=0.99, help='minimum image embedding cosine similarity')
+    args = parser.parse_args()
+    
+    analyzer = SceneAnalyzer(device=args.device, model_name='ViT-B/32')
+    failures = []
+    
+    for clip_spec in args.clips:
+        for width in args.sizes:
+            frames = load_frames(clip_spec, width, args.frames)
+            if not frames:
+                print(f"⚠️  No frames from {clip_spec}, skipping")
+                continue
+            
+            max_diff = mean_diff = 0.0
+            cosines, agree = [], 0
+            for frame in frames:
+                reference = reference_input(analyzer, frame)
+                fast = analyzer.preprocess_frame(frame).clone()
+                diff = (fast.float() - reference.float()).abs()
+                max_diff = max(max_diff, diff.max().item())
+                mean_diff += diff.mean().item() / len(frames)
+                
+                with torch.no_grad():
+                    features = analyzer.model.encode_image(torch.cat([reference, fast])).float()
+                features = features / features.norm(dim=-1, keepdim=True)
+                cosines.append((features[0] @ features[1]).item())
+                
+                reference_scene = analyzer.classify(features[0:1].to(analyzer.model.dtype))['scene_type']
+                agree += analyzer.classify(features[1:2].to(analyzer.model.dtype))['scene_type'] == reference_scene
+            
+            reference_time = time_callable(lambda f: reference_input(analyzer, f), frames, warmup=2)
+            fast_time = time_callable(analyzer.preprocess_frame, frames, warmup=2)
+            
+            name = f"{'synthetic' if clip_spec == 'synthetic' else os.path.basename(clip_spec.rstrip('/'))}/{width}"
+            min_cosine = min(cosines)
+            print(f"📦 {name:<24} mean |diff| {mean_diff:.4f}  max |diff| {max_diff:.3f}  "
+                  f"min cosine {min_cosine:.4f}  scene agreement {agree}/{len(frames)}  "
+                  f"preprocess {reference_time['latency_ms']['p50']:.2f} -> {fast_time['latency_ms']['p50']:.2f} ms")
+            
+            if mean_diff > args.max_mean_diff:
+                failures.append(f"{name}: mean |diff| {mean_diff:.4f} > {args.max_mean_diff}")
+            if min_cosine < args.min_cosine:
+                failures.append(f"{name}: embedding cosine {min_cosine:.4f} < {args.min_cosine}")
+    
+    if failures:
+        print("\n❌ Fast CLIP preprocessing outside tolerance:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("\n✅ Fast CLIP preprocessing matches the reference within tolerance")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+DRISTI - INT8 accuracy check
+
+Runs the fp32 and INT8 versions of the object detector and the depth
+estimator on the same frames and reports how far the quantized models
+drift: detection precision/recall against fp32 (IoU >= --match-iou, same
+class), mean IoU and confidence shift of matched boxes, depth distance
+category agreement on the fp32 boxes and depth map correlation.
+
+Exits with status 1 if any metric is below its threshold, so it can gate
+enabling precision: int8 on a device.
+
+Examples:
+    python benchmarks/check_quantization.py --clips walk.mp4
+    python benchmarks/check_quantization.py --clips frames/ --calibration calib.mp4 --output quant.json
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from run_benchmarks import load_frames
+from vision.quantization import load_calibration_frames
+from vision.tracker import box_iou, greedy_match
+
+def match_detections(reference, candidate, min_iou=0.5):
+    """
+    Greedy one-to-one matching of candidate boxes to reference boxes of the same class
+    Returns: list of (reference_index, candidate_index, iou)
+    """
+    if not len(reference) or not len(candidate):
+        return []
+    iou = box_iou(reference.xyxy, candidate.xyxy)
+    iou[reference.class_id[:, None] != candidate.class_id[None, :]] = 0.0
+    
+    rows, cols = greedy_match(iou, min_iou)
+    return [(int(i), int(j), float(iou[i, j])) for i, j in zip(rows, cols)]
+
+def check_detector(frames, fp32, int8, min_iou):
+    reference_total = candidate_total = 0
+    ious, confidence_deltas = [], []
+    reference_boxes = []
+    for frame in frames:
+        reference = fp32.detect(frame, annotate=False)[1]
+        candidate = int8.detect(frame, annotate=False)[1]
+        matches = match_detections(reference, candidate, min_iou)
+        
+        reference_total += len(reference)
+        candidate_total += len(candidate)
+        ious.extend(iou for _, _, iou in matches)
+        confidence_deltas.extend(
+            float(candidate.confidence[j] - reference.confidence[i]) for i, j, _ in matches
+        )
+        reference_boxes.append(reference.xyxy)
+    
+    matched = len(ious)
+    report = {
+        'frames': len(frames),
+        'fp32_detections': reference_total,
+        'int8_detections': candidate_total,
+        'precision': matched / candidate_total if candidate_total else 1.0,
+        'recall': matched / reference_total if reference_total else 1.0,
+        'mean_iou': float(np.mean(ious)) if ious else None,
+        'mean_confidence_delta': float(np.mean(confidence_deltas)) if confidence_deltas else None,
+    }
+    return report, reference_boxes
+
+def check_depth(frames, fp32, int8, boxes_per_frame):
+    from vision.depth_estimator import DepthEstimator
+    
+    agree = total = 0
+    correlations = []
+    for frame, boxes in zip(frames, boxes_per_frame):
+        reference = fp32.estimate(frame, upsample=False, colorize=False)[0]
+        candidate = int8.estimate(frame, upsample=False, colorize=False)[0]
+        correlations.append(float(np.corrcoef(reference.ravel(), candidate.ravel())[0, 1]))
+        
+        if len(boxes):
+            reference_categories = DepthEstimator.estimate_distances(reference, boxes, frame.shape)[2]
+            candidate_categories = DepthEstimator.estimate_distances(candidate, boxes, frame.shape)[2]
+            agree += int(np.sum(reference_categories == candidate_categories))
+            total += len(boxes)
+    
+    return {
+        'frames': len(frames),
+        'boxes': total,
+        'category_agreement': agree / total if total else None,
+        'mean_correlation': float(np.nanmean(correlations)) if correlations else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', nargs='*', default=['synthetic'], help='video files, image folders or synthetic')
+    parser.add_argument('--modules', nargs='+', choices=('detector', 'depth'), default=['detector', 'depth'])
+    parser.add_argument('--frames', type=int, default=100, help='frames per clip')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--input-size', type=int, default=320)
+    parser.add_argument('--calibration', metavar='SOURCE', help='static INT8 calibration source (default: dynamic)')
+    parser.add_argument('--calibration-frames', type=int, default=32)
+    parser.add_argument('--match-iou', type=float, default=0.5)
+    parser.add_argument('--min-precision', type=float, default=0.90)
+    parser.add_argument('--min-recall', type=float, default=0.90)
+    parser.add_argument('--min-category-agreement', type=float, default=0.90)
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args()
+    
+    frames = []
+    for clip in args.clips:
+        frames.extend(load_frames(clip, args.width, args.frames))
+    if not frames:
+        print("❌ No frames to check")
+        sys.exit(1)
+    
+    calibration_frames = None
+    if args.calibration:
+        calibration_frames = load_calibration_frames(args.calibration, count=args.calibration_frames)
+    
+    report = {'frames': len(frames), 'calibration': args.calibration or 'dynamic'}
+    failures = []
+    
+    # The detector always runs: its fp32 boxes are where depth categories are compared
+    from vision.object_detector import ObjectDetector
+    fp32 = ObjectDetector(model_path=args.model, input_size=args.input_size, device='cpu', backend='onnx')
+    int8 = ObjectDetector(model_path=args.model, input_size=args.input_size, device='cpu',
+                          precision='int8', calibration_frames=calibration_frames)
+    detector_report, boxes_per_frame = check_detector(frames, fp32, int8, args.match_iou)
+    if 'detector' in args.modules:
+        report['detector'] = detector_report
+        print(f"📦 Detector: precision {detector_report['precision']:.3f}  "
+              f"recall {detector_report['recall']:.3f}  mean IoU {detector_report['mean_iou'] or 0:.3f}  "
+              f"confidence delta {detector_report['mean_confidence_delta'] or 0:+.3f}")
+        if detector_report['precision'] < args.min_precision:
+            failures.append(f"detector precision {detector_report['precision']:.3f} < {args.min_precision}")
+        if detector_report['recall'] < args.min_recall:
+            failures.append(f"detector recall {detector_report['recall']:.3f} < {args.min_recall}")
+    
+    if 'depth' in args.modules:
+        from vision.depth_estimator import DepthEstimator
+        fp32 = DepthEstimator(device='cpu', backend='onnx')
+        int8 = DepthEstimator(device='cpu', precision='int8', calibration_frames=calibration_frames)
+        depth_report = check_depth(frames, fp32, int8, boxes_per_frame)
+        report['depth'] = depth_report
+        agreement = depth_report['category_agreement']
+        print(f"📦 Depth: category agreement {agreement if agreement is not None else float('nan'):.3f} "
+              f"on {depth_report['boxes']} boxes  correlation {depth_report['mean_correlation']:.3f}")
+        if agreement is not None and agreement < args.min_category_agreement:
+            failures.append(f"depth category agreement {agreement:.3f} < {args.min_category_agreement}")
+    
+    report['failures'] = failures
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+    
+    if failures:
+        print("\n❌ INT8 accuracy below threshold:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("\n✅ INT8 models within thresholds")
+
+if __name__ == '__main__':
+    main()
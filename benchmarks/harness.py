@@ -0,0 +1,123 @@
+"""
+Benchmark harness: timing loop, memory use and baseline comparison
+"""
+import json
+import platform
+import resource
+import sys
+import time
+
+from core.metrics import RollingHistogram
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+def current_rss_mb():
+    """Resident set size of this process now (MB); the peak so far where /proc is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return peak_rss_mb()
+    return pages * resource.getpagesize() / (1024.0 * 1024.0)
+
+def time_callable(fn, frames, warmup=5, repeat=1, batch_size=1, rss_before=None):
+    """
+    Run fn(frame) over frames (after warmup calls) and measure it
+    
+    With batch_size > 1, fn receives lists of up to batch_size frames; fps
+    still counts frames, latency is per call (batch).
+    
+    Cases share one process, so its peak RSS only ever grows and says
+    little about a single case. rss_increase_mb is what the case added to
+    the resident set: measured from rss_before (taken before the case
+    built its runner, so models it loaded count) or from the first call.
+    Returns: dict with frames, fps, latency percentiles (ms), RSS increase
+             and process peak RSS (MB)
+    """
+    rss_before = current_rss_mb() if rss_before is None else rss_before
+    items = frames
+    if batch_size > 1:
+        items = [frames[start:start + batch_size] for start in range(0, len(frames), batch_size)]
+    for item in items[:warmup]:
+        fn(item)
+    
+    histogram = RollingHistogram(size=max(1, len(items) * repeat))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            t0 = time.perf_counter()
+            fn(item)
+            histogram.record(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    
+    stats = histogram.summary()
+    count = len(frames) * repeat
+    return {
+        'frames': count,
+        'fps': count / total if total > 0 else 0.0,
+        'latency_ms': {key: stats[key] * 1000.0 for key in ('mean', 'p50', 'p95', 'p99', 'max')},
+        'rss_increase_mb': current_rss_mb() - rss_before,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def environment_info():
+    """Machine/software description stored alongside results"""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    try:
+        import torch
+        info['torch'] = torch.__version__
+        info['cuda'] = torch.cuda.is_available()
+        info['torch_threads'] = torch.get_num_threads()
+    except ImportError:
+        pass
+    return info
+
+def save_report(results, path):
+    report = {'environment': environment_info(), 'results': results}
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def compare(results, baseline_path, threshold=0.10):
+    """
+    Compare results with a saved report
+    
+    A case regresses if its fps dropped, or its p95 latency grew, by more
+    than threshold (fraction) relative to the baseline.
+    Returns: list of regression descriptions (empty = no regressions)
+    """
+    with open(baseline_path) as f:
+        baseline = {case['name']: case for case in json.load(f)['results']}
+    
+    regressions = []
+    print(f"\n{'case':<36} {'fps':>16} {'p95 ms':>18}")
+    for case in results:
+        base = baseline.get(case['name'])
+        if base is None:
+            print(f"{case['name']:<36} {'(new)':>16}")
+            continue
+        
+        fps_change = (case['fps'] - base['fps']) / base['fps'] if base['fps'] else 0.0
+        base_p95 = base['latency_ms']['p95']
+        p95_change = (case['latency_ms']['p95'] - base_p95) / base_p95 if base_p95 else 0.0
+        
+        flag = ''
+        if fps_change < -threshold or p95_change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(
+                f"{case['name']}: fps {base['fps']:.1f} -> {case['fps']:.1f} ({fps_change:+.0%}), "
+                f"p95 {base_p95:.1f} -> {case['latency_ms']['p95']:.1f} ms ({p95_change:+.0%})"
+            )
+        print(f"{case['name']:<36} {case['fps']:>8.1f} ({fps_change:+5.0%}) "
+              f"{case['latency_ms']['p95']:>9.1f} ({p95_change:+5.0%}){flag}")
+    
+    return regressions
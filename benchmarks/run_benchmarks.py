@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+DRISTI - Offline benchmark suite
+
+Drives ObjectDetector, DepthEstimator, SceneAnalyzer and the full
+DristiSystem over recorded clips and synthetic frames at several input
+widths, and reports frames/sec, latency percentiles and memory use as JSON.
+A model's memory counts towards the first case that loads it.
+
+Examples:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --clips walk.mp4 frames/ --sizes 320 640
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 0.1
+    python benchmarks/run_benchmarks.py --modules detector detector_batch --batch-size 4
+"""
+import argparse
+import os
+import sys
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from core.frame_source import SyntheticSource, open_source
+from harness import compare, current_rss_mb, save_report, time_callable
+
+MODULES = ('detector', 'detector_batch', 'depth', 'scene', 'system')
+
+def load_frames(spec, width, max_frames):
+    """Decode up to max_frames from a source spec, resized to width (decode cost excluded)"""
+    if spec == 'synthetic':
+        source = SyntheticSource(width=width, height=int(width * 9 / 16), num_frames=max_frames)
+    else:
+        source = open_source(spec, pacing='max')
+    
+    frames = []
+    for frame in source:
+        h, w = frame.shape[:2]
+        if w != width:
+            frame = cv2.resize(frame, (width, int(h * width / w)))
+        frames.append(frame)
+        if len(frames) >= max_frames:
+            break
+    source.release()
+    return frames
+
+class ModelCache:
+    """Loads each model once and reuses it for every case"""
+    
+    def __init__(self, device, detector_backend='torch', precision='fp32'):
+        self.device = device
+        self.detector_backend = detector_backend
+        self.precision = precision
+        self.models = {}
+    
+    def get(self, name):
+        if name not in self.models:
+            self.models[name] = self._load(name)
+        return self.models[name]
+    
+    def _load(self, name):
+        if name == 'detector':
+            from vision.object_detector import ObjectDetector
+            return ObjectDetector(model_path='yolov8n.pt', confidence=0.5, input_size=320, device=self.device,
+                                  backend=self.detector_backend, precision=self.precision)
+        if name == 'depth':
+            from vision.depth_estimator import DepthEstimator
+            return DepthEstimator(device=self.device, precision=self.precision)
+        if name == 'scene':
+            from vision.scene_analyzer import SceneAnalyzer
+            # No scene-change cache: the scene and system cases time CLIP, not cache hits
+            return SceneAnalyzer(device=self.device, model_name='ViT-B/32', max_scene_age=0)
+        raise ValueError(name)
+
+def make_runner(module, models):
+    """Callable(frame) that exercises one module (or the whole system)"""
+    if module == 'detector':
+        detector = models.get('detector')
+        return lambda frame: detector.detect(frame, annotate=False)
+    if module == 'detector_batch':
+        detector = models.get('detector')
+        return detector.detect_batch
+    if module == 'depth':
+        depth = models.get('depth')
+        return lambda frame: depth.estimate(frame, upsample=False, colorize=False)
+    if module == 'scene':
+        analyzer = models.get('scene')
+        return analyzer.analyze
+    if module == 'system':
+        from core.dristi_system import DristiSystem
+        from core.scheduler import AdaptiveScheduler
+        # Fixed module intervals and no motion gate, so every run does the same work
+        system = DristiSystem(
+            object_detector=models.get('detector'),
+            depth_estimator=models.get('depth'),
+            scene_analyzer=models.get('scene'),
+            render=False,
+            scheduler=AdaptiveScheduler(adaptive=False),
+            motion_gate=False
+        )
+        return lambda frame: system.process_frame(frame)
+    raise ValueError(module)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modules', nargs='+', choices=MODULES, default=list(MODULES))
+    parser.add_argument('--clips', nargs='*', default=[], help='video files or image folders')
+    parser.add_argument('--no-synthetic', action='store_true', help='skip synthetic frames')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[320, 640, 1280], help='frame widths')
+    parser.add_argument('--frames', type=int, default=100, help='frames per case')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=4, help='frames per call for detector_batch')
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--detector-backend', choices=('torch', 'onnx'), default='torch')
+    parser.add_argument('--precision', choices=('fp32', 'int8'), default='fp32',
+                        help='detector/depth precision (int8 = dynamically quantized ONNX models)')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='saved report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed relative slowdown')
+    args = parser.parse_args()
+    
+    sources = list(args.clips) + ([] if args.no_synthetic else ['synthetic'])
+    models = ModelCache(args.device, args.detector_backend, args.precision)
+    results = []
+    
+    for source in sources:
+        source_name = 'synthetic' if source == 'synthetic' else os.path.basename(source.rstrip('/'))
+        for width in args.sizes:
+            frames = load_frames(source, width, args.frames)
+            if not frames:
+                print(f"⚠️  No frames from {source}, skipping")
+                continue
+            for module in args.modules:
+                name = f"{module}/{source_name}/{width}"
+                batch_size = args.batch_size if module == 'detector_batch' else 1
+                rss_before = current_rss_mb()
+                stats = time_callable(make_runner(module, models), frames, warmup=args.warmup,
+                                      batch_size=batch_size, rss_before=rss_before)
+                results.append({'name': name, 'module': module, 'source': source_name, 'width': width, **stats})
+                print(f"✅ {name:<36} {stats['fps']:7.1f} fps  "
+                      f"p50 {stats['latency_ms']['p50']:7.1f} ms  p95 {stats['latency_ms']['p95']:7.1f} ms  "
+                      f"RSS +{stats['rss_increase_mb']:.0f} MB")
+    
+    save_report(results, args.output)
+    print(f"\n📄 Results written to {args.output}")
+    
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+DRISTI - Local model server
+
+Loads YOLO, MiDaS and CLIP once and serves them over a Unix socket to every
+DRISTI process on this machine (the app with --model-server, offline
+indexers, debug tools). Concurrent requests are batched per model.
+
+Examples:
+    python serve_models.py
+    python serve_models.py --no-depth --batch-window 0.01
+    python app_optimized.py --model-server
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from core.config import load_config
+from core.model_server import ModelServer, settings_from_config
+from vision.depth_estimator import DepthEstimator
+from vision.object_detector import ObjectDetector
+from vision.scene_analyzer import SceneAnalyzer
+
+def load_models(config, device, enable_depth=True, enable_scene=True):
+    """Detector, depth estimator and scene analyzer as configured in config.yaml (None where disabled)"""
+    modules_config = config.get('modules') or {}
+    detection_config = modules_config.get('object_detection') or {}
+    depth_config = modules_config.get('depth_estimation') or {}
+    scene_config = modules_config.get('scene_analysis') or {}
+    tiling_config = config.get('tiling') or {}
+    
+    precision = detection_config.get('precision', 'fp32')
+    candidate_confidence = None
+    if tiling_config.get('enabled', False) and tiling_config.get('use_candidates', True):
+        candidate_confidence = tiling_config.get('candidate_confidence', 0.25)
+    detector = ObjectDetector(
+        model_path=detection_config.get('model', 'yolov8n.pt'),
+        confidence=detection_config.get('confidence', 0.5),
+        input_size=detection_config.get('input_size', 320),
+        device=device,
+        backend='onnx' if precision == 'int8' else detection_config.get('backend', 'torch'),
+        num_threads=detection_config.get('num_threads') or None,
+        precision=precision,
+        candidate_confidence=candidate_confidence
+    )
+    print("✅ YOLO Object Detector loaded")
+    
+    depth = None
+    if enable_depth and depth_config.get('enabled', True):
+        depth = DepthEstimator(
+            device=device,
+            backend=depth_config.get('backend', 'torch'),
+            precision=depth_config.get('precision', 'fp32'),
+            num_threads=depth_config.get('num_threads') or None
+        )
+        print("✅ MiDaS Depth Estimator loaded")
+    
+    analyzer = None
+    if enable_scene and scene_config.get('enabled', True):
+        analyzer = SceneAnalyzer(
+            device=device, model_name='ViT-B/32',
+            thumbnail_threshold=scene_config.get('thumbnail_threshold', 0.04),
+            embedding_similarity=scene_config.get('embedding_similarity', 0.92),
+            max_scene_age=scene_config.get('max_scene_age', 60.0),
+            prompt_banks=scene_config.get('prompt_banks')
+        )
+        print("✅ CLIP Scene Analyzer loaded")
+    return detector, depth, analyzer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', help='config.yaml profile to apply')
+    parser.add_argument('--device', default='cuda')
+    parser.add_argument('--address', help='Unix socket path (default: config model_server.address)')
+    parser.add_argument('--batch-window', type=float, help='seconds a request waits for other clients')
+    parser.add_argument('--max-batch', type=int, help='most items per model call')
+    parser.add_argument('--no-depth', action='store_true', help='do not host the depth model')
+    parser.add_argument('--no-scene', action='store_true', help='do not host CLIP')
+    args = parser.parse_args()
+    
+    config = load_config(profile=args.profile)
+    server_config = config.get('model_server') or {}
+    
+    print("📦 Loading AI models...")
+    detector, depth, analyzer = load_models(config, args.device, not args.no_depth, not args.no_scene)
+    
+    address, authkey = settings_from_config(config)
+    server = ModelServer(
+        detector, depth, analyzer,
+        address=args.address or address,
+        authkey=authkey,
+        batch_window=args.batch_window if args.batch_window is not None else server_config.get('batch_window', 0.005),
+        max_batch=args.max_batch or server_config.get('max_batch', 8)
+    )
+    server.start()
+    print(f"✅ Model server listening on {server.address} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted by user")
+    finally:
+        server.close()
+        for name, stats in server.stats().items():
+            mean = stats['items'] / max(1, stats['batches'])
+            print(f"📊 {name}: {stats['items']} items in {stats['batches']} batches (mean batch {mean:.1f})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Priority queue of pending utterances for the speech worker
+"""
+import heapq
+import itertools
+import threading
+import time
+
+# Lower value = more urgent
+PRIORITY_HAZARD = 0
+PRIORITY_COMMAND = 1
+PRIORITY_NARRATION = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_HAZARD: 'hazard',
+    PRIORITY_COMMAND: 'command',
+    PRIORITY_NARRATION: 'narration',
+}
+
+class SpeechRequest:
+    """One utterance waiting to be spoken"""
+    
+    __slots__ = ('priority', 'seq', 'text', 'key', 'created', 'expires_at', 'origin_time',
+                 'cancelled', 'done')
+    
+    def __init__(self, text, priority=PRIORITY_COMMAND, key=None, max_age=None, origin_time=None):
+        """
+        Args:
+            text: text to speak
+            priority: PRIORITY_HAZARD / PRIORITY_COMMAND / PRIORITY_NARRATION
+            key: coalescing key - a newer request with the same key replaces a queued one
+            max_age: seconds after which the request is dropped if still queued
+            origin_time: perf_counter timestamp of the event that triggered it (for latency)
+        """
+        self.priority = priority
+        self.seq = 0
+        self.text = text
+        self.key = key
+        self.created = time.perf_counter()
+        self.expires_at = self.created + max_age if max_age else None
+        self.origin_time = origin_time
+        self.cancelled = False
+        self.done = threading.Event()
+    
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+    
+    def expired(self, now):
+        return self.expires_at is not None and now > self.expires_at
+
+class SpeechQueue:
+    """Thread-safe priority queue with key coalescing and expiry of stale requests"""
+    
+    def __init__(self):
+        self._heap = []
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._closed = False
+        self.dropped = 0
+    
+    def put(self, request):
+        """Queue a request; a queued request with the same key is replaced"""
+        with self._cond:
+            if self._closed:
+                request.done.set()
+                return
+            if request.key is not None:
+                for queued in self._heap:
+                    if queued.key == request.key and not queued.cancelled:
+                        self._cancel(queued)
+            request.seq = next(self._counter)
+            heapq.heappush(self._heap, request)
+            self._cond.notify()
+    
+    def get(self, timeout=None):
+        """
+        Most urgent live request, waiting up to timeout seconds
+        Returns: SpeechRequest or None (timeout / closed)
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._cond:
+            while not self._closed:
+                now = time.perf_counter()
+                while self._heap:
+                    request = heapq.heappop(self._heap)
+                    if request.cancelled:
+                        continue
+                    if request.expired(now):
+                        self._cancel(request)
+                        continue
+                    return request
+                
+                remaining = None if deadline is None else deadline - now
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return None
+    
+    def _cancel(self, request):
+        request.cancelled = True
+        request.done.set()
+        self.dropped += 1
+    
+    def close(self):
+        """Wake all waiters; queued requests are released unspoken"""
+        with self._cond:
+            self._closed = True
+            for request in self._heap:
+                request.done.set()
+            self._heap = []
+            self._cond.notify_all()
+    
+    def __len__(self):
+        with self._cond:
+            return sum(1 for request in self._heap if not request.cancelled)
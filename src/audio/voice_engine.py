@@ -3,13 +3,30 @@ Voice Interface Module using pyttsx3
 """
 import pyttsx3
 import threading
+import time
 from collections import Counter
 
+from audio.speech_queue import PRIORITY_COMMAND, PRIORITY_NAMES, SpeechQueue, SpeechRequest
+from vision.hazards import assess_hazards
+
+def _object_names(objects):
+    """Class names of all objects (array-backed Detections avoid per-object dict lookups)"""
+    if hasattr(objects, 'labels'):
+        return objects.labels()
+    return [obj['name'] for obj in objects]
+
 class VoiceEngine:
-    """Handles text-to-speech and voice output"""
+    """
+    Handles text-to-speech and voice output.
+    
+    pyttsx3 engines are not thread-safe, so a single long-lived worker thread
+    owns the engine and speaks requests from a priority queue. A request with
+    higher priority than the utterance being spoken (e.g. a hazard during
+    narration) interrupts it at the next word boundary.
+    """
     
-    def __init__(self, rate=150, volume=1.0, use_female_voice=True):
-        """Initialize TTS engine"""
+    def __init__(self, rate=150, volume=1.0, use_female_voice=True, metrics=None):
+        """Initialize TTS engine and start the speech worker"""
         self.engine = pyttsx3.init()
         self.engine.setProperty('rate', rate)
         self.engine.setProperty('volume', volume)
@@ -18,58 +35,113 @@ class VoiceEngine:
         voices = self.engine.getProperty('voices')
         if use_female_voice and len(voices) > 1:
             self.engine.setProperty('voice', voices[1].id)
+        
+        # Optional LatencyMonitor: records queue-to-audio time per priority
+        self.metrics = metrics
+        
+        self.queue = SpeechQueue()
+        self.current = None
+        self.preempt = False
+        self.engine.connect('started-utterance', self._on_utterance_start)
+        self.engine.connect('started-word', self._on_word)
+        
+        self.running = True
+        self.worker = threading.Thread(target=self._speech_loop, name='dristi-speech', daemon=True)
+        self.worker.start()
     
-    def speak(self, text, async_mode=True):
-        """Convert text to speech"""
+    def speak(self, text, async_mode=True, priority=PRIORITY_COMMAND, key=None, max_age=None,
+              origin_time=None):
+        """
+        Queue text for speech
+        
+        Args:
+            text: text to speak
+            async_mode: return immediately (True) or wait until spoken or dropped
+            priority: PRIORITY_HAZARD / PRIORITY_COMMAND / PRIORITY_NARRATION
+            key: coalescing key - replaces a queued, not yet spoken request with the same key
+            max_age: drop the request if it has waited longer than this (seconds)
+            origin_time: perf_counter time of the triggering event, for latency metrics
+        """
         print(f"🔊 Dristi: {text}")
         
-        if async_mode:
-            # Non-blocking speech
-            threading.Thread(
-                target=lambda: self.engine.say(text) or self.engine.runAndWait(),
-                daemon=True
-            ).start()
-        else:
-            # Blocking speech
-            self.engine.say(text)
-            self.engine.runAndWait()
+        request = SpeechRequest(text, priority=priority, key=key, max_age=max_age, origin_time=origin_time)
+        current = self.current
+        if current is not None and priority < current.priority:
+            self.preempt = True
+        self.queue.put(request)
+        
+        if not async_mode:
+            request.done.wait()
+        return request
+    
+    def _speech_loop(self):
+        """Worker: speak queued requests one at a time on the engine's only thread"""
+        while self.running:
+            request = self.queue.get(timeout=0.5)
+            if request is None:
+                continue
+            
+            self.current = request
+            self.preempt = False
+            try:
+                self.engine.say(request.text)
+                self.engine.runAndWait()
+            except Exception as e:
+                print(f"⚠️  Speech failed: {e}")
+            finally:
+                self.current = None
+                request.done.set()
+    
+    def _on_utterance_start(self, name):
+        """Engine callback: record time from queueing (and from the triggering event) to audio"""
+        request = self.current
+        if self.metrics is None or request is None:
+            return
+        now = time.perf_counter()
+        label = PRIORITY_NAMES.get(request.priority, str(request.priority))
+        self.metrics.record(f"speech_wait_{label}", now - request.created)
+        if request.origin_time is not None:
+            self.metrics.record(f"event_to_audio_{label}", now - request.origin_time)
+    
+    def _on_word(self, name, location, length):
+        """Engine callback: stop the current utterance when something more urgent is queued"""
+        if self.preempt:
+            self.preempt = False
+            self.engine.stop()
+    
+    def shutdown(self, timeout=2.0):
+        """Stop the speech worker (queued requests are discarded)"""
+        self.running = False
+        self.queue.close()
+        self.worker.join(timeout)
     
     @staticmethod
-    def generate_description(objects, scene_info, depth_info=None, mode='full'):
-        """Generate natural language description"""
+    def generate_description(objects, scene_info, depth_info=None, mode='full', hazards=None):
+        """
+        Generate natural language description
+        
+        hazards: the frame's HazardReport (vision.hazards), shared with the other
+                 consumers; computed here if not supplied
+        """
         
         if mode == 'hazards':
-            # Hazard-focused description
-            hazard_types = {
-                'vehicles': ['car', 'truck', 'bus', 'bicycle', 'motorcycle'],
-                'traffic': ['traffic light', 'stop sign'],
-                'obstacles': ['bench', 'fire hydrant', 'parking meter'],
-                'animals': ['dog', 'cat', 'bird', 'horse']
-            }
-            
-            detected_hazards = {'vehicles': [], 'traffic': [], 'obstacles': [], 'animals': []}
-            
-            for obj in objects:
-                for hazard_type, hazard_list in hazard_types.items():
-                    if obj['name'] in hazard_list:
-                        detected_hazards[hazard_type].append(obj)
+            # Hazard-focused description, most urgent category first
+            if hazards is None:
+                hazards = assess_hazards(objects)
             
             warnings = []
-            
-            if detected_hazards['vehicles']:
-                vehicle_names = [h['name'] for h in detected_hazards['vehicles']]
-                counts = Counter(vehicle_names)
-                vehicle_desc = ', '.join(
-                    [f"{count} {name}" if count > 1 else name for name, count in counts.items()]
-                )
-                warnings.append(f"Warning! {vehicle_desc} detected")
-            
-            if detected_hazards['obstacles']:
-                warnings.append(f"{len(detected_hazards['obstacles'])} obstacles in path")
-            
-            if detected_hazards['animals']:
-                animal_names = [h['name'] for h in detected_hazards['animals']]
-                warnings.append(f"{', '.join(animal_names)} detected nearby")
+            for category in hazards.categories_by_urgency():
+                if category == 'vehicles':
+                    counts = Counter(h['name'] for h in hazards.objects_in('vehicles'))
+                    vehicle_desc = ', '.join(
+                        [f"{count} {name}" if count > 1 else name for name, count in counts.items()]
+                    )
+                    warnings.append(f"Warning! {vehicle_desc} detected")
+                elif category == 'obstacles':
+                    warnings.append(f"{hazards.count('obstacles')} obstacles in path")
+                elif category == 'animals':
+                    animal_names = [h['name'] for h in hazards.objects_in('animals')]
+                    warnings.append(f"{', '.join(animal_names)} detected nearby")
             
             if warnings:
                 return "Hazard alert. " + ". ".join(warnings) + ". Please be careful."
@@ -86,7 +158,7 @@ class VoiceEngine:
             if not objects:
                 return "No objects detected in current view."
             
-            counts = Counter([obj['name'] for obj in objects])
+            counts = Counter(_object_names(objects))
             total = len(objects)
             unique = len(counts)
             
@@ -104,8 +176,7 @@ class VoiceEngine:
         
         elif mode == 'people':
             # People-focused description
-            people = [obj for obj in objects if obj['name'] == 'person']
-            count = len(people)
+            count = _object_names(objects).count('person')
             
             if count == 0:
                 return "No people detected nearby."
@@ -124,28 +195,18 @@ class VoiceEngine:
                 description_parts.append(f"You are in {scene}.")
             
             # Priority check: hazards first
-            hazard_types = {
-                'vehicles': ['car', 'truck', 'bus', 'bicycle', 'motorcycle'],
-                'traffic': ['traffic light', 'stop sign'],
-                'obstacles': ['bench', 'fire hydrant', 'parking meter'],
-                'animals': ['dog', 'cat', 'bird', 'horse']
-            }
-            
-            detected_hazards = {'vehicles': [], 'traffic': [], 'obstacles': [], 'animals': []}
-            for obj in objects:
-                for hazard_type, hazard_list in hazard_types.items():
-                    if obj['name'] in hazard_list:
-                        detected_hazards[hazard_type].append(obj)
+            if hazards is None:
+                hazards = assess_hazards(objects)
             
-            if detected_hazards['vehicles']:
-                vehicle_count = len(detected_hazards['vehicles'])
+            vehicle_count = hazards.count('vehicles')
+            if vehicle_count:
                 description_parts.append(
                     f"Warning! {vehicle_count} vehicle{'s' if vehicle_count > 1 else ''} detected."
                 )
             
             # Objects
             if objects:
-                counts = Counter([obj['name'] for obj in objects])
+                counts = Counter(_object_names(objects))
                 
                 # Priority objects
                 priority = ['person', 'door', 'chair', 'stairs', 'bench']
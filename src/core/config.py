@@ -0,0 +1,40 @@
+"""
+Configuration loading for config.yaml (with optional profiles)
+"""
+import copy
+import os
+import yaml
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'config.yaml'
+)
+
+def _deep_merge(base, override):
+    """Recursively merge override into a copy of base"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def load_config(path=None, profile=None):
+    """
+    Load config.yaml, optionally applying one of its named profiles
+    Returns: config dict ({} if the file does not exist)
+    """
+    path = path or DEFAULT_CONFIG_PATH
+    if not os.path.exists(path):
+        return {}
+    
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    
+    if profile:
+        profiles = config.get('profiles') or {}
+        if profile not in profiles:
+            raise ValueError(f"Unknown profile '{profile}'. Available: {', '.join(profiles)}")
+        config = _deep_merge(config, profiles[profile])
+    
+    return config
@@ -2,16 +2,33 @@
 Main Dristi Integration System - OPTIMIZED
 Unified module combining Vision, Audio, and Scene Understanding
 """
+import copy
 import cv2
+import itertools
 import time
 import threading
-from collections import Counter
-from queue import Queue
+from collections import Counter, deque
+
+from audio.speech_queue import PRIORITY_COMMAND, PRIORITY_HAZARD, PRIORITY_NARRATION
+from core.hazard_watch import HazardWatcher
+from core.metrics import LatencyMonitor
+from core.motion import MotionGate
+from core.pipeline import ModuleWorker
+from core.scheduler import AdaptiveScheduler
+from vision.detections import Detections
+from vision.frame_context import FrameContext
+from vision.hazards import HazardEngine, HazardReport
+from vision.rendering import draw_detections
+from vision.tracker import ObjectTracker
+
+_stream_ids = itertools.count(1)  # stream_id of streams made by new_stream
 
 class DristiSystem:
     """Main integrated vision assistant system with optimization"""
     
-    def __init__(self, object_detector, depth_estimator=None, scene_analyzer=None, voice_engine=None):
+    def __init__(self, object_detector, depth_estimator=None, scene_analyzer=None, voice_engine=None,
+                 pipelined=False, metrics=None, scheduler=None, render=True, tracker=None,
+                 motion_gate=None, hazard_watcher=None, tile_pass=None, stream_id=None):
         """
         Initialize Dristi system with all modules
         
@@ -20,80 +37,504 @@ class DristiSystem:
             depth_estimator: DepthEstimator instance (optional)
             scene_analyzer: SceneAnalyzer instance (optional)
             voice_engine: VoiceEngine instance (optional)
+            pipelined: run each module on its own worker thread (see start_pipeline)
+            metrics: LatencyMonitor for per-stage timings (a private one is created if omitted)
+            scheduler: AdaptiveScheduler deciding which modules run on each frame
+            render: draw annotations; set False when no display or recorder is attached
+            tracker: ObjectTracker bridging frames where detection is skipped
+                     (a default one is created if omitted; False disables tracking)
+            motion_gate: MotionGate skipping modules while the scene is static
+                         (a default one is created if omitted; False disables gating)
+            hazard_watcher: HazardWatcher speaking new or approaching hazards immediately
+                            (a default one is created if omitted; False disables it)
+            tile_pass: TilePass re-detecting regions of interest at full resolution
+                       when the frame budget allows (optional, sequential mode only)
+            stream_id: label of this stream in the speech keys, so streams sharing
+                       a voice engine do not replace each other's queued warnings
         """
         self.detector = object_detector
         self.depth = depth_estimator
         self.analyzer = scene_analyzer
         self.voice = voice_engine
+        self.metrics = metrics or LatencyMonitor()
+        self.show_latency = True
+        self.render = render
+        if self.voice is not None and getattr(self.voice, 'metrics', False) is None:
+            self.voice.metrics = self.metrics
         
         # State management
         self.frame_count = 0
         self.fps = 0
         self.fps_start_time = time.time()
-        self.detected_objects = []
+        self.detected_objects = Detections.empty()
         self.current_scene = None
+        # This stream's scene-change state (the analyzer itself may be shared)
+        self.scene_cache = scene_analyzer.new_cache() if scene_analyzer is not None else None
         self.last_description = ""
         self.auto_narrate = False
         self.narration_interval = 15  # seconds
+        self.narration_max_age = 5.0  # drop queued narration older than this (seconds)
         self.last_narration_time = 0
         
-        # Optimization settings (reduced intervals for GPU acceleration)
-        self.detection_interval = 1  # Process detection every frame (GPU is fast)
-        self.scene_analysis_interval = 30  # Process scene every 30 frames (GPU accelerated)
-        self.depth_estimation_interval = 2  # Process depth every 2 frames (GPU accelerated)
+        # Module frequencies adapt to measured latency (see config.yaml 'scheduler')
+        self.scheduler = scheduler or AdaptiveScheduler()
+        
+        # Tracks keep objects (and their ids) between detector runs
+        self.tracker = ObjectTracker() if tracker is None else (None if tracker is False else tracker)
+        
+        # Static scenes skip model runs until they change or results get too old
+        self.motion_gate = MotionGate() if motion_gate is None else (motion_gate or None)
+        
+        # Hazards are classified and ranked once per frame and shared by all consumers
+        self.hazard_engine = HazardEngine()
+        self.hazards = HazardReport.empty()
+        
+        # Fast path: new or approaching hazards are spoken as soon as they are detected
+        self.hazard_watcher = HazardWatcher() if hazard_watcher is None else (hazard_watcher or None)
+        self.pending_capture_times = deque(maxlen=8)  # (frame_id, capture time) of frames sent to the detector
+        
+        # Optional high-resolution tile pass for small objects (spare budget only)
+        self.tile_pass = tile_pass
+        self.batch_detect_share = 0.0  # per-frame seconds of the last detect_batch
+        
+        self.stream_id = stream_id
         
         # Threading for parallel processing
+        self.pipelined = pipelined
+        self.processing_threads = {}
+        self.results_lock = threading.Lock()
+        self.latest_results = {}  # module name -> (frame_id, result, seconds)
+        self.consumed_frame_ids = {}  # module name -> frame_id already merged into state
+        self.depth_map = None  # low-resolution normalized depth of the last depth frame
+        self.frame_shape = None
+        
+        if self.pipelined:
+            self.start_pipeline()
+    
+    def new_stream(self, **overrides):
+        """
+        A DristiSystem for another camera stream that shares this system's models
+        
+        Detector, depth estimator, scene analyzer, voice and metrics are shared;
+        per-stream state (objects, tracks, scene, narration timers, scheduler,
+        motion gate, hazard watcher, tile pass) starts fresh from copies of this
+        system's components. Each stream gets its own stream_id. overrides go to
+        the constructor (e.g. tracker=False).
+        """
+        settings = {
+            'object_detector': self.detector,
+            'depth_estimator': self.depth,
+            'scene_analyzer': self.analyzer,
+            'voice_engine': self.voice,
+            'metrics': self.metrics,
+            'render': self.render,
+            'scheduler': copy.deepcopy(self.scheduler),
+            'tracker': _fresh_copy(self.tracker, missing=False),
+            'motion_gate': _fresh_copy(self.motion_gate, missing=False),
+            'hazard_watcher': _fresh_copy(self.hazard_watcher, missing=False),
+            'tile_pass': _fresh_copy(self.tile_pass),
+            'stream_id': next(_stream_ids),
+        }
+        settings.update(overrides)
+        return DristiSystem(**settings)
+    
+    def detection_due(self):
+        """True if the scheduler runs detection on the next frame (batch callers ask first)"""
+        return self.scheduler.should_run('detection', self.frame_count + 1)
+    
+    @property
+    def detection_interval(self):
+        return self.scheduler.interval('detection')
+    
+    @detection_interval.setter
+    def detection_interval(self, interval):
+        self.scheduler.set_interval('detection', interval)
+    
+    @property
+    def depth_estimation_interval(self):
+        return self.scheduler.interval('depth')
+    
+    @depth_estimation_interval.setter
+    def depth_estimation_interval(self, interval):
+        self.scheduler.set_interval('depth', interval)
+    
+    @property
+    def scene_analysis_interval(self):
+        return self.scheduler.interval('scene')
+    
+    @scene_analysis_interval.setter
+    def scene_analysis_interval(self, interval):
+        self.scheduler.set_interval('scene', interval)
+    
+    def start_pipeline(self):
+        """Start one worker per module; each consumes only the newest frame"""
+        if self.processing_threads:
+            return
+        
+        self.pipelined = True
+        
+        workers = {'detection': self._timed_detect}
+        if self.depth:
+            workers['depth'] = self._timed_depth
+        if self.analyzer:
+            workers['scene'] = self._timed_scene
+        
+        for name, process_fn in workers.items():
+            worker = ModuleWorker(name, process_fn, self._publish_result)
+            self.processing_threads[name] = worker
+            worker.start()
+    
+    def stop_pipeline(self):
+        """Stop all module workers"""
+        for worker in self.processing_threads.values():
+            worker.stop()
         self.processing_threads = {}
-        self.frame_queue = Queue(maxsize=2)
-        self.stop_threads = False
+        self.pipelined = False
     
-    def process_frame(self, frame):
+    def _timed_detect(self, frame):
+        with self.metrics.measure('detect'):
+            return self.detector.detect(frame, annotate=False)[1]
+    
+    def _timed_depth(self, frame):
+        with self.metrics.measure('depth'):
+            return self.depth.estimate(frame, upsample=False, colorize=False)[0]
+    
+    def _timed_scene(self, frame):
+        with self.metrics.measure('scene'):
+            return self.analyzer.analyze(frame, self.scene_cache)
+    
+    def _publish_result(self, name, frame_id, result, seconds):
+        """Worker callback: store the module's newest result in the shared snapshot"""
+        with self.results_lock:
+            self.latest_results[name] = (frame_id, result, seconds)
+    
+    def _take_new_results(self):
+        """
+        Return {name: result} for results not yet merged into system state
+        
+        The worker's run time of each new result is recorded with the
+        scheduler, so intervals adapt as in sequential mode.
+        """
+        with self.results_lock:
+            snapshot = dict(self.latest_results)
+        
+        new_results = {}
+        for name, (frame_id, result, seconds) in snapshot.items():
+            if self.consumed_frame_ids.get(name) != frame_id:
+                self.consumed_frame_ids[name] = frame_id
+                new_results[name] = result
+                self.scheduler.record(name, seconds, frame_id)
+        return new_results
+    
+    def _update_motion(self, frame):
+        """Compute the frame-change estimate once per frame"""
+        if self.motion_gate is not None:
+            with self.metrics.measure('motion'):
+                self.motion_gate.update(frame)
+    
+    def _motion_allows(self, name, current_time):
+        """True (and the frame becomes the module's reference) unless the scene is static for it"""
+        if self.motion_gate is None:
+            return True
+        if self.motion_gate.should_run(name, current_time):
+            self.motion_gate.mark_run(name, current_time)
+            return True
+        return False
+    
+    def _run_tile_pass(self, context, detections, candidates=None):
+        """
+        Merge in a full-resolution tile pass over the regions of interest when
+        it is due and both this frame and the overall budget have room for it;
+        otherwise carry over the objects only the last tile pass found
+        (candidates: low-confidence boxes to tile, None = the detector's last ones)
+        """
+        if self.tile_pass is None:
+            return detections
+        if (not self.scheduler.should_run('tiles', self.frame_count)
+                or not self.scheduler.can_afford('tiles') or not self.scheduler.has_headroom()):
+            return self.tile_pass.carry(detections)
+        with self.metrics.measure('tiles') as timer:
+            detections = self.tile_pass.run(self.detector, context, detections, candidates)
+        self.scheduler.record('tiles', timer.elapsed, self.frame_count)
+        return detections
+    
+    def _track(self, detections=None, current_time=None):
+        """
+        Update detected_objects from the tracker: reconcile with a fresh detector
+        result, or predict every track one frame ahead when detection was skipped
+        (current_time lets the tracker estimate time to contact)
+        """
+        if self.tracker is None:
+            if detections is not None:
+                self.detected_objects = detections
+            return
+        with self.metrics.measure('track'):
+            if detections is not None:
+                self.detected_objects = self.tracker.update(detections, self.frame_shape, current_time)
+            else:
+                self.detected_objects = self.tracker.predict(self.frame_shape, current_time)
+    
+    def _annotate_distances(self):
+        """Attach distance estimates from the current depth map to detected objects"""
+        if self.depth is None or self.depth_map is None or not len(self.detected_objects):
+            return
+        with self.metrics.measure('distance'):
+            # All boxes at once, sampled on the low-resolution depth grid
+            distance_texts, distance_values, distance_categories = self.depth.estimate_distances(
+                self.depth_map, self.detected_objects.xyxy, self.frame_shape
+            )
+            self.detected_objects.set_column('distance_text', distance_texts)
+            self.detected_objects.set_column('distance_val', distance_values)
+            self.detected_objects.set_column('distance_category', distance_categories)  # -1 = unknown
+    
+    def _assess_hazards(self):
+        """Classify and rank the hazards among the current objects (once per frame)"""
+        with self.metrics.measure('hazards'):
+            self.hazards = self.hazard_engine.assess(self.detected_objects)
+    
+    def _watch_hazards(self, current_time, origin_time):
+        """
+        Speak a short warning right away if a hazard is new or came closer
+        
+        origin_time is the perf_counter capture time of the frame the objects
+        were detected on; the voice engine records capture -> audio start as
+        'event_to_audio_hazard'.
+        """
+        if self.hazard_watcher is None or self.voice is None:
+            return
+        with self.metrics.measure('hazard_watch'):
+            warning = self.hazard_watcher.check(self.hazards, self.frame_shape[1], current_time)
+        if warning:
+            self._speak(warning, priority=PRIORITY_HAZARD, key=self._speech_key('hazard_warning'),
+                        max_age=self.hazard_watcher.max_age, origin_time=origin_time)
+    
+    def _update_fps(self, current_time):
+        """Calculate FPS every 30 frames"""
+        if self.frame_count % 30 == 0:
+            self.fps = 30 / (current_time - self.fps_start_time)
+            self.fps_start_time = current_time
+    
+    def process_frame(self, frame, capture_time=None, detections=None):
         """
         Process a single frame through the system
+        
+        annotated_frame is the input frame itself (no copy, no drawing) when
+        render is False. All modules share one FrameContext, so each resize /
+        color conversion of the frame is computed at most once.
+        capture_time: perf_counter time the frame was captured (default: now),
+                      the origin of the hazard warning latency
+        detections: this frame's Detections if already computed (see detect_batch);
+                    the detector is then not run for it
         Returns: (annotated_frame, detected_objects, scene_info)
         """
+        if self.pipelined:
+            return self._process_frame_pipelined(frame, capture_time, detections)
+        
+        frame_start = time.perf_counter()
+        capture_time = frame_start if capture_time is None else capture_time
         self.frame_count += 1
+        self.frame_shape = frame.shape
         current_time = time.time()
-        annotated_frame = frame.copy()
+        context = FrameContext(frame)
         
-        # Calculate FPS
-        if self.frame_count % 30 == 0:
-            self.fps = 30 / (current_time - self.fps_start_time)
-            self.fps_start_time = current_time
+        self._update_fps(current_time)
+        self._update_motion(context)
+        self.scheduler.begin_frame()
         
-        # Object detection
-        if self.frame_count % self.detection_interval == 0:
-            annotated_frame, self.detected_objects = self.detector.detect(frame)
+        # Object detection (highest priority, never deferred); tracks fill the skipped frames
+        static = False
+        if detections is not None:
+            # Detected in a batch with other frames: account this frame's share of it
+            self.scheduler.record('detection', self.batch_detect_share, self.frame_count)
+            detections = self._run_tile_pass(context, detections, candidates=())
+        elif self.scheduler.should_run('detection', self.frame_count):
+            if self._motion_allows('detection', current_time):
+                with self.metrics.measure('detect') as timer:
+                    _, detections = self.detector.detect(context, annotate=False)
+                self.scheduler.record('detection', timer.elapsed, self.frame_count)
+                detections = self._run_tile_pass(context, detections)
+            else:
+                static = True  # nothing moved: keep the objects where they are
+        if not static:
+            self._track(detections, current_time)
         
         # Depth estimation (if enabled)
-        if self.depth and self.frame_count % self.depth_estimation_interval == 0:
-            depth_map, depth_colored = self.depth.estimate(frame)
-            
-            # Add distance info to detected objects
-            for obj in self.detected_objects:
-                if depth_map is not None:
-                    distance_text, distance_val, color = self.depth.estimate_distance(
-                        depth_map, obj['bbox']
-                    )
-                    obj['distance_text'] = distance_text
-                    obj['distance_val'] = distance_val
+        if (self.depth and self.scheduler.should_run('depth', self.frame_count)
+                and self._motion_allows('depth', current_time)):
+            with self.metrics.measure('depth') as timer:
+                self.depth_map, _ = self.depth.estimate(context, upsample=False, colorize=False)
+            self.scheduler.record('depth', timer.elapsed, self.frame_count)
+        
+        # Add distance info to the (possibly predicted) objects, then rank their hazards
+        self._annotate_distances()
+        self._assess_hazards()
+        self._watch_hazards(current_time, capture_time)
         
         # Scene analysis (if enabled)
-        if self.analyzer and self.frame_count % self.scene_analysis_interval == 0:
-            self.current_scene = self.analyzer.analyze(frame)
+        if (self.analyzer and self.scheduler.should_run('scene', self.frame_count)
+                and self._motion_allows('scene', current_time)):
+            with self.metrics.measure('scene') as timer:
+                self.current_scene = self.analyzer.analyze(context, self.scene_cache)
+            self.scheduler.record('scene', timer.elapsed, self.frame_count)
+        
+        self.scheduler.end_frame(self.frame_count)
+        self._auto_narrate(current_time)
+        
+        annotated_frame = self.render_frame(frame)
+        
+        self.metrics.record('frame', time.perf_counter() - frame_start)
+        self.metrics.maybe_dump(current_time)
+        return annotated_frame, self.detected_objects, self.current_scene
+    
+    def render_frame(self, frame):
+        """Latest detections drawn on a copy of frame; the frame itself if rendering is off"""
+        if not self.render:
+            return frame
+        with self.metrics.measure('render'):
+            return draw_detections(frame.copy(), self.detected_objects)
+    
+    def _process_frame_pipelined(self, frame, capture_time=None, detections=None):
+        """
+        Hand the frame to the module workers and compose their latest results.
+        Never waits on a model, so latency is bounded by capture rate.
+        Supplied detections replace the detection worker for this frame.
+        """
+        frame_start = time.perf_counter()
+        capture_time = frame_start if capture_time is None else capture_time
+        self.frame_count += 1
+        self.frame_shape = frame.shape
+        current_time = time.time()
+        context = FrameContext(frame)
+        self._update_fps(current_time)
+        self._update_motion(context)
+        self.scheduler.begin_frame()
+        
+        # Workers share the context, so a resize done by one is reused by the others
+        for name, worker in self.processing_threads.items():
+            if name == 'detection' and detections is not None:
+                continue
+            if (self.frame_count % self.scheduler.interval(name) == 0
+                    and self._motion_allows(name, current_time)):
+                worker.submit(self.frame_count, context)
+                if name == 'detection':
+                    self.pending_capture_times.append((self.frame_count, capture_time))
+        
+        new_results = self._take_new_results()
+        if detections is not None:
+            new_results['detection'] = detections
+            origin_time = capture_time
+        else:
+            origin_time = self._detection_capture_time(new_results, capture_time)
+        self._track(new_results.get('detection'), current_time)
+        if 'depth' in new_results:
+            self.depth_map = new_results['depth']
+        self._annotate_distances()
+        self._assess_hazards()
+        self._watch_hazards(current_time, origin_time)
+        if 'scene' in new_results:
+            self.current_scene = new_results['scene']
+        
+        self._auto_narrate(current_time)
+        self.scheduler.end_frame(self.frame_count)
+        
+        # Latest detections drawn on the current frame
+        annotated_frame = self.render_frame(frame)
         
-        # Auto-narration
+        self.metrics.record('frame', time.perf_counter() - frame_start)
+        self.metrics.maybe_dump(current_time)
+        return annotated_frame, self.detected_objects, self.current_scene
+    
+    def _detection_capture_time(self, new_results, capture_time):
+        """Capture time of the frame behind a fresh detection result (else the current frame's)"""
+        if 'detection' not in new_results:
+            return capture_time
+        frame_id = self.consumed_frame_ids['detection']
+        origin = capture_time
+        # The worker only keeps the newest frame, so older submissions never report back
+        while self.pending_capture_times and self.pending_capture_times[0][0] <= frame_id:
+            pending, captured = self.pending_capture_times.popleft()
+            if pending == frame_id:
+                origin = captured
+        return origin
+    
+    def _auto_narrate(self, current_time):
+        """Speak a full description every narration_interval seconds"""
         if self.voice and self.auto_narrate:
             if current_time - self.last_narration_time > self.narration_interval:
                 if self.current_scene:
-                    description = self.voice.generate_description(
-                        self.detected_objects, self.current_scene, mode='full'
-                    )
-                    self.voice.speak(description)
-                    self.last_description = description
+                    # Newer narration replaces a queued one; stale narration is dropped
+                    self._speak(self._describe('full'), priority=PRIORITY_NARRATION,
+                                key=self._speech_key('narration'), max_age=self.narration_max_age)
                     self.last_narration_time = current_time
+    
+    def _describe(self, mode):
+        """Generate a description for the current state and remember it for 'repeat'"""
+        with self.metrics.measure('describe'):
+            description = self.voice.generate_description(
+                self.detected_objects, self.current_scene, mode=mode, hazards=self.hazards
+            )
+        self.last_description = description
+        return description
+    
+    def _speech_key(self, kind):
+        """Coalescing key of this stream's kind of utterance"""
+        return kind if self.stream_id is None else f"{kind}:{self.stream_id}"
+    
+    def _speak(self, text, priority=PRIORITY_COMMAND, **kwargs):
+        """Queue text for speech, timing how long the hand-off takes"""
+        with self.metrics.measure('speak'):
+            self.voice.speak(text, priority=priority, **kwargs)
+    
+    def run_source(self, source, max_frames=None, on_frame=None, batch_size=1):
+        """
+        Drive the system from a FrameSource (camera, video file, image folder
+        or synthetic) until it is exhausted or max_frames have been processed
         
-        return annotated_frame, self.detected_objects, self.current_scene
+        Args:
+            source: object with read() -> (ret, frame)
+            max_frames: stop after this many frames (None = until exhausted)
+            on_frame: optional callback(frame, annotated_frame, detected_objects, scene_info);
+                      returning False stops the run
+            batch_size: frames read ahead and detected in one forward pass (offline
+                        analysis; every frame is then detected, adds batch_size - 1
+                        frames of latency)
+        Returns: number of frames processed
+        """
+        processed = 0
+        while max_frames is None or processed < max_frames:
+            wanted = batch_size if max_frames is None else min(batch_size, max_frames - processed)
+            frames, capture_times = [], []
+            while len(frames) < wanted:
+                with self.metrics.measure('capture'):
+                    ret, frame = source.read()
+                if not ret:
+                    break
+                frames.append(frame)
+                capture_times.append(time.perf_counter())
+            if not frames:
+                break
+            
+            batch = self.detect_batch(frames) if batch_size > 1 else [None] * len(frames)
+            for frame, capture_time, detections in zip(frames, capture_times, batch):
+                annotated_frame, objects, scene = self.process_frame(frame, capture_time, detections)
+                processed += 1
+                if on_frame is not None and on_frame(frame, annotated_frame, objects, scene) is False:
+                    return processed
+            if len(frames) < wanted:
+                break
+        return processed
+    
+    def detect_batch(self, frames, batch_size=None):
+        """
+        Run the detector once over several frames (consecutive video frames, or
+        one frame per camera)
+        batch_size: most frames per forward pass (None = all at once)
+        Returns: list of Detections, to pass to process_frame(frame, detections=...)
+        """
+        with self.metrics.measure('detect_batch') as timer:
+            batch = self.detector.detect_batch(frames, batch_size)
+        self.batch_detect_share = timer.elapsed / max(1, len(frames))
+        return batch
     
     def add_overlay(self, frame):
         """Add visual overlay to frame (for sighted helper/developer)"""
@@ -113,6 +554,12 @@ class DristiSystem:
             cv2.putText(frame, f"Scene: {scene}", 
                        (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
         
+        # Per-stage latency (p50/p95)
+        if self.show_latency:
+            for i, line in enumerate(self.metrics.overlay_lines()):
+                cv2.putText(frame, line, (10, 145 + 18 * i),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.45, (200, 200, 200), 1)
+        
         return frame
     
     def handle_command(self, key, current_time):
@@ -122,61 +569,55 @@ class DristiSystem:
         
         if key == ord(' '):  # Full description
             if self.current_scene:
-                self.voice.speak("Analyzing environment")
-                description = self.voice.generate_description(
-                    self.detected_objects, self.current_scene, mode='full'
-                )
-                self.voice.speak(description)
-                self.last_description = description
+                self._speak("Analyzing environment")
+                self._speak(self._describe('full'))
             else:
-                self.voice.speak("Still analyzing. Please wait.")
+                self._speak("Still analyzing. Please wait.")
         
         elif key == ord('h'):  # Hazards
-            description = self.voice.generate_description(
-                self.detected_objects, self.current_scene, mode='hazards'
-            )
-            self.voice.speak(description)
-            self.last_description = description
+            self._speak(self._describe('hazards'))
         
         elif key == ord('l'):  # Location
             if self.current_scene:
-                description = self.voice.generate_description(
-                    self.detected_objects, self.current_scene, mode='location'
-                )
-                self.voice.speak(description)
-                self.last_description = description
+                self._speak(self._describe('location'))
             else:
-                self.voice.speak("Determining location. Please wait.")
+                self._speak("Determining location. Please wait.")
         
         elif key == ord('o'):  # Objects
-            description = self.voice.generate_description(
-                self.detected_objects, self.current_scene, mode='objects'
-            )
-            self.voice.speak(description)
-            self.last_description = description
+            self._speak(self._describe('objects'))
         
         elif key == ord('p'):  # People
-            description = self.voice.generate_description(
-                self.detected_objects, self.current_scene, mode='people'
-            )
-            self.voice.speak(description)
-            self.last_description = description
+            self._speak(self._describe('people'))
         
         elif key == ord('r'):  # Repeat
             if self.last_description:
-                self.voice.speak(self.last_description)
+                self._speak(self.last_description)
             else:
-                self.voice.speak("No previous description available")
+                self._speak("No previous description available")
         
         elif key == ord('a'):  # Toggle auto-narration
             self.auto_narrate = not self.auto_narrate
             if self.auto_narrate:
-                self.voice.speak("Auto narration enabled. I will describe your surroundings every 15 seconds.")
+                self._speak("Auto narration enabled. I will describe your surroundings every 15 seconds.")
                 self.last_narration_time = current_time
             else:
-                self.voice.speak("Auto narration disabled. Press space for descriptions.")
+                self._speak("Auto narration disabled. Press space for descriptions.")
     
     def reset_fps(self):
         """Reset FPS counter"""
         self.fps_start_time = time.time()
         self.fps = 0
+
+def _fresh_copy(component, missing=None):
+    """
+    Independent copy of a per-stream component with its state reset
+    
+    Returns missing for a None component (False tells DristiSystem to keep it
+    disabled). Tested with "is None": a tracker without tracks is falsy.
+    """
+    if component is None:
+        return missing
+    component = copy.deepcopy(component)
+    if hasattr(component, 'reset'):
+        component.reset()
+    return component
@@ -0,0 +1,254 @@
+"""
+Pluggable frame sources: live camera, video file, image folder and synthetic frames.
+
+Every source mirrors the cv2.VideoCapture interface used by the apps
+(read() -> (ret, frame), isOpened(), release()), so the same pipeline can
+run live or replay recorded input deterministically for benchmarks.
+"""
+import os
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+class FrameSource:
+    """
+    Base class for frame sources
+    
+    pacing='realtime' delivers frames no faster than the source fps (like a
+    camera); pacing='max' delivers them as fast as they can be produced.
+    """
+    
+    def __init__(self, fps=15.0, pacing='max', loop=False):
+        if pacing not in ('realtime', 'max'):
+            raise ValueError(f"pacing must be 'realtime' or 'max', got {pacing!r}")
+        self.fps = fps
+        self.pacing = pacing
+        self.loop = loop
+        self.frame_index = 0
+        self.next_frame_time = None
+    
+    def read(self):
+        """Returns: (ret, frame) like cv2.VideoCapture.read()"""
+        frame = self._next_frame()
+        if frame is None and self.loop and self.frame_index > 0:
+            self._rewind()
+            frame = self._next_frame()
+        if frame is None:
+            return False, None
+        
+        if self.pacing == 'realtime' and self.fps:
+            self._wait_for_slot()
+        self.frame_index += 1
+        return True, frame
+    
+    def _wait_for_slot(self):
+        """Sleep so frames are delivered at the source fps"""
+        now = time.perf_counter()
+        if self.next_frame_time is None:
+            self.next_frame_time = now
+        delay = self.next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_time = max(self.next_frame_time, now) + 1.0 / self.fps
+    
+    def _next_frame(self):
+        """Next frame, or None when exhausted"""
+        raise NotImplementedError
+    
+    def _rewind(self):
+        """Restart from the first frame (for loop=True)"""
+        raise NotImplementedError
+    
+    @property
+    def live(self):
+        """Frames arrive in real time and may be skipped when processing falls behind"""
+        return self.pacing == 'realtime'
+    
+    def isOpened(self):
+        return True
+    
+    def release(self):
+        pass
+    
+    def __iter__(self):
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield frame
+
+class CameraSource(FrameSource):
+    """
+    Live camera through cv2.VideoCapture (paced by the camera itself)
+    
+    width / height request a capture size; with only a width the driver
+    picks the height of a matching mode, so the camera keeps its own
+    aspect ratio.
+    """
+    
+    live = True
+    
+    def __init__(self, index=0, width=None, fps=None, height=None):
+        super().__init__(fps=fps, pacing='max')
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+    
+    @classmethod
+    def autodetect(cls, max_index=5, width=None, fps=None, height=None):
+        """First camera index that delivers a frame, or None"""
+        for camera_index in range(max_index):
+            source = cls(camera_index, width=width, fps=fps, height=height)
+            if source.isOpened():
+                ret, _ = source.cap.read()
+                if ret:
+                    return source
+            source.release()
+        return None
+    
+    def _next_frame(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+    
+    def isOpened(self):
+        return self.cap.isOpened()
+    
+    def get(self, prop):
+        return self.cap.get(prop)
+    
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+    
+    def release(self):
+        self.cap.release()
+
+class VideoFileSource(FrameSource):
+    """Frames from a recorded video file"""
+    
+    def __init__(self, path, pacing='max', loop=False):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 15.0
+        super().__init__(fps=fps, pacing=pacing, loop=loop)
+    
+    def _next_frame(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+    
+    def _rewind(self):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    
+    def isOpened(self):
+        return self.cap.isOpened()
+    
+    def get(self, prop):
+        return self.cap.get(prop)
+    
+    def release(self):
+        self.cap.release()
+
+class ImageFolderSource(FrameSource):
+    """Frames from the images in a directory, in sorted filename order"""
+    
+    def __init__(self, directory, fps=15.0, pacing='max', loop=False):
+        super().__init__(fps=fps, pacing=pacing, loop=loop)
+        self.directory = directory
+        self.paths = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.position = 0
+    
+    def _next_frame(self):
+        while self.position < len(self.paths):
+            frame = cv2.imread(self.paths[self.position])
+            self.position += 1
+            if frame is not None:
+                return frame
+        return None
+    
+    def _rewind(self):
+        self.position = 0
+    
+    def isOpened(self):
+        return bool(self.paths)
+
+class SyntheticSource(FrameSource):
+    """
+    Deterministic generated frames (gradient background with moving,
+    growing rectangles) for profiling and tests without a camera
+    """
+    
+    def __init__(self, width=640, height=360, num_frames=300, fps=15.0, pacing='max',
+                 num_objects=4, seed=0, loop=False):
+        super().__init__(fps=fps, pacing=pacing, loop=loop)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.position = 0
+        
+        rng = np.random.default_rng(seed)
+        self.colors = rng.integers(0, 256, size=(num_objects, 3)).tolist()
+        self.starts = rng.random((num_objects, 2)) * [width, height]
+        self.velocities = (rng.random((num_objects, 2)) - 0.5) * [width / 30.0, height / 30.0]
+        self.sizes = rng.random(num_objects) * min(width, height) / 6 + 10
+        self.growth = rng.random(num_objects) * 0.01
+        
+        gradient = np.linspace(40, 200, width, dtype=np.uint8)
+        self.background = np.repeat(np.tile(gradient, (height, 1))[:, :, None], 3, axis=2)
+    
+    def _next_frame(self):
+        if self.num_frames is not None and self.position >= self.num_frames:
+            return None
+        t = self.position
+        self.position += 1
+        
+        frame = self.background.copy()
+        centers = (self.starts + self.velocities * t) % [self.width, self.height]
+        half_sizes = self.sizes * (1.0 + self.growth * t) / 2
+        for (cx, cy), half, color in zip(centers, half_sizes, self.colors):
+            cv2.rectangle(frame, (int(cx - half), int(cy - half)), (int(cx + half), int(cy + half)),
+                          color, -1)
+        return frame
+    
+    def _rewind(self):
+        self.position = 0
+
+def open_source(spec=None, pacing=None, loop=False, width=None, fps=None, height=None):
+    """
+    Open a frame source from a spec string
+    
+    Spec formats:
+        None / 'camera'     first working camera
+        0, 'camera:1'       camera by index
+        'synthetic'         generated frames ('synthetic:1280x720' for a custom size)
+        path to a directory image folder
+        path to a file      video file
+    width / height: capture size requested from cameras (see CameraSource)
+    Returns: FrameSource (or None if no camera could be opened)
+    """
+    if spec is None or spec == 'camera':
+        return CameraSource.autodetect(width=width, fps=fps, height=height)
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec), width=width, fps=fps, height=height)
+    
+    spec = str(spec)
+    if spec.startswith('camera:'):
+        return CameraSource(int(spec.split(':', 1)[1]), width=width, fps=fps, height=height)
+    if spec.startswith('synthetic'):
+        size = spec.split(':', 1)[1] if ':' in spec else None
+        w, h = (int(v) for v in size.lower().split('x')) if size else (width or 640, int((width or 640) * 9 / 16))
+        return SyntheticSource(width=w, height=h, num_frames=None, fps=fps or 15.0,
+                               pacing=pacing or 'realtime')
+    if os.path.isdir(spec):
+        return ImageFolderSource(spec, fps=fps or 15.0, pacing=pacing or 'realtime', loop=loop)
+    if os.path.exists(spec):
+        return VideoFileSource(spec, pacing=pacing or 'realtime', loop=loop)
+    raise FileNotFoundError(f"Frame source not found: {spec}")
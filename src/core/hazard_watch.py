@@ -0,0 +1,148 @@
+"""
+Hazard watcher - immediate short warnings for new or approaching hazards
+"""
+import math
+
+from vision.hazards import HAZARD_CATEGORIES
+
+# Seconds between two warnings about the same class, by hazard category
+# (categories missing here, e.g. traffic signs, are never announced)
+DEFAULT_COOLDOWNS = {'vehicles': 3.0, 'animals': 5.0, 'obstacles': 8.0}
+
+SIDES = ('left', 'ahead', 'right')
+
+def render_phrases(names):
+    """
+    Warning text for every (class name, kind, side), built once at start-up
+    
+    kind is 'new' (first sighting of a track) or 'closer' (an announced track
+    came nearer); side is where the box centre lies in the frame.
+    """
+    phrases = {}
+    for name in names:
+        label = name.capitalize()
+        for side in SIDES:
+            where = '' if side == 'ahead' else f" on your {side}"
+            phrases[(name, 'new', side)] = f"{label}{where or ' ahead'}"
+            phrases[(name, 'closer', side)] = f"{label} approaching{where}"
+    return phrases
+
+class HazardWatcher:
+    """
+    Always-on hazard fast path, independent of narration and commands.
+    
+    Checked on every frame right after tracking, distance annotation and
+    the hazard assessment. A warning fires when a hazard track appears that
+    was not announced yet, or when an announced track came closer_by metres
+    nearer than at its last warning (or its box grows faster than
+    approach_threshold). Only the most urgent such hazard is announced per
+    frame and each class has a cooldown, so a parked car is not repeated
+    and a crowd of bicycles is one warning. Phrases are pre-rendered, so
+    the fast path is a dictionary lookup plus a speech-queue push.
+    """
+    
+    def __init__(self, cooldowns=None, class_cooldowns=None, closer_by=0.5, approach_threshold=0.5,
+                 max_age=1.0):
+        """
+        Args:
+            cooldowns: {category: seconds} - announced categories and their cooldown
+            class_cooldowns: {class name: seconds} overriding the category cooldown
+            closer_by: metres a track must come nearer to be announced again
+            approach_threshold: box-area growth (log-area per second) counting as approaching
+            max_age: seconds after which a still-queued warning is dropped
+        """
+        self.cooldowns = dict(DEFAULT_COOLDOWNS if cooldowns is None else cooldowns)
+        self.class_cooldowns = {
+            name: cooldown
+            for category, cooldown in self.cooldowns.items()
+            for name in HAZARD_CATEGORIES.get(category, ())
+        }
+        self.class_cooldowns.update(class_cooldowns or {})
+        self.closer_by = closer_by
+        self.approach_threshold = approach_threshold
+        self.max_age = max_age
+        self.phrases = render_phrases(self.class_cooldowns)
+        
+        self.announced = {}  # track id (class name without tracking) -> distance at its last warning
+        self.last_warning = {}  # class name -> time of its last warning
+        self.warnings = 0
+    
+    @classmethod
+    def from_config(cls, config):
+        """Build from the 'hazard_watch' section of config.yaml (None if disabled)"""
+        settings = config.get('hazard_watch') or {}
+        if not settings.get('enabled', True):
+            return None
+        return cls(
+            cooldowns=settings.get('cooldowns'),
+            class_cooldowns=settings.get('class_cooldowns'),
+            closer_by=settings.get('closer_by', 0.5),
+            approach_threshold=settings.get('approach_threshold', 0.5),
+            max_age=settings.get('max_age', 1.0),
+        )
+    
+    def reset(self):
+        """Forget announced tracks and cooldowns"""
+        self.announced = {}
+        self.last_warning = {}
+    
+    def check(self, hazards, frame_width, now):
+        """
+        Decide whether this frame's hazards warrant an immediate warning
+        
+        Args:
+            hazards: HazardReport of the current frame (Detections-backed)
+            frame_width: width of the frame the boxes refer to
+            now: current time (seconds)
+        Returns: warning text, or None
+        """
+        objects = hazards.objects
+        track_ids = objects.get_column('track_id')
+        distances = objects.get_column('distance_val')
+        distance_categories = objects.get_column('distance_category')
+        
+        present = set()
+        warning = None
+        for rank, index in enumerate(hazards.indices.tolist()):
+            name = objects.names[int(objects.class_id[index])]
+            cooldown = self.class_cooldowns.get(name)
+            if cooldown is None:
+                continue
+            key = int(track_ids[index]) if track_ids is not None and track_ids[index] >= 0 else name
+            present.add(key)
+            if warning is not None or now - self.last_warning.get(name, -math.inf) < cooldown:
+                continue
+            
+            distance = float(distances[index]) if distances is not None else math.inf
+            if not math.isfinite(distance) or (distance_categories is not None and distance_categories[index] < 0):
+                distance = math.inf  # boxes the depth map could not place
+            kind = self._trigger(key, distance, float(hazards.approach[rank]))
+            if kind is not None:
+                warning = (key, name, kind, index, distance)
+        
+        # Tracks that left the frame may be announced again when they return
+        self.announced = {key: distance for key, distance in self.announced.items() if key in present}
+        if warning is None:
+            return None
+        
+        key, name, kind, index, distance = warning
+        self.announced[key] = distance
+        self.last_warning[name] = now
+        self.warnings += 1
+        return self.phrases[(name, kind, self._side(objects.xyxy[index], frame_width))]
+    
+    def _trigger(self, key, distance, approach):
+        """'new', 'closer' or None for one hazard"""
+        previous = self.announced.get(key)
+        if previous is None:
+            return 'new'
+        if math.isfinite(previous) and previous - distance >= self.closer_by:
+            return 'closer'
+        if approach >= self.approach_threshold:
+            return 'closer'
+        return None
+    
+    @staticmethod
+    def _side(box, frame_width):
+        centre = (box[0] + box[2]) / 2.0 / max(frame_width, 1)
+        return SIDES[min(int(centre * 3), 2)]
@@ -0,0 +1,148 @@
+"""
+Per-stage latency instrumentation with rolling percentile histograms
+"""
+import json
+import os
+import threading
+import time
+
+class RollingHistogram:
+    """Fixed-size ring buffer of samples; percentiles are computed on demand"""
+    
+    __slots__ = ('samples', 'size', 'index', 'count')
+    
+    def __init__(self, size=512):
+        self.samples = [0.0] * size
+        self.size = size
+        self.index = 0
+        self.count = 0
+    
+    def record(self, value):
+        """O(1) insert, overwriting the oldest sample once the window is full"""
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count += 1
+    
+    def values(self):
+        """Samples currently in the window (unordered)"""
+        return self.samples[:min(self.count, self.size)]
+    
+    def summary(self):
+        """
+        Summarize the window
+        Returns: dict with count, mean, p50, p95, p99 and max (same unit as recorded)
+        """
+        window = sorted(self.values())
+        if not window:
+            return {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        
+        last = len(window) - 1
+        return {
+            'count': self.count,
+            'mean': sum(window) / len(window),
+            'p50': window[int(round(0.50 * last))],
+            'p95': window[int(round(0.95 * last))],
+            'p99': window[int(round(0.99 * last))],
+            'max': window[-1],
+        }
+
+class _StageTimer:
+    """Context manager that records elapsed time into a LatencyMonitor stage"""
+    
+    __slots__ = ('monitor', 'stage', 'start', 'elapsed')
+    
+    def __init__(self, monitor, stage):
+        self.monitor = monitor
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.monitor.record(self.stage, self.elapsed)
+        return False
+
+class LatencyMonitor:
+    """Collects per-stage latencies and periodically dumps them as JSON"""
+    
+    def __init__(self, window=512, dump_path=None, dump_interval=30.0):
+        """
+        Args:
+            window: number of samples kept per stage
+            dump_path: JSON file written by maybe_dump() (None disables dumping)
+            dump_interval: seconds between dumps
+        """
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.last_dump_time = time.time()
+    
+    def record(self, stage, seconds):
+        """Record one latency sample (seconds) for a stage"""
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = RollingHistogram(self.window)
+            histogram.record(seconds)
+    
+    def measure(self, stage):
+        """Time a block: `with monitor.measure('detect'): ...`"""
+        return _StageTimer(self, stage)
+    
+    def summary(self):
+        """
+        Latency summary for every stage
+        Returns: {stage: {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}
+        """
+        with self.lock:
+            snapshot = {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+        
+        return {
+            stage: {
+                'count': stats['count'],
+                **{f"{key}_ms": stats[key] * 1000.0 for key in ('mean', 'p50', 'p95', 'p99', 'max')}
+            }
+            for stage, stats in snapshot.items()
+        }
+    
+    def overlay_lines(self, stages=None):
+        """Short 'stage p50/p95 ms' strings for the visual overlay"""
+        summary = self.summary()
+        stages = stages or sorted(summary)
+        return [
+            f"{stage}: {summary[stage]['p50_ms']:.1f}/{summary[stage]['p95_ms']:.1f} ms"
+            for stage in stages if stage in summary
+        ]
+    
+    def dump(self, path=None):
+        """Write the current summary to a JSON file (atomically)"""
+        path = path or self.dump_path
+        if not path:
+            return
+        
+        report = {
+            'timestamp': time.time(),
+            'uptime_s': time.time() - self.started_at,
+            'stages': self.summary(),
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    
+    def maybe_dump(self, now=None):
+        """Dump to dump_path if dump_interval seconds have passed"""
+        if not self.dump_path:
+            return
+        now = now or time.time()
+        if now - self.last_dump_time >= self.dump_interval:
+            self.last_dump_time = now
+            try:
+                self.dump()
+            except OSError as e:
+                print(f"⚠️  Could not write latency report: {e}")
@@ -0,0 +1,434 @@
+"""
+Local model server - one process hosts the vision models for every DRISTI process on the machine
+"""
+import os
+import queue
+import secrets
+import socket
+import stat
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from vision.depth_estimator import BaseDepthEstimator
+from vision.frame_context import FrameContext
+from vision.object_detector import BaseObjectDetector
+from vision.scene_analyzer import BaseSceneAnalyzer
+
+SOCKET_NAME = 'models.sock'
+AUTHKEY_NAME = 'authkey'
+
+def runtime_dir():
+    """
+    Per-user directory holding the socket and the auth key, created 0700
+    
+    $XDG_RUNTIME_DIR/dristi when the session has one, else dristi-<uid> in
+    the temp directory. A directory another user could have created or
+    can enter raises PermissionError.
+    """
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    path = os.path.join(base, 'dristi') if base else os.path.join(tempfile.gettempdir(), f"dristi-{os.getuid()}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be a directory only the current user can access")
+    return path
+
+def default_address():
+    """Socket path of the current user's model server"""
+    return os.path.join(runtime_dir(), SOCKET_NAME)
+
+def default_authkey():
+    """Random per-user auth key, generated on first use and kept in runtime_dir() (0600)"""
+    path = os.path.join(runtime_dir(), AUTHKEY_NAME)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'rb') as f:
+            return f.read()
+    with os.fdopen(fd, 'wb') as f:
+        key = secrets.token_hex(32).encode()
+        f.write(key)
+    return key
+
+def settings_from_config(config):
+    """(address, authkey) from the 'model_server' section of config.yaml, per-user defaults where empty"""
+    settings = config.get('model_server') or {}
+    authkey = settings.get('authkey')
+    return (settings.get('address') or default_address(),
+            str(authkey).encode() if authkey else default_authkey())
+
+class _Job:
+    """One request waiting in a BatchWorker queue"""
+    
+    def __init__(self, kind, items):
+        self.kind = kind
+        self.items = items
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class BatchWorker(threading.Thread):
+    """
+    Runs one model on its own thread, gathering concurrent requests into batches
+    
+    The first request waits up to batch_window for requests of other
+    clients (only while more than one connection uses this model), then all
+    gathered items of the same kind go through the model together, in
+    chunks of at most max_batch. connect_models opens one connection per
+    model, so a single app never waits.
+    """
+    
+    def __init__(self, name, handlers, batch_window=0.005, max_batch=8):
+        """
+        Args:
+            handlers: {kind: callable(list of items) -> list of results, one per item}
+        """
+        super().__init__(name=f"model-{name}", daemon=True)
+        self.handlers = handlers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.clients = set()  # connections that sent this worker requests
+        self.clients_lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.batches = 0
+        self.items = 0
+    
+    def attach(self, connection):
+        with self.clients_lock:
+            self.clients.add(connection)
+    
+    def detach(self, connection):
+        with self.clients_lock:
+            self.clients.discard(connection)
+    
+    def client_count(self):
+        with self.clients_lock:
+            return len(self.clients)
+    
+    def submit(self, kind, items):
+        """Queue items and wait for their results (called from a connection thread)"""
+        job = _Job(kind, list(items))
+        self.jobs.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+    
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            batch, size = [job], len(job.items)
+            window = self.batch_window if self.client_count() > 1 else 0.0
+            deadline = time.perf_counter() + window
+            stopping = False
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    job = self.jobs.get(timeout=remaining) if remaining > 0 else self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+                size += len(job.items)
+            self._run(batch)
+            if stopping:
+                return
+    
+    def _run(self, batch):
+        """Run gathered jobs, one model call per kind (chunked), and hand out the results"""
+        for kind in dict.fromkeys(job.kind for job in batch):
+            jobs = [job for job in batch if job.kind == kind]
+            items = [item for job in jobs for item in job.items]
+            try:
+                results = []
+                for start in range(0, len(items), self.max_batch):
+                    results.extend(self.handlers[kind](items[start:start + self.max_batch]))
+            except Exception as e:
+                for job in jobs:
+                    job.error = e
+                    job.done.set()
+                continue
+            
+            self.batches += 1
+            self.items += len(items)
+            offset = 0
+            for job in jobs:
+                job.result = results[offset:offset + len(job.items)]
+                offset += len(job.items)
+                job.done.set()
+    
+    def stop(self, timeout=1.0):
+        self.jobs.put(None)
+        self.join(timeout)
+
+class ModelServer:
+    """
+    Hosts ObjectDetector, DepthEstimator and SceneAnalyzer for other processes.
+    
+    Clients connect over a Unix socket (multiprocessing.connection with an
+    authentication key) and send frames; each model runs on its own worker
+    thread that batches what arrives from all clients within batch_window.
+    Requests carry the smallest input each model needs (full frames for
+    the detector, the scaled RGB frame for depth, the 224px centre crop for
+    CLIP), pickled over the socket. State such as the scene-change cache or
+    last detections stays in the client (see connect_models).
+    """
+    
+    def __init__(self, object_detector=None, depth_estimator=None, scene_analyzer=None,
+                 address=None, authkey=None, batch_window=0.005, max_batch=8):
+        """
+        Args:
+            object_detector, depth_estimator, scene_analyzer: hosted models (any may be None)
+            address: Unix socket path (None = default_address())
+            authkey: shared secret clients must present (None = default_authkey())
+            batch_window: seconds a request waits for requests of other clients
+            max_batch: most items per model call
+        """
+        self.detector = object_detector
+        self.depth = depth_estimator
+        self.analyzer = scene_analyzer
+        self.address = address or default_address()
+        self.authkey = authkey or default_authkey()
+        self.listener = None
+        self.running = False
+        
+        self.workers = {}
+        self.routes = {}  # request kind -> worker
+        handlers = {
+            'detector': (self.detector, {'detect': self._detect}),
+            'depth': (self.depth, {'depth': self._depth}),
+            'scene': (self.analyzer, {'encode': self._encode, 'classify': self._classify}),
+        }
+        for name, (model, kinds) in handlers.items():
+            if model is None:
+                continue
+            self.workers[name] = BatchWorker(name, kinds, batch_window, max_batch)
+            for kind in kinds:
+                self.routes[kind] = self.workers[name]
+    
+    def info(self):
+        """Model settings clients need to mirror the hosted models"""
+        info = {'detector': None, 'depth': None, 'scene': None}
+        if self.detector is not None:
+            info['detector'] = {
+                'names': dict(self.detector.names),
+                'confidence': self.detector.confidence,
+                'candidate_confidence': self.detector.candidate_confidence,
+                'input_size': self.detector.input_size,
+                'precision': self.detector.precision,
+            }
+        if self.depth is not None:
+            info['depth'] = {'precision': self.depth.precision}
+        if self.analyzer is not None:
+            info['scene'] = {
+                'model_name': self.analyzer.model_name,
+                'input_resolution': self.analyzer.input_resolution,
+                'thumbnail_threshold': self.analyzer.thumbnail_threshold,
+                'embedding_similarity': self.analyzer.embedding_similarity,
+                'max_scene_age': self.analyzer.max_scene_age,
+            }
+        return info
+    
+    def _detect(self, frames):
+        return self.detector._detect_contexts([FrameContext(frame) for frame in frames])
+    
+    def _depth(self, scaled_rgbs):
+        return self.depth._predict(scaled_rgbs)
+    
+    def _encode(self, images):
+        return list(self.analyzer.encode_images(images).float().cpu().numpy())
+    
+    def _classify(self, embeddings):
+        return self.analyzer.classify_batch(np.stack(embeddings))
+    
+    def start(self):
+        """
+        Bind the socket and start the model workers (accept with serve_forever)
+        
+        A socket file left by a previous run is replaced; one a running
+        server still listens on raises OSError. The socket is created
+        owner-only (umask), so there is no window before a chmod.
+        """
+        if os.path.exists(self.address):
+            if _listening(self.address):
+                raise OSError(f"a model server is already listening on {self.address}")
+            os.unlink(self.address)  # stale socket of a previous run
+        umask = os.umask(0o177)
+        try:
+            self.listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        finally:
+            os.umask(umask)
+        for worker in self.workers.values():
+            worker.start()
+        self.running = True
+    
+    def serve_forever(self):
+        """Accept clients until close(); each connection is served on its own thread"""
+        if not self.running:
+            self.start()
+        while self.running:
+            try:
+                connection = self.listener.accept()
+            except OSError:
+                break  # listener closed
+            except Exception as e:
+                print(f"⚠️  Rejected model server client: {e}")
+                continue
+            threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+    
+    def _serve_connection(self, connection):
+        used = set()  # workers this connection sent requests to
+        try:
+            while True:
+                try:
+                    kind, payload = connection.recv()
+                except (EOFError, OSError):
+                    break
+                try:
+                    if kind == 'info':
+                        result = self.info()
+                    elif kind in self.routes:
+                        worker = self.routes[kind]
+                        if worker not in used:
+                            used.add(worker)
+                            worker.attach(connection)
+                        result = worker.submit(kind, payload)
+                    else:
+                        raise ValueError(f"unknown request {kind!r}")
+                    reply = ('ok', result)
+                except Exception as e:
+                    reply = ('error', f"{type(e).__name__}: {e}")
+                connection.send(reply)
+        finally:
+            for worker in used:
+                worker.detach(connection)
+            connection.close()
+    
+    def stats(self):
+        """{model: {'batches', 'items'}} - items / batches is the mean batch size"""
+        return {name: {'batches': w.batches, 'items': w.items} for name, w in self.workers.items()}
+    
+    def close(self):
+        """Stop accepting clients, stop the workers and remove the socket"""
+        self.running = False
+        if self.listener is not None:
+            self.listener.close()
+        for worker in self.workers.values():
+            worker.stop()
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+class ModelClient:
+    """
+    One connection to a ModelServer (one request in flight at a time)
+    
+    Replies are unpickled, so a socket owned by another user is refused.
+    """
+    
+    def __init__(self, address=None, authkey=None):
+        self.address = address or default_address()
+        self.authkey = authkey or default_authkey()
+        if os.stat(self.address).st_uid != os.getuid():
+            raise PermissionError(f"{self.address} belongs to another user")
+        self.connection = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+        self.lock = threading.Lock()
+    
+    def call(self, kind, payload=None):
+        """Send one request and wait for its result"""
+        with self.lock:
+            self.connection.send((kind, payload))
+            status, result = self.connection.recv()
+        if status != 'ok':
+            raise RuntimeError(f"Model server: {result}")
+        return result
+    
+    def close(self):
+        self.connection.close()
+
+class RemoteObjectDetector(BaseObjectDetector):
+    """
+    Detector client whose forward passes run in a ModelServer
+    
+    detect, detect_batch, detect_tiles and the last_* results behave as in
+    ObjectDetector; the input size is set where the server loads the model.
+    """
+    
+    def __init__(self, client, info):
+        super().__init__(info['names'], info['confidence'], info['input_size'], info['candidate_confidence'])
+        self.client = client
+        self.precision = info['precision']
+    
+    def _detect_contexts(self, contexts):
+        return self.client.call('detect', [context.frame for context in contexts])
+
+class RemoteDepthEstimator(BaseDepthEstimator):
+    """Depth client whose MiDaS forward passes run in a ModelServer"""
+    
+    def __init__(self, client, info):
+        super().__init__()
+        self.client = client
+        self.precision = info['precision']
+    
+    def _predict(self, scaled_rgbs):
+        return self.client.call('depth', list(scaled_rgbs))
+
+class RemoteSceneAnalyzer(BaseSceneAnalyzer):
+    """
+    Scene client whose CLIP passes run in a ModelServer
+    
+    The scene-change caches of analyze() are kept here, per client, so an
+    unchanged scene costs no request at all; the centre crop is made
+    locally and only the 224px crop is sent. Embeddings are numpy arrays.
+    """
+    
+    def __init__(self, client, info):
+        super().__init__(info['input_resolution'], info['thumbnail_threshold'], info['embedding_similarity'],
+                         info['max_scene_age'])
+        self.client = client
+        self.model_name = info['model_name']
+    
+    def encode_frame(self, frame):
+        return self.encode_images([self.clip_input(frame)])
+    
+    def encode_images(self, images):
+        return np.stack(self.client.call('encode', list(images)))
+    
+    def classify_batch(self, image_features):
+        return self.client.call('classify', list(np.asarray(image_features, dtype=np.float32)))
+
+def _listening(address):
+    """True when a server accepts connections on the Unix socket at address"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(address)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+def connect_models(address=None, authkey=None):
+    """
+    Clients for every model a running ModelServer hosts
+    
+    Each client has its own connection, so pipelined workers do not wait
+    on each other (and the server does not hold a lone app's requests back
+    for batching).
+    Returns: (detector, depth_estimator, scene_analyzer) - None where the server hosts no such model
+    """
+    address = address or default_address()
+    authkey = authkey or default_authkey()
+    client = ModelClient(address, authkey)
+    info = client.call('info')
+    detector = RemoteObjectDetector(client, info['detector']) if info['detector'] else None
+    depth = RemoteDepthEstimator(ModelClient(address, authkey), info['depth']) if info['depth'] else None
+    analyzer = RemoteSceneAnalyzer(ModelClient(address, authkey), info['scene']) if info['scene'] else None
+    return detector, depth, analyzer
@@ -0,0 +1,105 @@
+"""
+Motion gate - skips model runs while the scene is static
+"""
+import time
+
+import cv2
+import numpy as np
+
+from vision.frame_context import FrameContext
+
+# Defaults used when no config is supplied (mirrors config.yaml)
+# threshold: fraction of thumbnail pixels that must change since the module last ran
+# max_staleness: seconds after which the module runs even in a static scene
+DEFAULT_GATES = {
+    'detection': {'threshold': 0.01, 'max_staleness': 1.0},
+    'depth': {'threshold': 0.02, 'max_staleness': 2.0},
+    'scene': {'threshold': 0.10, 'max_staleness': 10.0},
+}
+
+class MotionGate:
+    """
+    Cheap per-frame change estimate shared by all modules.
+    
+    Each frame is reduced once to a small blurred grayscale thumbnail with
+    its mean removed (so auto-exposure shifts do not count as motion).
+    Every module remembers the thumbnail of the frame it last ran on; the
+    change for that module is the fraction of thumbnail pixels that differ
+    from it by more than pixel_threshold. Slow drift therefore accumulates
+    until it crosses the module's threshold.
+    """
+    
+    def __init__(self, thumbnail_width=64, pixel_threshold=12, gates=None):
+        self.thumbnail_width = thumbnail_width
+        self.pixel_threshold = pixel_threshold
+        self.gates = {name: dict(settings) for name, settings in (gates or DEFAULT_GATES).items()}
+        self.thumbnail = None
+        self.frame_change = 0.0  # change versus the previous frame
+        self.references = {}  # module name -> (thumbnail, time) of its last run
+        self.skipped = {name: 0 for name in self.gates}
+    
+    @classmethod
+    def from_config(cls, config):
+        """Build from the 'motion_gate' section of config.yaml (None if disabled)"""
+        settings = config.get('motion_gate') or {}
+        if not settings.get('enabled', True):
+            return None
+        gates = dict(DEFAULT_GATES)
+        for name, overrides in (settings.get('modules') or {}).items():
+            gates[name] = {**DEFAULT_GATES.get(name, {}), **overrides}
+        return cls(
+            thumbnail_width=settings.get('thumbnail_width', 64),
+            pixel_threshold=settings.get('pixel_threshold', 12),
+            gates=gates,
+        )
+    
+    def update(self, frame):
+        """
+        Compute the thumbnail of a new frame (frame or FrameContext, once per frame)
+        Returns: fraction of pixels changed since the previous frame
+        """
+        context = FrameContext.of(frame)
+        h, w = context.shape[:2]
+        size = (self.thumbnail_width, max(1, round(self.thumbnail_width * h / w)))
+        small = context.resized(size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        small = cv2.GaussianBlur(small, (3, 3), 0).astype(np.int16)
+        thumbnail = small - np.int16(small.mean())
+        
+        previous = self.thumbnail
+        self.thumbnail = thumbnail
+        self.frame_change = 1.0 if previous is None else self._changed_fraction(previous)
+        return self.frame_change
+    
+    def change(self, name):
+        """Fraction of pixels changed since the module last ran (1.0 if it never ran)"""
+        reference = self.references.get(name)
+        if reference is None or self.thumbnail is None:
+            return 1.0
+        return self._changed_fraction(reference[0])
+    
+    def should_run(self, name, now=None):
+        """True if the scene changed enough for the module, or its result is too old"""
+        gate = self.gates.get(name)
+        reference = self.references.get(name)
+        if gate is None or reference is None:
+            return True
+        now = time.time() if now is None else now
+        if now - reference[1] >= gate['max_staleness'] or self.change(name) > gate['threshold']:
+            return True
+        self.skipped[name] = self.skipped.get(name, 0) + 1
+        return False
+    
+    def mark_run(self, name, now=None):
+        """Remember the current frame as the module's reference"""
+        self.references[name] = (self.thumbnail, time.time() if now is None else now)
+    
+    def reset(self):
+        """Force every module to run on the next frame"""
+        self.references = {}
+    
+    def _changed_fraction(self, reference):
+        if reference.shape != self.thumbnail.shape:
+            return 1.0
+        return float(np.count_nonzero(np.abs(self.thumbnail - reference) > self.pixel_threshold)) / reference.size
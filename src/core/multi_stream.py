@@ -0,0 +1,257 @@
+"""
+Multi-stream mode - several camera streams served by one set of loaded models
+"""
+import threading
+import time
+
+import cv2
+
+class StreamReader(threading.Thread):
+    """
+    Reads one FrameSource on its own thread into a one-frame slot
+    
+    With drop_frames the slot only ever holds the newest frame (live
+    cameras: a stream that falls behind skips frames instead of lagging).
+    Without it the reader waits until its frame was taken, so every frame
+    of a video file is processed.
+    """
+    
+    def __init__(self, name, source, condition, drop_frames=True, width=None):
+        super().__init__(name=f"stream-{name}", daemon=True)
+        self.source = source
+        self.condition = condition  # shared with the coordinator, notified on every new frame
+        self.drop_frames = drop_frames
+        self.width = width  # frames are resized to this width on the reader thread (None = as read)
+        self.item = None  # (frame, capture_time) not yet taken
+        self.finished = False
+        self.stopping = False
+        self.frames = 0
+        self.dropped = 0
+    
+    def run(self):
+        while not self.stopping:
+            ret, frame = self.source.read()
+            capture_time = time.perf_counter()
+            if ret and self.width and frame.shape[1] != self.width:
+                h, w = frame.shape[:2]
+                frame = cv2.resize(frame, (self.width, int(h * self.width / w)))
+            with self.condition:
+                if not ret:
+                    break
+                while not self.drop_frames and self.item is not None and not self.stopping:
+                    self.condition.wait()
+                if self.item is not None:
+                    self.dropped += 1
+                self.item = (frame, capture_time)
+                self.frames += 1
+                self.condition.notify_all()
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+    
+    def take(self):
+        """Pending (frame, capture_time) or None; call with the condition held"""
+        item, self.item = self.item, None
+        if item is not None and not self.drop_frames:
+            self.condition.notify_all()  # let the reader fetch the next frame
+        return item
+    
+    @property
+    def done(self):
+        """Source exhausted and its last frame taken"""
+        return self.finished and self.item is None
+    
+    def stop(self, timeout=1.0):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.join(timeout)
+
+class Stream:
+    """One input of a MultiStreamSystem: its reader and its per-stream DristiSystem"""
+    
+    def __init__(self, name, system, reader):
+        self.name = name
+        self.system = system
+        self.reader = reader
+        self.processed = 0
+        self.batched = 0  # frames whose detection ran in a cross-stream batch
+
+class MultiStreamSystem:
+    """
+    N camera streams served by the models of one DristiSystem.
+    
+    Each stream gets its own DristiSystem (see DristiSystem.new_stream) that
+    shares the detector, depth estimator, scene analyzer, voice and metrics,
+    but keeps its own objects, tracks, scene, narration timers, scheduler and
+    hazard state. Every stream's source is read on its own thread.
+    
+    Each step takes at most one frame per stream, starting from a different
+    stream every time, so a fast source cannot starve a slow one. The
+    detector runs once for all streams whose detection is due: the batch is
+    whatever arrived within batch_window of the first frame (at most
+    max_batch frames per forward pass), so it grows with the number of busy
+    streams and never waits for an idle one. The other modules then run per
+    stream, one after another; the frame budget of the base scheduler is
+    split between the streams.
+    
+    Batched detection ignores the motion gate (a static stream in a batch
+    is still detected, which costs little); it keeps gating depth and scene.
+    """
+    
+    def __init__(self, system, max_batch=8, batch_window=0.005):
+        """
+        Args:
+            system: DristiSystem owning the models (its own state is not used)
+            max_batch: most frames per detector forward pass
+            batch_window: seconds to wait for frames of other streams once one arrived
+        """
+        self.system = system
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.streams = []
+        self.condition = threading.Condition()
+        self.next_stream = 0  # round-robin start of the next step
+        self.steps = 0
+        self.batches = 0
+        self.started = False
+    
+    def add_stream(self, name, source, drop_frames=None, width=None, **overrides):
+        """
+        Add a stream (before start)
+        
+        Args:
+            name: label used in stats
+            source: object with read() -> (ret, frame), e.g. a FrameSource
+            drop_frames: keep only the newest frame when the stream falls behind
+                         (None = drop for live sources - cameras and real-time replays -,
+                         keep every frame of a file replayed with pacing 'max')
+            width: resize frames to this width on the reader thread (None = as read)
+            overrides: DristiSystem arguments for this stream (e.g. hazard_watcher=False)
+        Returns: the stream's DristiSystem
+        """
+        if drop_frames is None:
+            drop_frames = getattr(source, 'live', True)
+        system = self.system.new_stream(**{'stream_id': name, **overrides})
+        reader = StreamReader(name, source, self.condition, drop_frames, width)
+        self.streams.append(Stream(name, system, reader))
+        
+        # Streams share the CPU: each gets an equal part of the frame budget
+        for stream in self.streams:
+            stream.system.scheduler.budget_fraction = self.system.scheduler.budget_fraction / len(self.streams)
+        return system
+    
+    def start(self):
+        """Start reading all streams"""
+        for stream in self.streams:
+            stream.reader.start()
+        self.started = True
+    
+    def stop(self):
+        """Stop the readers and release the sources"""
+        for stream in self.streams:
+            stream.reader.stop()
+            if hasattr(stream.reader.source, 'release'):
+                stream.reader.source.release()
+        self.started = False
+    
+    @property
+    def finished(self):
+        """All sources exhausted and every frame processed"""
+        with self.condition:
+            return all(stream.reader.done for stream in self.streams)
+    
+    def _gather(self, timeout):
+        """One pending (stream, frame, capture_time) per stream, in round-robin order"""
+        with self.condition:
+            deadline = time.perf_counter() + timeout
+            while not any(stream.reader.item is not None for stream in self.streams):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or all(stream.reader.finished for stream in self.streams):
+                    return []
+                self.condition.wait(remaining)
+            
+            # Give the other busy streams a moment to join the batch
+            deadline = time.perf_counter() + self.batch_window
+            while True:
+                waiting = [s for s in self.streams if s.reader.item is None and not s.reader.finished]
+                remaining = deadline - time.perf_counter()
+                if not waiting or remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            
+            count = len(self.streams)
+            order = self.streams[self.next_stream:] + self.streams[:self.next_stream]
+            self.next_stream = (self.next_stream + 1) % count
+            ready = []
+            for stream in order:
+                item = stream.reader.take()
+                if item is not None:
+                    ready.append((stream,) + item)
+            return ready
+    
+    def step(self, timeout=0.1):
+        """
+        Process the pending frame of every stream that has one
+        
+        Args:
+            timeout: seconds to wait for the first frame
+        Returns: list of (stream name, frame, annotated_frame, detected_objects, scene_info)
+        """
+        if not self.started:
+            self.start()
+        ready = self._gather(timeout)
+        if not ready:
+            return []
+        
+        # One forward pass for every stream whose detection is due
+        due = [index for index, (stream, _, _) in enumerate(ready) if stream.system.detection_due()]
+        detections = [None] * len(ready)
+        if due:
+            batch = self.system.detect_batch([ready[index][1] for index in due], self.max_batch)
+            self.batches += 1
+            for index, found in zip(due, batch):
+                detections[index] = found
+                ready[index][0].system.batch_detect_share = self.system.batch_detect_share
+                ready[index][0].batched += 1
+        
+        results = []
+        for (stream, frame, capture_time), found in zip(ready, detections):
+            annotated_frame, objects, scene = stream.system.process_frame(frame, capture_time, found)
+            stream.processed += 1
+            results.append((stream.name, frame, annotated_frame, objects, scene))
+        self.steps += 1
+        return results
+    
+    def run(self, max_frames=None, on_frame=None):
+        """
+        Process all streams until every source is exhausted
+        
+        Args:
+            max_frames: stop after this many frames in total (None = until exhausted)
+            on_frame: optional callback(stream name, frame, annotated_frame, detected_objects,
+                      scene_info); returning False stops the run
+        Returns: number of frames processed
+        """
+        processed = 0
+        try:
+            while not self.finished and (max_frames is None or processed < max_frames):
+                for result in self.step():
+                    processed += 1
+                    if on_frame is not None and on_frame(*result) is False:
+                        return processed
+        finally:
+            self.stop()
+        return processed
+    
+    def stats(self):
+        """Per-stream counters: {name: {'processed', 'batched', 'dropped', 'fps'}}"""
+        return {
+            stream.name: {
+                'processed': stream.processed,
+                'batched': stream.batched,
+                'dropped': stream.reader.dropped,
+                'fps': stream.system.fps,
+            }
+            for stream in self.streams
+        }
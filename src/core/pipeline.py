@@ -0,0 +1,77 @@
+"""
+Pipeline building blocks for running vision modules on worker threads
+"""
+import threading
+import time
+
+class LatestFrameSlot:
+    """Single-item mailbox that only ever holds the newest frame"""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self.dropped = 0
+    
+    def put(self, item):
+        """Store item, replacing (and dropping) any frame not yet consumed"""
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify()
+    
+    def get(self, timeout=None):
+        """Wait for the newest item. Returns None on timeout or wake()"""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+    
+    def wake(self):
+        """Release any thread blocked in get()"""
+        with self._cond:
+            self._cond.notify_all()
+
+class ModuleWorker(threading.Thread):
+    """Runs one module on the newest submitted frame and publishes its result"""
+    
+    def __init__(self, name, process_fn, on_result):
+        """
+        Args:
+            name: module name used when publishing results
+            process_fn: callable(frame) -> result
+            on_result: callable(name, frame_id, result, seconds), called on the worker
+                       thread (seconds = time process_fn took)
+        """
+        super().__init__(name=f"dristi-{name}", daemon=True)
+        self.module_name = name
+        self.process_fn = process_fn
+        self.on_result = on_result
+        self.slot = LatestFrameSlot()
+        self._stop_event = threading.Event()
+    
+    def submit(self, frame_id, frame):
+        """Hand a frame to the worker (stale pending frames are dropped)"""
+        self.slot.put((frame_id, frame))
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            item = self.slot.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, frame = item
+            start = time.perf_counter()
+            try:
+                result = self.process_fn(frame)
+            except Exception as e:
+                print(f"⚠️  {self.module_name} worker failed on frame {frame_id}: {e}")
+                continue
+            self.on_result(self.module_name, frame_id, result, time.perf_counter() - start)
+    
+    def stop(self, timeout=1.0):
+        """Signal the worker to exit and wait for it"""
+        self._stop_event.set()
+        self.slot.wake()
+        if self.is_alive():
+            self.join(timeout)
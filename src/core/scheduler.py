@@ -0,0 +1,176 @@
+"""
+Adaptive module scheduler - replaces fixed per-module frame intervals
+"""
+import math
+
+# Defaults used when no config is supplied (mirrors config.yaml)
+DEFAULT_MODULES = {
+    'detection': {'priority': 0, 'interval': 1, 'min_interval': 1, 'max_interval': 5},
+    'depth': {'priority': 1, 'interval': 2, 'min_interval': 1, 'max_interval': 10},
+    'scene': {'priority': 2, 'interval': 30, 'min_interval': 15, 'max_interval': 120},
+    'tiles': {'priority': 3, 'interval': 10, 'min_interval': 5, 'max_interval': 60},
+}
+
+class ModuleSchedule:
+    """Scheduling state for one module"""
+    
+    __slots__ = ('name', 'priority', 'interval', 'min_interval', 'max_interval',
+                 'latency', 'last_run_frame')
+    
+    def __init__(self, name, priority, interval, min_interval, max_interval):
+        self.name = name
+        self.priority = priority  # 0 = most important
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.latency = None  # EMA of measured run time (seconds)
+        self.last_run_frame = None
+    
+    def cost_per_frame(self):
+        """Amortized seconds per frame at the current interval"""
+        return (self.latency or 0.0) / self.interval
+
+class AdaptiveScheduler:
+    """
+    Decides which modules run on each frame.
+    
+    The per-frame compute budget is budget_fraction / target_fps seconds.
+    Every adjust_every frames the amortized cost of all modules is compared
+    with the budget: when over budget, the lowest-priority module (CLIP first)
+    is slowed down; when there is headroom, the highest-priority module
+    (detection first) is sped up again. Detection is only slowed once every
+    other module is already at its max_interval.
+    """
+    
+    def __init__(self, target_fps=15, budget_fraction=0.8, adjust_every=10, adaptive=True, modules=None):
+        self.target_fps = target_fps
+        self.budget_fraction = budget_fraction
+        self.adjust_every = adjust_every
+        self.adaptive = adaptive
+        self.ema_alpha = 0.2
+        self.modules = {}
+        self.frame_spent = 0.0
+        
+        for name, settings in (modules or DEFAULT_MODULES).items():
+            self.add_module(name, **settings)
+    
+    @classmethod
+    def from_config(cls, config, target_fps=None):
+        """Build from the 'scheduler' section of config.yaml"""
+        settings = config.get('scheduler') or {}
+        modules = dict(DEFAULT_MODULES)
+        for name, overrides in (settings.get('modules') or {}).items():
+            modules[name] = {**DEFAULT_MODULES.get(name, {}), **overrides}
+        
+        return cls(
+            target_fps=target_fps or (config.get('display') or {}).get('target_fps', 15),
+            budget_fraction=settings.get('budget_fraction', 0.8),
+            adjust_every=settings.get('adjust_every_n_frames', 10),
+            adaptive=settings.get('adaptive', True),
+            modules=modules,
+        )
+    
+    def add_module(self, name, priority=1, interval=1, min_interval=1, max_interval=None):
+        """Register (or replace) a module"""
+        max_interval = max_interval or interval
+        self.modules[name] = ModuleSchedule(name, priority, interval, min_interval, max_interval)
+    
+    @property
+    def frame_budget(self):
+        """Seconds of model compute allowed per frame"""
+        return self.budget_fraction / self.target_fps
+    
+    def interval(self, name):
+        return self.modules[name].interval
+    
+    def set_interval(self, name, interval):
+        """Pin a module to a fixed interval (disables adaptation for it)"""
+        module = self.modules[name]
+        module.interval = module.min_interval = module.max_interval = max(1, int(interval))
+    
+    def begin_frame(self):
+        """Reset the per-frame budget"""
+        self.frame_spent = 0.0
+    
+    def should_run(self, name, frame_count):
+        """
+        True if the module is due on this frame and fits in what is left of
+        the frame budget. The top-priority module is never deferred, and a
+        deferred module runs anyway once it is a full interval overdue.
+        """
+        module = self.modules.get(name)
+        if module is None:
+            return False
+        if module.last_run_frame is None:
+            return frame_count % module.interval == 0
+        
+        waited = frame_count - module.last_run_frame
+        if waited < module.interval:
+            return False
+        if not self.adaptive or module.latency is None:
+            return True
+        if module.priority == min(m.priority for m in self.modules.values()):
+            return True
+        if waited >= 2 * module.interval:
+            return True
+        return self.frame_spent + module.latency <= self.frame_budget
+    
+    def record(self, name, seconds, frame_count):
+        """Record a module run (its measured latency) on frame_count"""
+        module = self.modules[name]
+        module.last_run_frame = frame_count
+        if module.latency is None:
+            module.latency = seconds
+        else:
+            module.latency += self.ema_alpha * (seconds - module.latency)
+        self.frame_spent += seconds
+    
+    def end_frame(self, frame_count):
+        """Periodically rebalance intervals against the budget"""
+        if self.adaptive and frame_count % self.adjust_every == 0:
+            self.rebalance()
+    
+    def load(self):
+        """Total amortized compute per frame (seconds)"""
+        return sum(module.cost_per_frame() for module in self.modules.values())
+    
+    def can_afford(self, name):
+        """True if the module's last measured run fits in what is left of this frame's budget"""
+        module = self.modules.get(name)
+        if module is None:
+            return False
+        return module.latency is None or self.frame_spent + module.latency <= self.frame_budget
+    
+    def has_headroom(self, seconds=0.0):
+        """True if `seconds` of extra work per frame still fits in the budget"""
+        return self.load() + seconds <= self.frame_budget
+    
+    def rebalance(self):
+        """Slow the least important modules when over budget, speed up the most important when under"""
+        budget = self.frame_budget
+        measured = [m for m in self.modules.values() if m.latency is not None]
+        
+        if self.load() > budget:
+            # Shed load starting with the least important module
+            for module in sorted(measured, key=lambda m: -m.priority):
+                while self.load() > budget and module.interval < module.max_interval:
+                    module.interval = min(module.max_interval, math.ceil(module.interval * 1.5))
+                if self.load() <= budget:
+                    break
+        
+        elif self.load() < 0.7 * budget:
+            # Give headroom back starting with the most important module
+            for module in sorted(measured, key=lambda m: m.priority):
+                while module.interval > module.min_interval:
+                    faster = max(module.min_interval, math.floor(module.interval / 1.5))
+                    extra = module.latency / faster - module.cost_per_frame()
+                    if self.load() + extra > 0.9 * budget:
+                        break
+                    module.interval = faster
+    
+    def status(self):
+        """Current intervals and latencies (for logging/overlay)"""
+        return {
+            name: {'interval': m.interval, 'latency_ms': (m.latency or 0.0) * 1000.0}
+            for name, m in self.modules.items()
+        }
@@ -1,64 +1,106 @@
 """
 Depth Estimation Module using MiDaS
 """
+import os
 import torch
 import cv2
 import numpy as np
 
-class DepthEstimator:
-    """Handles depth estimation using MiDaS"""
+from vision.frame_context import FrameContext
+from vision.rendering import colorize_depth
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dristi')
+
+# MiDaS_small is exported for ONNX Runtime at its native 256x256 input
+ONNX_INPUT_SIZE = 256
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+# Distance categories, ordered far -> near. A normalized depth d (higher = closer)
+# falls in category i where DISTANCE_THRESHOLDS[i-1] < d <= DISTANCE_THRESHOLDS[i]
+DISTANCE_THRESHOLDS = np.array([0.20, 0.35, 0.55, 0.75], dtype=np.float32)
+DISTANCE_TEXT = np.array([
+    "Very Far (> 3m)", "Far (2-3m)", "Medium (1-2m)", "Close (0.5-1m)", "Very Close (< 0.5m)"
+], dtype=object)
+DISTANCE_VALUES = np.array([4.0, 2.5, 1.5, 0.8, 0.3])
+DISTANCE_COLORS = [
+    (0, 200, 0),  # Dark green
+    (0, 255, 0),  # Green
+    (0, 255, 255),  # Yellow
+    (0, 165, 255),  # Orange
+    (0, 0, 255),  # Red
+]
+UNKNOWN_DISTANCE = ("Unknown", 0.5, (255, 255, 255))
+
+class BaseDepthEstimator:
+    """
+    Frame-level depth API shared by DepthEstimator and its model server client
     
-    def __init__(self, device='cpu'):
-        """Initialize MiDaS model"""
-        self.device = torch.device(device)
-        self.midas = torch.hub.load("intel-isl/MiDaS", "MiDaS_small", trust_repo=True)
-        self.midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms", trust_repo=True)
-        self.transform = self.midas_transforms.small_transform
-        
-        self.midas.to(self.device)
-        self.midas.eval()
+    Subclasses implement _predict (the model call); depth maps, batches and
+    distance categories are built on it.
+    """
+    
+    def __init__(self):
         self.depth_map_normalized = None
         self.depth_colored = None
     
-    def estimate(self, frame, scale=0.5):
+    def estimate(self, frame, scale=0.5, upsample=True, colorize=True):
         """
         Estimate depth map for frame with GPU acceleration
+        
+        With upsample=False the map stays at the processing resolution
+        (frame size * scale); use estimate_distances() with frame_shape to
+        sample it with frame-space bounding boxes. With colorize=False the
+        visualization is skipped (None) and only built if get_colored_depth()
+        is called later. frame may be a FrameContext shared with the other
+        modules.
         Returns: (depth_map_normalized, depth_colored_visualization)
         """
-        # Resize for faster processing
-        h, w = frame.shape[:2]
-        scaled_frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
-        
-        img_for_depth = cv2.cvtColor(scaled_frame, cv2.COLOR_BGR2RGB)
-        input_batch = self.transform(img_for_depth).to(self.device)
-        
-        with torch.no_grad():
-            prediction = self.midas(input_batch)
-            # Use GPU-accelerated interpolation on tensor
-            prediction = torch.nn.functional.interpolate(
-                prediction.unsqueeze(1),
-                size=scaled_frame.shape[:2],
-                mode="bilinear",
-                align_corners=False,
-            ).squeeze()
-        
-        # Transfer to CPU only for final visualization
-        depth_map = prediction.cpu().detach().numpy()
+        # Resize for faster processing (RGB converted at the reduced size, cached per frame)
+        context = FrameContext.of(frame)
+        h, w = context.shape[:2]
+        scaled_rgb = context.resized((int(w * scale), int(h * scale)), rgb=True)
+        depth_map, = self._predict([scaled_rgb])
         
         # Upscale back to original size
-        depth_map = cv2.resize(depth_map, (w, h), interpolation=cv2.INTER_LINEAR)
+        if upsample:
+            depth_map = cv2.resize(depth_map, (w, h), interpolation=cv2.INTER_LINEAR)
         
         # Normalize depth map
         self.depth_map_normalized = cv2.normalize(
             depth_map, None, 0, 1, cv2.NORM_MINMAX, dtype=cv2.CV_32F
         )
         
-        # Create colored visualization
-        depth_map_8bit = (self.depth_map_normalized * 255).astype(np.uint8)
-        self.depth_colored = cv2.applyColorMap(depth_map_8bit, cv2.COLORMAP_MAGMA)
+        # Colored visualization is built lazily (see get_colored_depth)
+        self.depth_colored = None
+        if colorize:
+            self.depth_colored = colorize_depth(self.depth_map_normalized)
         
         return self.depth_map_normalized, self.depth_colored
     
+    def estimate_batch(self, frames, scale=0.5):
+        """
+        Depth maps of several frames (e.g. one per camera) with as few forward passes as possible
+        
+        The ONNX model takes a fixed 256px input (each frame letterboxed into
+        it), so all frames go through one pass; with PyTorch, frames whose MiDaS inputs have the same size are
+        stacked. depth_map_normalized is not updated.
+        Returns: list of normalized depth maps at the processing resolution (frame size * scale)
+        """
+        scaled = []
+        for frame in frames:
+            context = FrameContext.of(frame)
+            h, w = context.shape[:2]
+            scaled.append(context.resized((int(w * scale), int(h * scale)), rgb=True))
+        return [
+            cv2.normalize(depth_map, None, 0, 1, cv2.NORM_MINMAX, dtype=cv2.CV_32F)
+            for depth_map in self._predict(scaled)
+        ]
+    
+    def _predict(self, scaled_rgbs):
+        """Raw MiDaS depth for RGB images, each at its own size. Returns: list of float32 maps"""
+        raise NotImplementedError
+    
     def estimate_distance(self, depth_map, bbox):
         """
         Estimate distance category from depth map and bounding box
@@ -74,36 +116,187 @@ class DepthEstimator:
         roi = depth_map[y1:y2, x1:x2]
         
         if roi.size == 0:
-            return "Unknown", 0.5, (255, 255, 255)
-        
-        # Get median depth
-        median_depth = np.median(roi)
-        normalized_depth = median_depth
-        
-        # Categorize distance
-        if normalized_depth > 0.75:
-            distance_text = "Very Close (< 0.5m)"
-            color = (0, 0, 255)  # Red
-            distance_val = 0.3
-        elif normalized_depth > 0.55:
-            distance_text = "Close (0.5-1m)"
-            color = (0, 165, 255)  # Orange
-            distance_val = 0.8
-        elif normalized_depth > 0.35:
-            distance_text = "Medium (1-2m)"
-            color = (0, 255, 255)  # Yellow
-            distance_val = 1.5
-        elif normalized_depth > 0.20:
-            distance_text = "Far (2-3m)"
-            color = (0, 255, 0)  # Green
-            distance_val = 2.5
-        else:
-            distance_text = "Very Far (> 3m)"
-            color = (0, 200, 0)  # Dark green
-            distance_val = 4.0
+            return UNKNOWN_DISTANCE
         
-        return distance_text, distance_val, color
+        # Get median depth and categorize distance
+        category = int(np.digitize(np.median(roi), DISTANCE_THRESHOLDS, right=True))
+        return DISTANCE_TEXT[category], float(DISTANCE_VALUES[category]), DISTANCE_COLORS[category]
+    
+    @staticmethod
+    def estimate_distances(depth_map, bboxes, frame_shape=None, samples=7):
+        """
+        Estimate distance categories for all bounding boxes at once.
+        
+        Each box is sampled on a samples x samples grid directly on the
+        (possibly low-resolution) depth map and the median of the samples is
+        categorized with np.digitize. No per-object Python loop.
+        
+        Args:
+            depth_map: normalized depth map (any resolution)
+            bboxes: (N, 4) x1, y1, x2, y2 in frame coordinates
+            frame_shape: shape of the frame the boxes refer to (None = depth map shape)
+            samples: grid points per axis
+        Returns: (distance_texts, distance_values, categories) arrays of length N;
+                 category -1 / "Unknown" / 0.5 for boxes outside the map
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        n = len(bboxes)
+        if n == 0:
+            return np.empty(0, dtype=object), np.empty(0), np.empty(0, dtype=np.intp)
+        
+        map_h, map_w = depth_map.shape[:2]
+        frame_h, frame_w = (frame_shape or depth_map.shape)[:2]
+        
+        # Frame coordinates -> depth map coordinates, clipped to the map
+        boxes = bboxes * np.array([map_w / frame_w, map_h / frame_h] * 2, dtype=np.float32)
+        boxes[:, 0::2] = np.clip(boxes[:, 0::2], 0, map_w)
+        boxes[:, 1::2] = np.clip(boxes[:, 1::2], 0, map_h)
+        valid = (boxes[:, 2] - boxes[:, 0] >= 1) & (boxes[:, 3] - boxes[:, 1] >= 1)
+        
+        # Sample pixel centres of a regular grid inside every box: (N, samples)
+        t = (np.arange(samples, dtype=np.float32) + 0.5) / samples
+        xs = boxes[:, 0:1] + (boxes[:, 2:3] - boxes[:, 0:1]) * t
+        ys = boxes[:, 1:2] + (boxes[:, 3:4] - boxes[:, 1:2]) * t
+        xs = np.clip(xs.astype(np.intp), 0, map_w - 1)
+        ys = np.clip(ys.astype(np.intp), 0, map_h - 1)
+        
+        # (N, samples, samples) depth samples -> robust per-box median
+        values = depth_map[ys[:, :, None], xs[:, None, :]]
+        medians = np.median(values.reshape(n, -1), axis=1)
+        
+        categories = np.digitize(medians, DISTANCE_THRESHOLDS, right=True)
+        categories[~valid] = -1
+        
+        texts = np.where(valid, DISTANCE_TEXT[categories], UNKNOWN_DISTANCE[0])
+        distance_values = np.where(valid, DISTANCE_VALUES[categories], UNKNOWN_DISTANCE[1])
+        return texts, distance_values, categories
     
     def get_colored_depth(self):
-        """Get last colored depth visualization"""
+        """Get last colored depth visualization (colorized on first request)"""
+        if self.depth_colored is None and self.depth_map_normalized is not None:
+            self.depth_colored = colorize_depth(self.depth_map_normalized)
         return self.depth_colored
+
+class DepthEstimator(BaseDepthEstimator):
+    """Handles depth estimation using MiDaS"""
+    
+    def __init__(self, device='cpu', backend='torch', precision='fp32', calibration_frames=None,
+                 num_threads=None, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Initialize MiDaS model
+        
+        Args:
+            backend: 'torch' or 'onnx' (ONNX Runtime; exported once to cache_dir)
+            precision: 'fp32' or 'int8' (INT8 quantized ONNX model, implies backend='onnx')
+            calibration_frames: BGR frames for static INT8 calibration
+                                (None = dynamic quantization)
+            num_threads: ONNX Runtime intra-op threads (None = runtime default)
+        """
+        if backend not in ('torch', 'onnx'):
+            raise ValueError(f"backend must be 'torch' or 'onnx', got {backend!r}")
+        if precision not in ('fp32', 'int8'):
+            raise ValueError(f"precision must be 'fp32' or 'int8', got {precision!r}")
+        if precision == 'int8':
+            backend = 'onnx'
+        
+        super().__init__()
+        self.device = torch.device(device)
+        self.backend = backend
+        self.precision = precision
+        self.midas = torch.hub.load("intel-isl/MiDaS", "MiDaS_small", trust_repo=True)
+        self.midas_transforms = torch.hub.load("intel-isl/MiDaS", "transforms", trust_repo=True)
+        self.transform = self.midas_transforms.small_transform
+        
+        self.midas.eval()
+        self.onnx = None
+        if backend == 'onnx':
+            self._load_onnx(calibration_frames, num_threads, cache_dir)
+        else:
+            self.midas.to(self.device)
+    
+    def _load_onnx(self, calibration_frames, num_threads, cache_dir):
+        """Export MiDaS to ONNX once (and quantize it for precision='int8'), then load it"""
+        from vision.onnx_backend import OnnxSession
+        from vision.quantization import quantize_onnx_model
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        onnx_path = os.path.join(cache_dir, f"midas_small_{ONNX_INPUT_SIZE}.onnx")
+        if not os.path.exists(onnx_path):
+            print(f"📦 Exporting MiDaS_small to ONNX at {ONNX_INPUT_SIZE}px (one-time)...")
+            dummy = torch.zeros(1, 3, ONNX_INPUT_SIZE, ONNX_INPUT_SIZE)
+            tmp_path = onnx_path + '.tmp.onnx'
+            torch.onnx.export(self.midas.cpu(), dummy, tmp_path, opset_version=17,
+                              input_names=['image'], output_names=['depth'])
+            os.replace(tmp_path, onnx_path)
+        
+        if self.precision == 'int8':
+            calibration_inputs = None
+            suffix = '_int8_dynamic'
+            if calibration_frames:
+                calibration_inputs = [
+                    self._onnx_input(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))[0] for frame in calibration_frames
+                ]
+                suffix = '_int8'
+            onnx_path = quantize_onnx_model(
+                onnx_path, onnx_path.replace('.onnx', f'{suffix}.onnx'), calibration_inputs
+            )
+        
+        self.onnx = OnnxSession(onnx_path, num_threads=num_threads, device=str(self.device))
+    
+    @staticmethod
+    def _onnx_input(image):
+        """
+        RGB image -> ((1, 3, 256, 256) float32 input, (rows, cols) slices of the image in it)
+        
+        Like the MiDaS small transform the aspect ratio is kept: the longer
+        side is scaled to 256 and the image is centred on padding of the
+        normalization mean (0 after normalizing).
+        """
+        h, w = image.shape[:2]
+        scale = ONNX_INPUT_SIZE / max(h, w)
+        new_w, new_h = max(1, round(w * scale)), max(1, round(h * scale))
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
+        top, left = (ONNX_INPUT_SIZE - new_h) // 2, (ONNX_INPUT_SIZE - new_w) // 2
+        region = (slice(top, top + new_h), slice(left, left + new_w))
+        normalized = (image.astype(np.float32) / 255.0 - IMAGENET_MEAN) / IMAGENET_STD
+        tensor = np.zeros((1, 3, ONNX_INPUT_SIZE, ONNX_INPUT_SIZE), np.float32)
+        tensor[0, :, region[0], region[1]] = normalized.transpose(2, 0, 1)
+        return tensor, region
+    
+    def _predict(self, scaled_rgbs):
+        """MiDaS forward passes (see BaseDepthEstimator._predict)"""
+        if not scaled_rgbs:
+            return []
+        if self.onnx is None:
+            return self._estimate_torch(scaled_rgbs)
+        
+        inputs = [self._onnx_input(image) for image in scaled_rgbs]
+        predictions = self.onnx.infer(np.concatenate([tensor for tensor, _ in inputs]))
+        return [
+            cv2.resize(prediction[region].astype(np.float32), (image.shape[1], image.shape[0]),
+                       interpolation=cv2.INTER_LINEAR)
+            for image, (_, region), prediction in zip(scaled_rgbs, inputs, predictions)
+        ]
+    
+    def _estimate_torch(self, scaled_rgbs):
+        """PyTorch MiDaS forward (one per input size), interpolated to each image size"""
+        inputs = [self.transform(image) for image in scaled_rgbs]
+        groups = {}
+        for index, input_batch in enumerate(inputs):
+            groups.setdefault(tuple(input_batch.shape[1:]), []).append(index)
+        
+        depth_maps = [None] * len(scaled_rgbs)
+        with torch.no_grad():
+            for indices in groups.values():
+                predictions = self.midas(torch.cat([inputs[index] for index in indices]).to(self.device))
+                for index, prediction in zip(indices, predictions):
+                    # Use GPU-accelerated interpolation on tensor
+                    prediction = torch.nn.functional.interpolate(
+                        prediction[None, None],
+                        size=scaled_rgbs[index].shape[:2],
+                        mode="bilinear",
+                        align_corners=False,
+                    ).squeeze()
+                    # Transfer to CPU only for final visualization
+                    depth_maps[index] = prediction.cpu().detach().numpy()
+        return depth_maps
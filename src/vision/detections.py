@@ -0,0 +1,186 @@
+"""
+Compact array-backed detection records with a dict-compatible per-object view
+"""
+import numpy as np
+
+class Detections:
+    """
+    Detections of one frame stored as parallel NumPy arrays.
+    
+    Core fields are xyxy (N, 4) float32, confidence (N,) float32 and
+    class_id (N,) int32. Optional per-detection values (distance_text,
+    distance_val, ...) live in `columns`. Indexing with an int or iterating
+    yields DetectionView objects that behave like the old detection dicts
+    ({'name', 'confidence', 'bbox', 'class_id', ...}), so existing callers
+    keep working while hot paths use the arrays directly.
+    """
+    
+    __slots__ = ('xyxy', 'confidence', 'class_id', 'names', 'columns')
+    
+    def __init__(self, xyxy=None, confidence=None, class_id=None, names=None, columns=None):
+        """
+        Args:
+            xyxy: (N, 4) boxes in frame coordinates
+            confidence: (N,) scores
+            class_id: (N,) integer class ids
+            names: class id -> name lookup (e.g. model.names)
+            columns: optional {name: (N,) array} of extra per-detection values
+        """
+        self.xyxy = np.zeros((0, 4), np.float32) if xyxy is None else np.asarray(xyxy, np.float32).reshape(-1, 4)
+        n = len(self.xyxy)
+        self.confidence = np.zeros(n, np.float32) if confidence is None else np.asarray(confidence, np.float32)
+        self.class_id = np.zeros(n, np.int32) if class_id is None else np.asarray(class_id, np.int32)
+        self.names = names if names is not None else {}
+        self.columns = dict(columns) if columns else {}
+    
+    @classmethod
+    def empty(cls, names=None):
+        return cls(names=names)
+    
+    def __len__(self):
+        return len(self.xyxy)
+    
+    def __iter__(self):
+        for i in range(len(self.xyxy)):
+            yield DetectionView(self, i)
+    
+    def __getitem__(self, index):
+        """int -> DetectionView; slice / mask / index array -> Detections subset"""
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError('detection index out of range')
+            return DetectionView(self, int(index))
+        return self.subset(index)
+    
+    def __repr__(self):
+        return f"Detections({len(self)} objects: {', '.join(self.labels())})"
+    
+    def subset(self, index):
+        """New Detections holding only the selected rows"""
+        return Detections(
+            self.xyxy[index], self.confidence[index], self.class_id[index], self.names,
+            {name: values[index] for name, values in self.columns.items()}
+        )
+    
+    def copy(self):
+        return Detections(
+            self.xyxy.copy(), self.confidence.copy(), self.class_id.copy(), self.names,
+            {name: values.copy() for name, values in self.columns.items()}
+        )
+    
+    def labels(self):
+        """Class names of all detections, in order"""
+        names = self.names
+        return [names[c] for c in self.class_id.tolist()]
+    
+    def set_column(self, name, values):
+        """Set a whole optional column at once"""
+        values = np.asarray(values)
+        if len(values) != len(self):
+            raise ValueError(f"column '{name}' has {len(values)} values for {len(self)} detections")
+        self.columns[name] = values
+    
+    def get_column(self, name, default=None):
+        return self.columns.get(name, default)
+    
+    def to_dicts(self):
+        """Plain list of dicts (for serialization or legacy code)"""
+        return [view.to_dict() for view in self]
+
+class DetectionView:
+    """Dict-like view of one row of a Detections container"""
+    
+    __slots__ = ('detections', 'index')
+    
+    _CORE_KEYS = ('name', 'confidence', 'bbox', 'class_id')
+    
+    def __init__(self, detections, index):
+        self.detections = detections
+        self.index = index
+    
+    def __getitem__(self, key):
+        dets, i = self.detections, self.index
+        if key == 'name':
+            return dets.names[int(dets.class_id[i])]
+        if key == 'confidence':
+            return float(dets.confidence[i])
+        if key == 'bbox':
+            return dets.xyxy[i]
+        if key == 'class_id':
+            return int(dets.class_id[i])
+        
+        column = dets.columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        value = column[i]
+        if _is_missing(column, value):
+            raise KeyError(key)
+        return value.item() if isinstance(value, np.generic) else value
+    
+    def __setitem__(self, key, value):
+        dets, i = self.detections, self.index
+        if key == 'bbox':
+            dets.xyxy[i] = value
+        elif key == 'confidence':
+            dets.confidence[i] = value
+        elif key == 'class_id':
+            dets.class_id[i] = value
+        elif key == 'name':
+            raise KeyError("'name' is derived from class_id")
+        else:
+            column = dets.columns.get(key)
+            if column is None:
+                column = _new_column(value, len(dets))
+                dets.columns[key] = column
+            elif column.dtype != object and not np.can_cast(np.asarray(value).dtype, column.dtype, 'same_kind'):
+                column = dets.columns[key] = column.astype(object)
+            column[i] = value
+    
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self):
+        return [key for key in self._CORE_KEYS + tuple(self.detections.columns) if key in self]
+    
+    def __iter__(self):
+        return iter(self.keys())
+    
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+    
+    def to_dict(self):
+        return dict(self.items())
+    
+    def __repr__(self):
+        return f"DetectionView({self.to_dict()!r})"
+
+def _new_column(sample, n):
+    """Allocate an optional column filled with its 'missing' value"""
+    if isinstance(sample, (bool, np.bool_)) or not isinstance(sample, (int, float, np.number)):
+        return np.full(n, None, dtype=object)
+    if isinstance(sample, (float, np.floating)):
+        return np.full(n, np.nan, dtype=np.float64)
+    return np.full(n, -1, dtype=np.int32)
+
+def _is_missing(column, value):
+    """True if value is the 'not set' marker for its column"""
+    kind = column.dtype.kind
+    if kind == 'O':
+        return value is None
+    if kind == 'f':
+        return bool(np.isnan(value))
+    if kind == 'i':
+        return value == -1
+    return False
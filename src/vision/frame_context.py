@@ -0,0 +1,72 @@
+"""
+Per-frame preprocessing cache shared by all vision modules
+"""
+import cv2
+
+class FrameContext:
+    """
+    One captured frame plus every derived representation computed from it.
+    
+    Detector, depth estimator, scene analyzer and motion gate all need
+    resized and/or RGB versions of the same frame. Each representation is
+    computed on first request and reused by every later consumer of the
+    same frame, e.g. the detector's 320px resize is also the depth
+    estimator's 50% input. Module methods accept either a plain BGR frame
+    or a FrameContext (see FrameContext.of).
+    
+    Safe to share between worker threads: a representation requested
+    concurrently may be computed twice, but never incorrectly.
+    """
+    
+    __slots__ = ('frame', '_cache')
+    
+    def __init__(self, frame):
+        self.frame = frame
+        self._cache = {}
+    
+    @classmethod
+    def of(cls, frame):
+        """Wrap a plain frame; pass an existing FrameContext through unchanged"""
+        return frame if isinstance(frame, cls) else cls(frame)
+    
+    @property
+    def shape(self):
+        return self.frame.shape
+    
+    def cached(self, key, compute):
+        """Value for key, computed with compute() on first use"""
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = compute()
+        return value
+    
+    def rgb(self):
+        """Full-resolution RGB copy of the frame"""
+        return self.cached('rgb', lambda: cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB))
+    
+    def resized(self, size, rgb=False, interpolation=cv2.INTER_LINEAR):
+        """
+        Frame resized to size = (width, height), BGR or RGB
+        
+        RGB variants are converted from the (smaller) resized BGR image, so
+        the full frame is never converted just to be downscaled.
+        """
+        size = (int(size[0]), int(size[1]))
+        h, w = self.frame.shape[:2]
+        if size == (w, h):
+            return self.rgb() if rgb else self.frame
+        if rgb:
+            return self.cached(
+                ('resized', size, interpolation, True),
+                lambda: cv2.cvtColor(self.resized(size, interpolation=interpolation), cv2.COLOR_BGR2RGB)
+            )
+        return self.cached(
+            ('resized', size, interpolation, False),
+            lambda: cv2.resize(self.frame, size, interpolation=interpolation)
+        )
+    
+    def fit(self, max_side, rgb=False, interpolation=cv2.INTER_LINEAR):
+        """Frame resized so its long side is max_side (aspect ratio kept)"""
+        h, w = self.frame.shape[:2]
+        ratio = max_side / max(h, w)
+        return self.resized((int(round(w * ratio)), int(round(h * ratio))), rgb, interpolation)
@@ -0,0 +1,179 @@
+"""
+Hazard engine - one hazard table, vectorized classification and ranking
+"""
+import numpy as np
+
+from vision.detections import Detections
+
+# COCO classes considered hazards, by category
+HAZARD_CATEGORIES = {
+    'vehicles': ['car', 'truck', 'bus', 'bicycle', 'motorcycle'],
+    'traffic': ['traffic light', 'stop sign'],
+    'obstacles': ['bench', 'fire hydrant', 'parking meter'],
+    'animals': ['dog', 'cat', 'bird', 'horse'],
+}
+CATEGORY_NAMES = tuple(HAZARD_CATEGORIES)
+
+# How dangerous a category is on its own (0-1), used to rank hazards
+CATEGORY_SEVERITY = {'vehicles': 1.0, 'animals': 0.6, 'obstacles': 0.5, 'traffic': 0.3}
+
+_CATEGORY_OF_NAME = {
+    name: index for index, category in enumerate(CATEGORY_NAMES) for name in HAZARD_CATEGORIES[category]
+}
+_SEVERITY = np.array([CATEGORY_SEVERITY[category] for category in CATEGORY_NAMES], dtype=np.float32)
+
+# Proximity used when no distance estimate is available (about 1.5m)
+_UNKNOWN_PROXIMITY = 0.4
+
+class HazardReport:
+    """
+    Hazards among one frame's objects, ranked most urgent first.
+    
+    indices point into `objects`; categories are indices into
+    CATEGORY_NAMES; scores combine severity, proximity and approach;
+    approach is the smoothed growth rate of each hazard's tracked box.
+    """
+    
+    __slots__ = ('objects', 'indices', 'categories', 'scores', 'approach')
+    
+    def __init__(self, objects, indices, categories, scores, approach=None):
+        self.objects = objects
+        self.indices = indices
+        self.categories = categories
+        self.scores = scores
+        self.approach = np.zeros(len(indices), np.float32) if approach is None else approach
+    
+    @classmethod
+    def empty(cls, objects=None):
+        return cls(objects if objects is not None else Detections.empty(),
+                   np.zeros(0, np.intp), np.zeros(0, np.intp), np.zeros(0, np.float32))
+    
+    def __len__(self):
+        return len(self.indices)
+    
+    def __iter__(self):
+        """Yields (object, category name, score), most urgent first"""
+        for index, category, score in zip(self.indices.tolist(), self.categories.tolist(), self.scores.tolist()):
+            yield self.objects[index], CATEGORY_NAMES[category], score
+    
+    @property
+    def top(self):
+        """Most urgent hazard object (None if there is none)"""
+        return self.objects[int(self.indices[0])] if len(self.indices) else None
+    
+    def objects_in(self, category):
+        """Hazard objects of one category, most urgent first"""
+        selected = self.indices[self.categories == CATEGORY_NAMES.index(category)]
+        return [self.objects[index] for index in selected.tolist()]
+    
+    def count(self, category):
+        return int(np.count_nonzero(self.categories == CATEGORY_NAMES.index(category)))
+    
+    def categories_by_urgency(self):
+        """Categories present, ordered by their most urgent hazard"""
+        seen = []
+        for category in self.categories.tolist():
+            if CATEGORY_NAMES[category] not in seen:
+                seen.append(CATEGORY_NAMES[category])
+        return seen
+    
+    def by_category(self):
+        """{category: [objects]} for every category (the legacy check_hazards format)"""
+        return {category: self.objects_in(category) for category in CATEGORY_NAMES}
+
+class HazardEngine:
+    """
+    Classifies and ranks hazards for a whole frame in one vectorized pass.
+    
+    A class-id -> category lookup array is built once per class-name table
+    (model.names), so classification is a single fancy-index instead of a
+    loop over objects x category lists. The score of a hazard is
+        
+        severity(category) * proximity * (1 + approach)
+    
+    where proximity = 1 / (1 + distance in metres) when depth is available
+    and approach is the growth rate of the box area (log-area per second,
+    clipped to [0, max_approach]), taken from the tracker's time-to-contact
+    column (2 / ttc). Untracked objects get no approach term.
+    """
+    
+    def __init__(self, max_approach=2.0):
+        self.max_approach = max_approach
+        self._lookup_names = None
+        self._lookup = np.zeros(0, np.intp)
+    
+    def category_lookup(self, names):
+        """Array mapping class id -> category index (-1 = not a hazard), cached per names table"""
+        if names is not self._lookup_names:
+            items = names.items() if isinstance(names, dict) else enumerate(names)
+            items = list(items)
+            lookup = np.full(max((int(class_id) for class_id, _ in items), default=-1) + 1, -1, np.intp)
+            for class_id, name in items:
+                lookup[int(class_id)] = _CATEGORY_OF_NAME.get(name, -1)
+            self._lookup_names, self._lookup = names, lookup
+        return self._lookup
+    
+    def categorize(self, objects):
+        """Category index (-1 = none) of every object"""
+        if isinstance(objects, Detections):
+            lookup = self.category_lookup(objects.names)
+            class_id = objects.class_id.astype(np.intp)
+            known = class_id < len(lookup)
+            categories = np.full(len(class_id), -1, np.intp)
+            categories[known] = lookup[class_id[known]]
+            return categories
+        return np.array([_CATEGORY_OF_NAME.get(obj['name'], -1) for obj in objects], dtype=np.intp)
+    
+    def assess(self, objects):
+        """
+        Classify and rank the hazards among a frame's objects
+        
+        Args:
+            objects: Detections (or a list of detection dicts)
+        Returns: HazardReport
+        """
+        categories = self.categorize(objects)
+        approach = self._approach(objects)
+        hazard = np.flatnonzero(categories >= 0)
+        if not len(hazard):
+            return HazardReport.empty(objects)
+        
+        categories = categories[hazard]
+        proximity = np.full(len(hazard), _UNKNOWN_PROXIMITY, np.float32)
+        if isinstance(objects, Detections):
+            distances = objects.get_column('distance_val')
+            if distances is not None:
+                distances = np.asarray(distances, np.float32)[hazard]
+                known = np.isfinite(distances)
+                distance_categories = objects.get_column('distance_category')
+                if distance_categories is not None:
+                    known &= np.asarray(distance_categories)[hazard] >= 0  # 'Unknown' is not 0.5 m
+                proximity[known] = 1.0 / (1.0 + distances[known])
+        
+        approach = approach[hazard]
+        scores = _SEVERITY[categories] * proximity * (1.0 + approach)
+        order = np.argsort(-scores, kind='stable')
+        return HazardReport(objects, hazard[order], categories[order], scores[order].astype(np.float32),
+                            approach[order])
+    
+    def _approach(self, objects):
+        """Per-object approach term from the tracker's time to contact (0 without it)"""
+        ttc = objects.get_column('ttc') if isinstance(objects, Detections) else None
+        if ttc is None:
+            return np.zeros(len(objects), np.float32)
+        # d(log area)/dt = 2 d(log scale)/dt = 2 / ttc; NaN = not approaching
+        ttc = np.asarray(ttc, np.float32)
+        return np.clip(np.nan_to_num(2.0 / ttc, nan=0.0), 0.0, self.max_approach).astype(np.float32)
+
+_default_engine = None
+
+def default_engine():
+    """Shared engine for one-off classification"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = HazardEngine()
+    return _default_engine
+
+def assess_hazards(objects):
+    """One-off HazardReport for objects"""
+    return default_engine().assess(objects)
@@ -2,85 +2,260 @@
 Object Detection Module using YOLOv8 - OPTIMIZED
 """
 from ultralytics import YOLO
-import cv2
 import numpy as np
 import threading
 
-class ObjectDetector:
-    """Handles real-time object detection with GPU optimization"""
+from vision.detections import Detections
+from vision.frame_context import FrameContext
+from vision.onnx_backend import (
+    OnnxSession, decode_predictions, export_onnx, exported_model_path, letterbox, to_input_tensor
+)
+from vision.quantization import quantize_onnx_model
+from vision.rendering import draw_detections
+
+class BaseObjectDetector:
+    """
+    Frame-level detection API shared by ObjectDetector and its model server client
     
-    def __init__(self, model_path='yolov8n.pt', confidence=0.5, input_size=416, device='cuda'):
-        """Initialize YOLO model with GPU support"""
-        self.model = YOLO(model_path)
-        self.device = device
-        self.model.to(device)  # Move model to GPU
+    Subclasses implement _detect_contexts (the model call); detect,
+    detect_batch, detect_tiles and the last_* results are built on it.
+    """
+    
+    def __init__(self, names, confidence=0.5, input_size=416, candidate_confidence=None):
+        """
+        Args:
+            names: {class id: class name} of the model
+            confidence: detection confidence threshold
+            input_size: side of the model input
+            candidate_confidence: boxes scoring between this and confidence are kept in
+                                  last_candidates (regions worth a closer look, see
+                                  vision.tiling); None disables
+        """
+        self.names = names
         self.confidence = confidence
         self.input_size = input_size  # Smaller input = faster inference
-        self.last_detections = []
+        self.candidate_confidence = candidate_confidence
+        self.last_detections = Detections.empty(names)
+        self.last_candidates = np.zeros((0, 4), np.float32)  # xyxy of sub-threshold boxes
         self.last_annotated = None
         self.processing = False
         self.lock = threading.Lock()
-        # Warmup GPU
-        self._gpu_warmup()
     
-    def detect(self, frame):
+    def detect(self, frame, annotate=True):
         """
         Detect objects in frame with GPU optimization
-        Returns: (annotated_frame, list of detected objects)
-        """
-        import torch
         
-        # Resize frame for faster processing
-        h, w = frame.shape[:2]
-        scale = self.input_size / max(h, w)
-        resized = cv2.resize(frame, (int(w * scale), int(h * scale)))
-        
-        # Run detection on GPU with half precision for speed
-        results = self.model(resized, conf=self.confidence, verbose=False, device=self.device)
-        
-        detected_objects = []
-        if results[0].boxes is not None:
-            for box in results[0].boxes:
-                class_id = int(box.cls[0])
-                class_name = self.model.names[class_id]
-                confidence = float(box.conf[0])
-                
-                # Scale bbox back to original frame size (keep on GPU briefly)
-                bbox = box.xyxy[0].cpu().numpy()
-                bbox = bbox / scale
-                
-                detected_objects.append({
-                    'name': class_name,
-                    'confidence': confidence,
-                    'bbox': bbox,
-                    'class_id': class_id
-                })
+        frame may be a FrameContext shared with the other modules.
+        With annotate=False nothing is copied or drawn and annotated_frame is None.
+        Returns: (annotated_frame, Detections) - Detections iterates as dict-like objects
+        """
+        context = FrameContext.of(frame)
+        frame = context.frame
+        (detected_objects, candidates), = self._detect_contexts([context])
         
         with self.lock:
             self.last_detections = detected_objects
+            self.last_candidates = candidates
         
         # Draw on original frame for visualization
-        annotated_frame = frame.copy()
-        for obj in detected_objects:
-            x1, y1, x2, y2 = map(int, obj['bbox'])
-            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            label = f"{obj['name']} {obj['confidence']:.2f}"
-            cv2.putText(annotated_frame, label, (x1, y1-10),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        annotated_frame = None
+        if annotate:
+            annotated_frame = draw_detections(frame.copy(), detected_objects)
         
         return annotated_frame, detected_objects
     
+    def detect_batch(self, frames, batch_size=None):
+        """
+        Detect objects in several frames with one forward pass
+        
+        Frames (or FrameContexts) may come from different cameras and differ
+        in size: each is letterboxed to input_size, all are stacked into one
+        input tensor and the results are mapped back to each frame's own
+        coordinates. last_detections / last_candidates are not updated.
+        
+        Args:
+            frames: list of BGR frames or FrameContexts
+            batch_size: most frames per forward pass (None = all at once)
+        Returns: list of Detections, one per frame
+        """
+        contexts = [FrameContext.of(frame) for frame in frames]
+        step = batch_size or max(1, len(contexts))
+        results = []
+        for start in range(0, len(contexts), step):
+            results.extend(detections for detections, _ in self._detect_contexts(contexts[start:start + step]))
+        return results
+    
+    def detect_tiles(self, frame, tiles):
+        """
+        Detect objects in crops of a frame at full crop resolution, in one batch
+        
+        Args:
+            frame: BGR frame or FrameContext
+            tiles: (N, 4) int x1, y1, x2, y2 crop rectangles in frame coordinates
+        Returns: list of Detections (one per tile) in frame coordinates
+        """
+        frame = FrameContext.of(frame).frame
+        tiles = np.asarray(tiles, dtype=np.intp).reshape(-1, 4)
+        crops = [FrameContext(frame[y1:y2, x1:x2]) for x1, y1, x2, y2 in tiles.tolist()]
+        results = []
+        for (detections, _), (x1, y1, _, _) in zip(self._detect_contexts(crops), tiles.tolist()):
+            detections.xyxy += np.array([x1, y1, x1, y1], dtype=np.float32)
+            results.append(detections)
+        return results
+    
+    def _detect_contexts(self, contexts):
+        """
+        One forward pass over a list of FrameContexts
+        Returns: list of (Detections, candidate xyxy) in each context's own coordinates
+        """
+        raise NotImplementedError
+    
     def get_last_detections(self):
         """Get last detected objects (thread-safe)"""
         with self.lock:
             return self.last_detections.copy()
+
+class ObjectDetector(BaseObjectDetector):
+    """Handles real-time object detection with GPU optimization"""
+    
+    def __init__(self, model_path='yolov8n.pt', confidence=0.5, input_size=416, device='cuda',
+                 backend='torch', num_threads=None, iou=0.7, precision='fp32', calibration_frames=None,
+                 candidate_confidence=None):
+        """
+        Initialize YOLO model with GPU support
+        
+        Args:
+            backend: 'torch' (ultralytics) or 'onnx' (ONNX Runtime; the model is
+                     exported once to <weights>_<input_size>.onnx next to the weights)
+            num_threads: ONNX Runtime intra-op threads (None = runtime default)
+            iou: NMS IoU threshold for the ONNX backend (ultralytics default)
+            precision: 'fp32' or 'int8' (INT8 quantized ONNX model, implies backend='onnx')
+            calibration_frames: BGR frames for static INT8 calibration
+                                (None = dynamic quantization)
+            candidate_confidence: see BaseObjectDetector
+        """
+        if backend not in ('torch', 'onnx'):
+            raise ValueError(f"backend must be 'torch' or 'onnx', got {backend!r}")
+        if precision not in ('fp32', 'int8'):
+            raise ValueError(f"precision must be 'fp32' or 'int8', got {precision!r}")
+        if precision == 'int8':
+            backend = 'onnx'
+        
+        self.model = YOLO(model_path)
+        super().__init__(self.model.names, confidence, input_size, candidate_confidence)
+        self.model_path = model_path
+        self.device = device
+        self.backend = backend
+        self.num_threads = num_threads
+        self.iou = iou
+        self.precision = precision
+        self.calibration_frames = calibration_frames
+        
+        self.onnx = None
+        if backend == 'onnx':
+            self._load_onnx()
+        else:
+            self.model.to(device)  # Move model to GPU
+        # Warmup GPU
+        self._gpu_warmup()
+    
+    def _load_onnx(self):
+        """Export (and quantize) once, then load the ONNX model for the current input size"""
+        onnx_path = export_onnx(self.model, self.model_path, self.input_size)
+        if self.precision == 'int8':
+            calibration_inputs = None
+            suffix = '_int8_dynamic'
+            if self.calibration_frames:
+                calibration_inputs = [
+                    to_input_tensor([letterbox(frame, self.input_size)[0]])
+                    for frame in self.calibration_frames
+                ]
+                suffix = '_int8'
+            onnx_path = quantize_onnx_model(
+                onnx_path, exported_model_path(self.model_path, self.input_size, suffix),
+                calibration_inputs
+            )
+        self.onnx = OnnxSession(onnx_path, num_threads=self.num_threads, device=self.device)
+    
+    def _detect_contexts(self, contexts):
+        """YOLO forward pass (see BaseObjectDetector._detect_contexts)"""
+        threshold = self.confidence
+        if self.candidate_confidence is not None:
+            threshold = min(threshold, self.candidate_confidence)
+        
+        if self.onnx is not None:
+            raw = self._detect_onnx(contexts, threshold)
+        else:
+            raw = self._detect_torch(contexts, threshold)
+        
+        results = []
+        for xyxy, scores, class_ids in raw:
+            confident = scores >= self.confidence
+            if not confident.any():
+                detections = Detections.empty(self.names)
+            else:
+                detections = Detections(xyxy[confident], scores[confident], class_ids[confident], self.names)
+            results.append((detections, xyxy[~confident]))
+        return results
+    
+    def _detect_torch(self, contexts, threshold):
+        """Ultralytics PyTorch inference. Returns: [(xyxy, scores, class_ids)] per context"""
+        # Resize frames for faster processing (shared with other modules via the context)
+        resized = [context.fit(self.input_size) for context in contexts]
+        
+        # Run detection on GPU at input_size (ultralytics would otherwise letterbox up to 640)
+        results = self.model(resized, conf=threshold, imgsz=self.input_size,
+                             verbose=False, device=self.device)
+        
+        raw = []
+        for context, image, result in zip(contexts, resized, results):
+            boxes = result.boxes
+            if boxes is None or not len(boxes):
+                raw.append((np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32)))
+                continue
+            
+            # One device->host transfer for all boxes: x1, y1, x2, y2, conf, cls
+            data = boxes.data.cpu().numpy()
+            
+            # Scale bboxes back to original frame size in one vectorized op
+            h, w = context.shape[:2]
+            resized_h, resized_w = image.shape[:2]
+            scale_back = np.array([w / resized_w, h / resized_h] * 2, dtype=np.float32)
+            raw.append((data[:, :4] * scale_back, data[:, -2], data[:, -1].astype(np.int32)))
+        return raw
+    
+    def _detect_onnx(self, contexts, threshold):
+        """
+        ONNX Runtime inference: letterbox, forward, decode + NMS, map back to the frame
+        Returns: [(xyxy, scores, class_ids)] per context
+        """
+        letterboxed = [letterbox(context, self.input_size) for context in contexts]
+        predictions = self.onnx.infer(to_input_tensor([image for image, _, _ in letterboxed]))
+        
+        raw = []
+        for context, (_, ratio, (pad_x, pad_y)), prediction in zip(contexts, letterboxed, predictions):
+            xyxy, scores, class_ids = decode_predictions(prediction, threshold, self.iou)
+            if len(xyxy):
+                h, w = context.shape[:2]
+                xyxy -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+                xyxy /= ratio
+                xyxy[:, 0::2] = np.clip(xyxy[:, 0::2], 0, w)
+                xyxy[:, 1::2] = np.clip(xyxy[:, 1::2], 0, h)
+            raw.append((xyxy, scores, class_ids))
+        return raw
     
     def set_input_size(self, size):
         """Adjust input size for speed/accuracy tradeoff"""
         self.input_size = size
+        if self.onnx is not None:
+            self._load_onnx()  # ONNX models are exported at a fixed size
     
     def _gpu_warmup(self):
         """Warmup GPU with a dummy forward pass"""
+        if self.onnx is not None:
+            self._detect_contexts([FrameContext(np.zeros((self.input_size, self.input_size, 3), np.uint8))])
+            return
+        
         import torch
         try:
             dummy_input = torch.zeros(1, 3, 320, 320).to(self.device)
@@ -0,0 +1,132 @@
+"""
+ONNX Runtime inference backend for YOLOv8 (CPU-friendly)
+"""
+import os
+import cv2
+import numpy as np
+
+from vision.frame_context import FrameContext
+
+LETTERBOX_COLOR = (114, 114, 114)
+
+def letterbox(frame, size):
+    """
+    Resize keeping aspect ratio so the long side is `size`, then pad to size x size
+    
+    frame may be a FrameContext, whose cached resize is then reused.
+    Returns: (padded_image, ratio, (pad_x, pad_y))
+    """
+    context = FrameContext.of(frame)
+    h, w = context.shape[:2]
+    ratio = size / max(h, w)
+    resized = context.fit(size)
+    new_h, new_w = resized.shape[:2]
+    
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    padded = cv2.copyMakeBorder(
+        resized, pad_y, size - new_h - pad_y, pad_x, size - new_w - pad_x,
+        cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR
+    )
+    return padded, ratio, (pad_x, pad_y)
+
+def to_input_tensor(images):
+    """List of BGR uint8 images (same size) -> (N, 3, H, W) float32 RGB in [0, 1]"""
+    batch = np.stack(images)[..., ::-1]  # BGR -> RGB
+    batch = batch.transpose(0, 3, 1, 2).astype(np.float32)
+    batch *= 1.0 / 255.0
+    return np.ascontiguousarray(batch)
+
+def decode_predictions(prediction, confidence, iou=0.7, max_det=300):
+    """
+    Decode one raw YOLOv8 output (4 + num_classes, num_anchors) with class-aware NMS
+    Returns: (xyxy (N, 4), scores (N,), class_ids (N,)) in letterboxed input coordinates
+    """
+    prediction = prediction.T  # (anchors, 4 + classes)
+    class_scores = prediction[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_scores)), class_ids]
+    
+    keep = scores >= confidence
+    if not keep.any():
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int32)
+    
+    boxes_cxcywh = prediction[keep, :4]
+    scores, class_ids = scores[keep], class_ids[keep]
+    
+    xyxy = np.empty_like(boxes_cxcywh)
+    xyxy[:, :2] = boxes_cxcywh[:, :2] - boxes_cxcywh[:, 2:] / 2
+    xyxy[:, 2:] = boxes_cxcywh[:, :2] + boxes_cxcywh[:, 2:] / 2
+    
+    # cv2 wants (x, y, w, h) boxes
+    xywh = np.concatenate([xyxy[:, :2], boxes_cxcywh[:, 2:]], axis=1)
+    indices = cv2.dnn.NMSBoxesBatched(
+        xywh.tolist(), scores.tolist(), class_ids.tolist(), confidence, iou
+    )
+    indices = np.asarray(indices, dtype=np.intp).reshape(-1)
+    indices = indices[np.argsort(-scores[indices])][:max_det]
+    
+    return xyxy[indices], scores[indices], class_ids[indices].astype(np.int32)
+
+def exported_model_path(model_path, input_size, suffix=''):
+    """Cache path for an exported model next to the weights, e.g. yolov8n_320.onnx"""
+    stem = os.path.splitext(model_path)[0]
+    return f"{stem}_{input_size}{suffix}.onnx"
+
+def export_onnx(yolo_model, model_path, input_size):
+    """
+    Export a YOLO model to ONNX once (cached next to the weights)
+    
+    The batch axis is dynamic so tiles / frames can share one forward pass.
+    Returns: path to the .onnx file
+    """
+    onnx_path = exported_model_path(model_path, input_size)
+    if os.path.exists(onnx_path):
+        return onnx_path
+    
+    print(f"📦 Exporting {model_path} to ONNX at {input_size}px (one-time)...")
+    exported = yolo_model.export(format='onnx', imgsz=input_size, dynamic=True, simplify=True)
+    os.replace(str(exported), onnx_path)
+    return onnx_path
+
+class OnnxSession:
+    """Runs an exported single-input, single-output ONNX model (YOLOv8, MiDaS) with ONNX Runtime"""
+    
+    def __init__(self, onnx_path, num_threads=None, device='cpu'):
+        """
+        Args:
+            onnx_path: exported model
+            num_threads: intra-op threads (None = one per physical core, as chosen by ORT)
+            device: 'cpu' or 'cuda' (CUDA provider used if available)
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("backend='onnx' requires onnxruntime (pip install onnxruntime)") from e
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        
+        providers = ['CPUExecutionProvider']
+        if str(device).startswith('cuda') and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+        
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+        # Models exported with a fixed batch size (older caches, MiDaS) run in chunks of it
+        self.batch_size = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+    
+    def infer(self, batch):
+        """(N, 3, H, W) float32 -> the model output for the batch (YOLOv8: raw predictions (N, 4 + classes, anchors))"""
+        if self.batch_size is None or len(batch) == self.batch_size:
+            return self.session.run([self.output_name], {self.input_name: batch})[0]
+        return np.concatenate([
+            self.session.run([self.output_name], {self.input_name: batch[start:start + self.batch_size]})[0]
+            for start in range(0, len(batch), self.batch_size)
+        ])
@@ -0,0 +1,35 @@
+"""
+On-demand visualization helpers (only used when a display or recorder is attached)
+"""
+import cv2
+import numpy as np
+
+_colormap_luts = {}
+
+def colormap_lut(colormap=cv2.COLORMAP_MAGMA):
+    """256-entry BGR lookup table for an OpenCV colormap (computed once)"""
+    lut = _colormap_luts.get(colormap)
+    if lut is None:
+        ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+        lut = cv2.applyColorMap(ramp, colormap).reshape(256, 3)
+        _colormap_luts[colormap] = lut
+    return lut
+
+def colorize_depth(depth_map_normalized, colormap=cv2.COLORMAP_MAGMA):
+    """Normalized (0-1) depth map -> BGR image via a precomputed LUT"""
+    indices = (depth_map_normalized * 255).astype(np.uint8)
+    return colormap_lut(colormap)[indices]
+
+def draw_detections(frame, objects):
+    """Draw bounding boxes and labels in place. Returns the same frame"""
+    for obj in objects:
+        x1, y1, x2, y2 = map(int, obj['bbox'])
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label = f"{obj['name']} {obj['confidence']:.2f}"
+        if 'track_id' in obj:
+            label = f"#{obj['track_id']} {label}"
+        if 'ttc' in obj:
+            label = f"{label} {obj['ttc']:.1f}s"
+        cv2.putText(frame, label, (x1, y1-10),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    return frame
@@ -1,98 +1,387 @@
 """
 Scene Understanding Module using CLIP
 """
+import hashlib
+import os
+import time
 import torch
 import clip
 import cv2
+import numpy as np
 from PIL import Image
 from collections import Counter
 
-class SceneAnalyzer:
+from vision.frame_context import FrameContext
+from vision.hazards import assess_hazards
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dristi')
+
+# Normalization used by CLIP's reference preprocess
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+# Default prompt banks (mirrors config.yaml modules.scene_analysis.prompt_banks)
+DEFAULT_PROMPT_BANKS = {
+    'scene_type': [
+        "an indoor room", "an outdoor area", "a kitchen with appliances",
+        "a bedroom with bed", "an office with desk and computer",
+        "a living room with furniture", "a street with buildings",
+        "a park with trees and grass", "a store or shop", "a bathroom"
+    ],
+    'condition': [
+        "a crowded busy place with many people", "a quiet empty space with few objects",
+        "a well-lit bright environment", "a dark dimly-lit space",
+        "a clean organized area", "a cluttered messy space"
+    ],
+    'activity': [
+        "people walking or moving", "people sitting and resting",
+        "people working at desk or computer", "people eating or drinking",
+        "people talking or interacting", "no visible human activity"
+    ],
+}
+
+# Result keys of the original fixed output -> bank keys they mirror
+LEGACY_ALIASES = {'scene_confidence': 'scene_type_confidence'}
+
+def segmented_softmax(logits, segment_ids, num_segments):
+    """
+    Softmax of (B, P) logits computed separately within each segment of columns
+    
+    segment_ids: (P,) long tensor giving the segment of every column. Uses
+    scatter_reduce (max) and scatter_add, so any number of segments costs the
+    same few kernels.
+    """
+    index = segment_ids.expand_as(logits)
+    maxima = logits.new_full((logits.shape[0], num_segments), float('-inf'))
+    maxima = maxima.scatter_reduce(1, index, logits, reduce='amax', include_self=True)
+    exp = (logits - maxima.gather(1, index)).exp()
+    totals = logits.new_zeros((logits.shape[0], num_segments)).scatter_add(1, index, exp)
+    return exp / totals.gather(1, index)
+
+class SceneCache:
+    """Scene-change state of one camera (see SceneAnalyzer.analyze)"""
+    
+    def __init__(self):
+        self.stats = {'full': 0, 'embedding_hits': 0, 'thumbnail_hits': 0}
+        self.reset()
+    
+    def reset(self):
+        """Force a full analysis on the next frame"""
+        self.scene = None
+        self.embedding = None  # normalized embedding of the last full analysis
+        self.thumbnail = None  # signature of the last frame CLIP was run on
+        self.brightness = None  # its mean luminance (0-1)
+        self.scene_time = 0.0
+
+class BaseSceneAnalyzer:
+    """
+    Frame-level scene API shared by SceneAnalyzer and its model server client
+    
+    Subclasses implement encode_frame, encode_images and classify_batch (the
+    CLIP calls); analyze, its scene-change detection and the batch helpers
+    are built on them.
+    """
+    
+    # Mean luminance change (0-1) that always counts as a scene change: the
+    # thumbnail signature is mean-removed and CLIP embeddings barely move when
+    # the lights go off, but the lighting condition does
+    brightness_change = 0.15
+    
+    def __init__(self, input_resolution=224, thumbnail_threshold=0.04, embedding_similarity=0.92,
+                 max_scene_age=60.0):
+        """
+        Args:
+            input_resolution: side of the CLIP image input
+            thumbnail_threshold: mean thumbnail difference (0-1) below which the
+                                 frame is treated as the same scene without running CLIP
+            embedding_similarity: image embedding cosine similarity at or above which
+                                  the cached scene is kept
+            max_scene_age: seconds after which a full analysis is forced
+                           (0 disables scene-change detection)
+        """
+        self.input_resolution = input_resolution
+        self.thumbnail_threshold = thumbnail_threshold
+        self.embedding_similarity = embedding_similarity
+        self.max_scene_age = max_scene_age
+        
+        # Scene-change detection state of callers that bring no cache of their own (see analyze)
+        self.cache = SceneCache()
+    
+    def clip_input(self, frame):
+        """Centre square of a BGR frame (or FrameContext) as R x R RGB uint8, cached per frame"""
+        context = FrameContext.of(frame)
+        size = self.input_resolution
+        return context.cached(('clip_input', size), lambda: _center_crop_resize(context.frame, size))
+    
+    @property
+    def scene_stats(self):
+        """Outcome counts of analyze() calls using the default cache"""
+        return self.cache.stats
+    
+    def new_cache(self):
+        """Scene-change state for one more camera sharing this analyzer"""
+        return SceneCache()
+    
+    def analyze(self, frame, cache=None):
+        """
+        Analyze scene in frame with GPU acceleration
+        
+        The place usually stays the same for a long time, so the previous
+        result is reused while the scene has not really changed:
+          1. a 16px grayscale thumbnail close to the one of the last CLIP run
+             returns the cached scene without running CLIP at all;
+          2. otherwise the image is encoded, and an embedding close to the one
+             of the last full analysis still returns the cached scene;
+          3. only a real change (or a result older than max_scene_age) runs
+             the full classification. A change of overall brightness by
+             brightness_change or more always is one.
+        
+        frame may be a FrameContext shared with the other modules.
+        cache: SceneCache of the camera the frame comes from (default: the
+               analyzer's own); a frame of a different shape counts as a change
+        Returns: dictionary with scene analysis results (a fresh copy)
+        """
+        cache = self.cache if cache is None else cache
+        context = FrameContext.of(frame)
+        now = time.time()
+        thumbnail, brightness = self._thumbnail_signature(context)
+        fresh = (cache.scene is not None and now - cache.scene_time < self.max_scene_age
+                 and cache.thumbnail is not None and cache.thumbnail.shape == thumbnail.shape
+                 and abs(brightness - cache.brightness) < self.brightness_change)
+        
+        if fresh and float(np.mean(np.abs(thumbnail - cache.thumbnail))) < self.thumbnail_threshold:
+            cache.stats['thumbnail_hits'] += 1
+            return dict(cache.scene)
+        
+        image_features = self.encode_frame(context)
+        cache.thumbnail, cache.brightness = thumbnail, brightness
+        if fresh and (image_features @ cache.embedding.T).item() >= self.embedding_similarity:
+            cache.stats['embedding_hits'] += 1
+            return dict(cache.scene)
+        
+        cache.scene = self.classify(image_features)
+        cache.embedding = image_features
+        cache.scene_time = now
+        cache.stats['full'] += 1
+        return dict(cache.scene)
+    
+    def reset_scene_cache(self, cache=None):
+        """Force a full analysis on the next frame (of the given camera's cache)"""
+        (self.cache if cache is None else cache).reset()
+    
+    @staticmethod
+    def _thumbnail_signature(context):
+        """
+        Cheap place signature of a frame
+        Returns: (mean-removed 16px grayscale thumbnail scaled to 0-1, its mean luminance)
+        """
+        h, w = context.shape[:2]
+        small = context.resized((16, max(1, round(16 * h / w))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255.0
+        brightness = float(gray.mean())
+        return gray - brightness, brightness
+    
+    def encode_frame(self, frame):
+        """BGR frame (or FrameContext) -> normalized (1, D) image embedding"""
+        raise NotImplementedError
+    
+    def encode_images(self, images):
+        """(B, R, R, 3) RGB uint8 CLIP inputs (see clip_input) -> normalized (B, D) embeddings, one pass"""
+        raise NotImplementedError
+    
+    def analyze_batch(self, frames):
+        """
+        Classify several frames (e.g. one per camera) with one CLIP forward pass
+        
+        Stateless: the scene-change cache of analyze() is neither used nor updated.
+        Returns: list of result dictionaries
+        """
+        return self.classify_batch(self.encode_images([self.clip_input(frame) for frame in frames]))
+    
+    def classify(self, image_features):
+        """
+        Score a normalized image embedding against every prompt
+        Returns: dictionary with scene analysis results
+        """
+        return self.classify_batch(image_features)[0]
+    
+    def classify_batch(self, image_features):
+        """Score (B, D) normalized image embeddings against every prompt bank. Returns: list of B dictionaries"""
+        raise NotImplementedError
+    
+    @staticmethod
+    def check_hazards(objects):
+        """Identify potential hazards: {category: [objects]} (see vision.hazards)"""
+        return assess_hazards(objects).by_category()
+
+class SceneAnalyzer(BaseSceneAnalyzer):
     """Handles scene understanding using CLIP"""
     
-    def __init__(self, device='cpu', model_name='ViT-B/32'):
-        """Initialize CLIP model"""
+    def __init__(self, device='cpu', model_name='ViT-B/32', cache_dir=DEFAULT_CACHE_DIR, fast_preprocess=True,
+                 thumbnail_threshold=0.04, embedding_similarity=0.92, max_scene_age=60.0, prompt_banks=None):
+        """
+        Initialize CLIP model
+        
+        Args:
+            prompt_banks: {group name: [prompts]} (default DEFAULT_PROMPT_BANKS, see
+                          config.yaml modules.scene_analysis.prompt_banks)
+            fast_preprocess: build the input tensor with OpenCV/torch ops straight
+                             from the BGR frame (see preprocess_frame) instead of
+                             CLIP's PIL/torchvision pipeline
+            thumbnail_threshold, embedding_similarity, max_scene_age: see BaseSceneAnalyzer
+        """
         self.device = device
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.fast_preprocess = fast_preprocess
         self.model, self.preprocess = clip.load(model_name, device=device)
+        super().__init__(self.model.visual.input_resolution, thumbnail_threshold, embedding_similarity,
+                         max_scene_age)
+        
+        # Preallocated input tensor and normalization constants for preprocess_frame
+        self.input_buffer = torch.empty(
+            (1, 3, self.input_resolution, self.input_resolution), dtype=self.model.dtype, device=device
+        )
+        self.pixel_mean = torch.tensor(CLIP_MEAN, dtype=self.model.dtype, device=device).view(3, 1, 1) * 255.0
+        self.pixel_std = torch.tensor(CLIP_STD, dtype=self.model.dtype, device=device).view(3, 1, 1) * 255.0
         
-        # Define scene understanding queries
-        self.scene_type_queries = [
-            "an indoor room", "an outdoor area", "a kitchen with appliances",
-            "a bedroom with bed", "an office with desk and computer",
-            "a living room with furniture", "a street with buildings",
-            "a park with trees and grass", "a store or shop", "a bathroom"
-        ]
+        # Prompt banks (named groups, each scored with its own softmax) are encoded
+        # once into a single stacked matrix; per frame there is one matmul
+        banks = prompt_banks or DEFAULT_PROMPT_BANKS
+        self.prompt_banks = {name: list(prompts) for name, prompts in banks.items() if prompts}
+        self.all_queries = [prompt for prompts in self.prompt_banks.values() for prompt in prompts]
+        self.bank_slices = {}
+        start = 0
+        for name, prompts in self.prompt_banks.items():
+            self.bank_slices[name] = slice(start, start + len(prompts))
+            start += len(prompts)
+        self.bank_ids = torch.tensor(
+            [bank for bank, prompts in enumerate(self.prompt_banks.values()) for _ in prompts], device=device
+        )
+        self.text_features = self._load_text_features()
+    
+    def _text_cache_path(self):
+        """Cache file keyed by model name and prompt hash"""
+        key = hashlib.sha1("\n".join([self.model_name] + self.all_queries).encode('utf-8')).hexdigest()
+        model_tag = self.model_name.replace('/', '-')
+        return os.path.join(self.cache_dir, f"clip_text_{model_tag}_{key[:16]}.pt")
+    
+    def _load_text_features(self):
+        """
+        Load normalized prompt embeddings from disk, encoding them on a cache miss
+        Returns: tensor of shape (num_prompts, embed_dim) on self.device
+        """
+        cache_path = self._text_cache_path() if self.cache_dir else None
         
-        self.scene_condition_queries = [
-            "a crowded busy place with many people", "a quiet empty space with few objects",
-            "a well-lit bright environment", "a dark dimly-lit space",
-            "a clean organized area", "a cluttered messy space"
-        ]
+        if cache_path and os.path.exists(cache_path):
+            try:
+                text_features = torch.load(cache_path, map_location='cpu')
+                return text_features.to(self.device, dtype=self.model.dtype)
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable CLIP text cache {cache_path}: {e}")
         
-        self.activity_queries = [
-            "people walking or moving", "people sitting and resting",
-            "people working at desk or computer", "people eating or drinking",
-            "people talking or interacting", "no visible human activity"
-        ]
+        with torch.no_grad():
+            tokens = clip.tokenize(self.all_queries).to(self.device)
+            text_features = self.model.encode_text(tokens)
+            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        
+        if cache_path:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = cache_path + '.tmp'
+                torch.save(text_features.cpu(), tmp_path)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"⚠️  Could not write CLIP text cache: {e}")
+        
+        return text_features
     
-    def analyze(self, frame):
+    def preprocess_frame(self, frame, out=None):
         """
-        Analyze scene in frame with GPU acceleration
-        Returns: dictionary with scene analysis results
+        BGR frame (or FrameContext) -> normalized (1, 3, R, R) CLIP input tensor
+        
+        Equivalent to CLIP's reference preprocess (resize short side to R,
+        center crop, normalize) without the PIL round-trip: the centre square
+        is cropped first (a view, no copy), resized once with OpenCV and
+        converted to RGB at R x R, then normalized on the device in place.
+        Matches the reference within a small tolerance (see
+        benchmarks/check_clip_preprocess.py).
+        
+        Args:
+            out: (1, 3, R, R) tensor to write into (default: the analyzer's
+                 preallocated buffer, overwritten by the next call)
+        Returns: out
         """
-        # Convert to PIL Image and move to GPU
-        image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        image_input = self.preprocess(image).unsqueeze(0).to(self.device)
+        image = self.clip_input(frame)
+        out = self.input_buffer if out is None else out
+        pixels = torch.from_numpy(image).to(out.device).permute(2, 0, 1)  # RGB uint8, CHW view
+        out[0].copy_(pixels).sub_(self.pixel_mean).div_(self.pixel_std)
+        return out
+    
+    def encode_frame(self, frame):
+        """BGR frame (or FrameContext) -> normalized (1, D) image embedding (torch)"""
+        if self.fast_preprocess:
+            image_input = self.preprocess_frame(frame)
+        else:
+            # Reference path: PIL image (RGB cached per frame) through CLIP's transforms
+            image = Image.fromarray(FrameContext.of(frame).rgb())
+            image_input = self.preprocess(image).unsqueeze(0).to(self.device)
         
         with torch.no_grad():
-            # Encode image once on GPU
             image_features = self.model.encode_image(image_input)
-            
-            # Pre-tokenize all queries for batch processing
-            scene_type_text = clip.tokenize(self.scene_type_queries).to(self.device)
-            condition_text = clip.tokenize(self.scene_condition_queries).to(self.device)
-            activity_text = clip.tokenize(self.activity_queries).to(self.device)
-            
-            # Batch encode all text at once
-            scene_type_features = self.model.encode_text(scene_type_text)
-            condition_features = self.model.encode_text(condition_text)
-            activity_features = self.model.encode_text(activity_text)
-            
-            # Compute similarities on GPU (batch operations)
-            scene_type_similarity = (100.0 * image_features @ scene_type_features.T).softmax(dim=-1)
-            condition_similarity = (100.0 * image_features @ condition_features.T).softmax(dim=-1)
-            activity_similarity = (100.0 * image_features @ activity_features.T).softmax(dim=-1)
-        
-        # Get top predictions
-        scene_values, scene_indices = scene_type_similarity[0].topk(2)
-        condition_values, condition_indices = condition_similarity[0].topk(2)
-        activity_values, activity_indices = activity_similarity[0].topk(1)
-        
-        return {
-            'scene_type': self.scene_type_queries[scene_indices[0].item()],
-            'scene_confidence': scene_values[0].item(),
-            'scene_type_alt': self.scene_type_queries[scene_indices[1].item()],
-            'condition': self.scene_condition_queries[condition_indices[0].item()],
-            'condition_confidence': condition_values[0].item(),
-            'activity': self.activity_queries[activity_indices[0].item()],
-            'activity_confidence': activity_values[0].item()
-        }
+            return image_features / image_features.norm(dim=-1, keepdim=True)
     
-    @staticmethod
-    def check_hazards(objects):
-        """Identify potential hazards"""
-        hazard_types = {
-            'vehicles': ['car', 'truck', 'bus', 'bicycle', 'motorcycle'],
-            'traffic': ['traffic light', 'stop sign'],
-            'obstacles': ['bench', 'fire hydrant', 'parking meter'],
-            'animals': ['dog', 'cat', 'bird', 'horse']
-        }
-        
-        detected_hazards = {'vehicles': [], 'traffic': [], 'obstacles': [], 'animals': []}
-        
-        for obj in objects:
-            for hazard_type, hazard_list in hazard_types.items():
-                if obj['name'] in hazard_list:
-                    detected_hazards[hazard_type].append(obj)
-        
-        return detected_hazards
+    def encode_images(self, images):
+        """(B, R, R, 3) RGB uint8 CLIP inputs (see clip_input) -> normalized (B, D) torch embeddings"""
+        pixels = torch.from_numpy(np.ascontiguousarray(np.stack(images))).to(self.device)
+        pixels = pixels.permute(0, 3, 1, 2).to(self.model.dtype)
+        pixels = (pixels - self.pixel_mean) / self.pixel_std
+        with torch.no_grad():
+            image_features = self.model.encode_image(pixels)
+            return image_features / image_features.norm(dim=-1, keepdim=True)
+    
+    def classify_batch(self, image_features):
+        """
+        Score (B, D) normalized image embeddings against every prompt bank
+        
+        One matmul over the stacked prompt matrix and one segmented softmax
+        (per bank), then a single device->host transfer; adding prompts or
+        banks adds no per-frame passes. For each bank `name` the result has
+        `name`, `name_confidence` and (for banks of 2+ prompts) `name_alt`,
+        plus the legacy keys in LEGACY_ALIASES.
+        image_features may also be a numpy array (e.g. received from another process).
+        Returns: list of B result dictionaries
+        """
+        image_features = torch.as_tensor(image_features, device=self.device, dtype=self.text_features.dtype)
+        with torch.no_grad():
+            logits = 100.0 * image_features @ self.text_features.T
+            probabilities = segmented_softmax(logits.float(), self.bank_ids, len(self.prompt_banks))
+        probabilities = probabilities.cpu().numpy()
+        
+        results = []
+        for row in probabilities:
+            result = {}
+            for name, bank_slice in self.bank_slices.items():
+                prompts = self.prompt_banks[name]
+                scores = row[bank_slice]
+                order = np.argsort(-scores)[:2]
+                result[name] = prompts[order[0]]
+                result[f'{name}_confidence'] = float(scores[order[0]])
+                if len(order) > 1:
+                    result[f'{name}_alt'] = prompts[order[1]]
+            for alias, key in LEGACY_ALIASES.items():
+                if key in result:
+                    result[alias] = result[key]
+            results.append(result)
+        return results
+    
+def _center_crop_resize(frame, size):
+    """Centre square of a BGR frame resized to size x size, as contiguous RGB uint8"""
+    h, w = frame.shape[:2]
+    side = min(h, w)
+    top, left = (h - side) // 2, (w - side) // 2
+    square = frame[top:top + side, left:left + side]
+    # Area averaging approximates PIL's antialiased bicubic when shrinking
+    interpolation = cv2.INTER_AREA if side > size else cv2.INTER_CUBIC
+    resized = cv2.resize(square, (size, size), interpolation=interpolation)
+    return cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
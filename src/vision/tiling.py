@@ -0,0 +1,208 @@
+"""
+High-resolution tile pass - finds small objects the downscaled full-frame pass misses
+"""
+import cv2
+import numpy as np
+
+from vision.detections import Detections
+
+# Central walking corridor as x1, y1, x2, y2 fractions of the frame
+DEFAULT_CORRIDOR = (0.2, 0.3, 0.8, 1.0)
+
+def _tile_starts(start, end, size, overlap):
+    """Start offsets of size-long tiles covering [start, end) with the given overlap fraction"""
+    length = end - start
+    if length <= size:
+        return [start]
+    count = int(np.ceil((length - size) / (size * (1.0 - overlap)))) + 1
+    return np.linspace(start, end - size, count).round().astype(int).tolist()
+
+def corridor_tiles(frame_shape, corridor=DEFAULT_CORRIDOR, tile_size=320, overlap=0.2):
+    """
+    Square tiles covering a region of the frame
+    
+    Args:
+        corridor: x1, y1, x2, y2 of the region as fractions of the frame
+        tile_size: tile side in frame pixels (clipped to the frame)
+        overlap: minimum overlap between neighbouring tiles (fraction of tile_size)
+    Returns: (N, 4) int xyxy tiles
+    """
+    h, w = frame_shape[:2]
+    size = min(tile_size, h, w)
+    x1, x2 = int(corridor[0] * w), int(corridor[2] * w)
+    y1, y2 = int(corridor[1] * h), int(corridor[3] * h)
+    # Widen a region smaller than one tile around its centre
+    x1 = min(max(0, (x1 + x2 - size) // 2), w - size) if x2 - x1 < size else x1
+    y1 = min(max(0, (y1 + y2 - size) // 2), h - size) if y2 - y1 < size else y1
+    tiles = [
+        (x, y, x + size, y + size)
+        for y in _tile_starts(y1, max(y2, y1 + size), size, overlap)
+        for x in _tile_starts(x1, max(x2, x1 + size), size, overlap)
+    ]
+    return np.array(tiles, dtype=np.intp).reshape(-1, 4)
+
+def roi_tiles(boxes, frame_shape, tile_size=320):
+    """Tiles of tile_size centred on boxes (e.g. low-confidence candidates), shifted inside the frame"""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    h, w = frame_shape[:2]
+    size = min(tile_size, h, w)
+    centres = (boxes[:, :2] + boxes[:, 2:]) / 2
+    x1 = np.clip(np.round(centres[:, 0] - size / 2), 0, w - size).astype(np.intp)
+    y1 = np.clip(np.round(centres[:, 1] - size / 2), 0, h - size).astype(np.intp)
+    return np.stack([x1, y1, x1 + size, y1 + size], axis=1)
+
+def drop_cut_boxes(detections, tile, frame_shape, margin=2.0):
+    """
+    Remove boxes touching a tile edge that is not a frame edge
+    
+    Such boxes are objects cut by the tile; they are covered whole by the
+    full-frame pass or an overlapping tile.
+    """
+    if not len(detections):
+        return detections
+    h, w = frame_shape[:2]
+    x1, y1, x2, y2 = tile
+    xyxy = detections.xyxy
+    cut = np.zeros(len(detections), bool)
+    if x1 > 0:
+        cut |= xyxy[:, 0] <= x1 + margin
+    if y1 > 0:
+        cut |= xyxy[:, 1] <= y1 + margin
+    if x2 < w:
+        cut |= xyxy[:, 2] >= x2 - margin
+    if y2 < h:
+        cut |= xyxy[:, 3] >= y2 - margin
+    return detections.subset(~cut) if cut.any() else detections
+
+def merge_detections(parts, iou=0.5):
+    """
+    Concatenate Detections from the full frame and its tiles and suppress
+    duplicates across them with class-aware NMS (highest confidence kept)
+    """
+    return _merge(parts, iou)[0]
+
+def _merge(parts, iou):
+    """merge_detections, also returning the index of the part each kept box came from"""
+    names = parts[0].names if parts else {}
+    source = np.repeat(np.arange(len(parts)), [len(part) for part in parts])
+    if not len(source):
+        return Detections.empty(names), source
+    xyxy = np.concatenate([part.xyxy for part in parts])
+    confidence = np.concatenate([part.confidence for part in parts])
+    class_id = np.concatenate([part.class_id for part in parts])
+    
+    xywh = np.concatenate([xyxy[:, :2], xyxy[:, 2:] - xyxy[:, :2]], axis=1)
+    keep = cv2.dnn.NMSBoxesBatched(xywh.tolist(), confidence.tolist(), class_id.tolist(), 0.0, iou)
+    keep = np.asarray(keep, dtype=np.intp).reshape(-1)
+    keep = keep[np.argsort(-confidence[keep], kind='stable')]
+    return Detections(xyxy[keep], confidence[keep], class_id[keep], names), source[keep]
+
+class TilePass:
+    """
+    Optional second detection pass at full resolution over regions of interest.
+    
+    The full-frame pass shrinks the frame to the detector input size, so
+    small objects (a mouse, a kerb-side bollard) fall below what the model
+    can see. This pass cuts the central walking corridor, plus a tile around
+    every low-confidence candidate box of the full pass, into tiles of the
+    detector input size taken 1:1 from the frame, runs them through the
+    detector as one batch and merges the results with cross-tile NMS.
+    DristiSystem runs it only when the scheduler has headroom.
+    
+    Objects only the tiles found are carried into the following detection
+    frames (see carry) so their tracks do not drop between tile passes.
+    """
+    
+    def __init__(self, corridor=DEFAULT_CORRIDOR, tile_size=None, overlap=0.2, max_tiles=4, nms_iou=0.5,
+                 use_candidates=True, max_carry=10):
+        """
+        Args:
+            corridor: x1, y1, x2, y2 fractions of the frame tiled on every pass (None = none)
+            tile_size: tile side in frame pixels (None = detector input size)
+            overlap: minimum overlap between corridor tiles (fraction of tile_size)
+            max_tiles: most tiles per pass (candidate tiles first, then the corridor)
+            nms_iou: IoU above which boxes from different passes are duplicates
+            use_candidates: add a tile around each sub-threshold box of the full pass
+            max_carry: detection frames a tile-only object is carried without a new tile pass
+        """
+        self.corridor = tuple(corridor) if corridor else None
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.max_tiles = max_tiles
+        self.nms_iou = nms_iou
+        self.use_candidates = use_candidates
+        self.max_carry = max_carry
+        self.tile_only = Detections.empty()  # objects of the last pass missed by its full pass
+        self.carried = 0
+        self.runs = 0
+        self.added = 0  # objects found only by the tile pass
+    
+    @classmethod
+    def from_config(cls, config):
+        """Build from the 'tiling' section of config.yaml (None if disabled)"""
+        settings = config.get('tiling') or {}
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            corridor=settings.get('corridor', DEFAULT_CORRIDOR),
+            tile_size=settings.get('tile_size'),
+            overlap=settings.get('overlap', 0.2),
+            max_tiles=settings.get('max_tiles', 4),
+            nms_iou=settings.get('nms_iou', 0.5),
+            use_candidates=settings.get('use_candidates', True),
+            max_carry=settings.get('max_carry', 10),
+        )
+    
+    def tiles(self, frame_shape, tile_size, candidates=None):
+        """Tiles for one pass: around candidates first, then the corridor, at most max_tiles"""
+        parts = []
+        if self.use_candidates and candidates is not None and len(candidates):
+            parts.append(roi_tiles(candidates, frame_shape, tile_size))
+        if self.corridor is not None:
+            parts.append(corridor_tiles(frame_shape, self.corridor, tile_size, self.overlap))
+        if not parts:
+            return np.zeros((0, 4), np.intp)
+        tiles = np.concatenate(parts)
+        _, first = np.unique(tiles, axis=0, return_index=True)
+        return tiles[np.sort(first)][:self.max_tiles]
+    
+    def run(self, detector, frame, detections, candidates=None):
+        """
+        Tile pass over frame (or FrameContext) using the detector's batch API
+        
+        Args:
+            detector: ObjectDetector
+            detections: full-pass Detections of the same frame
+            candidates: xyxy of its low-confidence boxes (None = detector.last_candidates,
+                        i.e. the full pass just ran with detect())
+        Returns: merged Detections in frame coordinates
+        """
+        frame_shape = frame.shape
+        tile_size = self.tile_size or detector.input_size
+        if candidates is None:
+            candidates = detector.last_candidates
+        tiles = self.tiles(frame_shape, tile_size, candidates)
+        if not len(tiles):
+            return detections
+        
+        parts = [detections]
+        for tile, found in zip(tiles.tolist(), detector.detect_tiles(frame, tiles)):
+            parts.append(drop_cut_boxes(found, tile, frame_shape))
+        merged, source = _merge(parts, self.nms_iou)
+        
+        self.tile_only = merged.subset(source > 0)
+        self.carried = 0
+        self.runs += 1
+        self.added += len(self.tile_only)
+        return merged
+    
+    def carry(self, detections):
+        """Full-pass detections plus the last pass's tile-only objects (until max_carry frames)"""
+        if not len(self.tile_only) or self.carried >= self.max_carry:
+            return detections
+        self.carried += 1
+        return merge_detections([detections, self.tile_only], self.nms_iou)
+    
+    def reset(self):
+        self.tile_only = Detections.empty()
+        self.carried = 0
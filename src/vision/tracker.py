@@ -0,0 +1,347 @@
+"""
+Lightweight multi-object tracker (SORT-style IoU association + Kalman motion model)
+"""
+import numpy as np
+
+from vision.detections import Detections
+
+# Constant-velocity model over (cx, cy, w, h): state = position + per-frame velocity
+_STATE_DIM = 8
+_MEASURE_DIM = 4
+_TRANSITION = np.eye(_STATE_DIM, dtype=np.float64)
+_TRANSITION[:4, 4:] = np.eye(4)
+_OBSERVATION = np.eye(_MEASURE_DIM, _STATE_DIM, dtype=np.float64)
+
+# Noise proportional to box height, as in SORT / ByteTrack
+_STD_POSITION = 1.0 / 20
+_STD_VELOCITY = 1.0 / 160
+
+def box_iou(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes -> (N, M)"""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+def _xyxy_to_cxcywh(xyxy):
+    xyxy = np.asarray(xyxy, dtype=np.float64)
+    wh = xyxy[:, 2:] - xyxy[:, :2]
+    return np.concatenate([xyxy[:, :2] + wh / 2, wh], axis=1)
+
+def _cxcywh_to_xyxy(boxes):
+    half = np.maximum(boxes[:, 2:4], 1.0) / 2
+    return np.concatenate([boxes[:, :2] - half, boxes[:, :2] + half], axis=1)
+
+def greedy_match(iou, min_iou):
+    """One-to-one matching by descending IoU. Returns: (rows, cols) index arrays"""
+    rows, cols = [], []
+    if iou.size == 0:
+        return np.array(rows, np.intp), np.array(cols, np.intp)
+    used_rows, used_cols = set(), set()
+    order = np.argsort(-iou, axis=None)
+    for row, col in zip(*np.unravel_index(order, iou.shape)):
+        if iou[row, col] < min_iou:
+            break
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        rows.append(row)
+        cols.append(col)
+    return np.array(rows, np.intp), np.array(cols, np.intp)
+
+class ObjectTracker:
+    """
+    Multi-object tracker that keeps objects alive between detector runs.
+    
+    All tracks share one vectorized Kalman filter (constant velocity over
+    box centre and size). Every frame the tracks are predicted one step;
+    on frames where the detector ran, detections are associated with them
+    by IoU (same class only). Unmatched detections at or above
+    high_confidence start new tracks; tracks unmatched for more than
+    max_misses detector runs are dropped.
+    
+    Outputs are Detections with a 'track_id' column and a 'ttc' column:
+    estimated seconds to contact (NaN when not approaching), derived from
+    the tracks' own box measurements without any extra model - see
+    _measure_approach.
+    """
+    
+    def __init__(self, high_confidence=0.5, match_iou=0.3, min_hits=1, max_misses=3, coast_misses=1,
+                 horizon=0.5, ttc_min_hits=3, max_ttc=10.0, ttc_baseline=0.3, ttc_smoothing=0.5):
+        """
+        Args:
+            high_confidence: detections at or above this start tracks (weaker ones only
+                             keep existing tracks alive, if the detector reports any)
+            match_iou: minimum IoU between a track's predicted box and its detection
+            min_hits: detector matches before a track is reported
+            max_misses: detector runs a track may go unmatched before it is dropped
+            coast_misses: unmatched detector runs during which a track is still reported
+                          (at its predicted position)
+            horizon: horizon height as a fraction of the frame (camera held level: 0.5)
+            ttc_min_hits: detector matches before a track's approach rate is trusted
+            max_ttc: time to contact (s) above which an object is not considered approaching
+            ttc_baseline: minimum seconds between the two box measurements of a growth rate
+            ttc_smoothing: weight of the previous rate in its exponential moving average
+        """
+        self.high_confidence = high_confidence
+        self.match_iou = match_iou
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.coast_misses = coast_misses
+        self.horizon = horizon
+        self.ttc_min_hits = ttc_min_hits
+        self.max_ttc = max_ttc
+        self.ttc_baseline = ttc_baseline
+        self.ttc_smoothing = ttc_smoothing
+        self.names = {}
+        self.next_id = 1
+        self.reset()
+    
+    @classmethod
+    def from_config(cls, config):
+        """Build from the 'tracking' section of config.yaml (None if disabled)"""
+        settings = dict(config.get('tracking') or {})
+        if not settings.pop('enabled', True):
+            return None
+        return cls(**settings)
+    
+    def reset(self):
+        """Forget all tracks"""
+        self.mean = np.zeros((0, _STATE_DIM))
+        self.covariance = np.zeros((0, _STATE_DIM, _STATE_DIM))
+        self.track_ids = np.zeros(0, np.int32)
+        self.class_id = np.zeros(0, np.int32)
+        self.confidence = np.zeros(0, np.float32)
+        self.hits = np.zeros(0, np.int32)
+        self.misses = np.zeros(0, np.int32)
+        self.age = np.zeros(0, np.int32)  # frames since the track started
+        # Approach: log box scale / log ground offset at the reference measurement and their rates
+        self.log_scale = np.zeros(0)
+        self.log_ground = np.zeros(0)
+        self.measured_at = np.zeros(0)
+        self.scale_rate = np.zeros(0)
+        self.ground_rate = np.zeros(0)
+        self.now = None
+    
+    def __len__(self):
+        return len(self.track_ids)
+    
+    def predict(self, frame_shape=None, now=None):
+        """
+        Advance all tracks by one frame without a detector result
+        
+        now: frame timestamp (seconds); without timestamps no TTC is estimated
+        Returns: Detections of the reported tracks at their predicted positions
+        """
+        self.now = now
+        self._predict()
+        return self._output(frame_shape)
+    
+    def update(self, detections, frame_shape=None, now=None):
+        """
+        Advance all tracks by one frame and reconcile them with a detector result
+        
+        now: frame timestamp (seconds); without timestamps no TTC is estimated
+        Returns: Detections of the reported tracks (matched tracks at the filtered box)
+        """
+        self.now = now
+        if detections.names:
+            self.names = detections.names
+        self._predict()
+        
+        det_boxes = detections.xyxy
+        det_conf = detections.confidence
+        det_class = detections.class_id
+        
+        matched_tracks, matched_dets = self._associate(
+            np.arange(len(self)), det_boxes, det_class, np.arange(len(detections)), self.match_iou
+        )
+        
+        self.misses += 1
+        if len(matched_tracks):
+            self._correct(matched_tracks, det_boxes[matched_dets])
+            self.confidence[matched_tracks] = det_conf[matched_dets]
+            self.hits[matched_tracks] += 1
+            self.misses[matched_tracks] = 0
+            self._measure_approach(matched_tracks, det_boxes[matched_dets], frame_shape)
+        
+        # Unmatched confident detections become new tracks
+        new_dets = np.setdiff1d(np.flatnonzero(det_conf >= self.high_confidence), matched_dets)
+        self._drop(self.misses > self.max_misses)
+        if len(new_dets):
+            self._start(det_boxes[new_dets], det_conf[new_dets], det_class[new_dets], frame_shape)
+        
+        return self._output(frame_shape)
+    
+    def _associate(self, tracks, det_boxes, det_class, det_index, min_iou):
+        """IoU matching of the given tracks and detections of the same class"""
+        if not len(tracks) or not len(det_index):
+            return np.zeros(0, np.intp), np.zeros(0, np.intp)
+        iou = box_iou(_cxcywh_to_xyxy(self.mean[tracks, :4]), det_boxes[det_index])
+        iou[self.class_id[tracks][:, None] != det_class[det_index][None, :]] = 0.0
+        rows, cols = greedy_match(iou, min_iou)
+        return tracks[rows], det_index[cols]
+    
+    def _approach_cues(self, boxes, frame_shape):
+        """
+        log box scale and log ground offset of measured xyxy boxes
+        
+        Both are proportional to 1/Z for an object at distance Z:
+          - scale: sqrt(w * h) of the box
+          - ground plane: the bottom edge of an object standing on the ground
+            lies (y_bottom - y_horizon) ~ 1/Z below the horizon
+        so the rate of change of either log is 1/TTC. The ground cue is NaN
+        when the bottom edge is near the horizon or cut off by the frame.
+        """
+        boxes = np.asarray(boxes, np.float64)
+        wh = np.maximum(boxes[:, 2:] - boxes[:, :2], 1.0)
+        log_scale = 0.5 * np.log(wh[:, 0] * wh[:, 1])
+        log_ground = np.full(len(boxes), np.nan)
+        if frame_shape is not None:
+            frame_h = frame_shape[0]
+            below = boxes[:, 3] - self.horizon * frame_h
+            ground = (below > 0.05 * frame_h) & (boxes[:, 3] < 0.98 * frame_h)
+            log_ground[ground] = np.log(below[ground])
+        return log_scale, log_ground
+    
+    def _measure_approach(self, tracks, boxes, frame_shape):
+        """
+        Update the approach rates of matched tracks from their new boxes
+        
+        A rate is measured against the track's reference measurement once at
+        least ttc_baseline seconds have passed (box jitter over a single frame
+        would swamp it), smoothed with an exponential moving average, and the
+        new box becomes the reference.
+        
+        For a constant approach speed the log change over a baseline dt is
+        log(1 + dt / TTC), so reading it as a plain rate gives the TTC in the
+        middle of the baseline (dt / 2 too late). It is inverted exactly
+        instead, and the previous rate is carried forward to now before it
+        is averaged in. Rates are thus inverse TTCs at the last measurement.
+        """
+        if self.now is None:
+            return
+        elapsed = self.now - self.measured_at[tracks]
+        due = ~(elapsed < self.ttc_baseline)  # NaN (no reference yet) counts as due
+        if not due.any():
+            return
+        tracks, boxes, elapsed = tracks[due], boxes[due], elapsed[due]
+        log_scale, log_ground = self._approach_cues(boxes, frame_shape)
+        
+        measured = np.isfinite(elapsed)
+        elapsed = np.where(measured, elapsed, 1.0)
+        for rates, previous, current in ((self.scale_rate, self.log_scale, log_scale),
+                                         (self.ground_rate, self.log_ground, log_ground)):
+            instant = np.where(measured, np.expm1(current - previous[tracks]) / elapsed, np.nan)
+            # 1 / TTC then -> 1 / (TTC then - elapsed); dropped if contact was due meanwhile
+            old = rates[tracks]
+            remaining = 1.0 - old * elapsed
+            old = np.where(remaining > 0, old / np.where(remaining > 0, remaining, 1.0), np.nan)
+            smoothed = np.where(np.isnan(old), instant,
+                                self.ttc_smoothing * old + (1.0 - self.ttc_smoothing) * instant)
+            # A cue that disappeared (e.g. bottom edge left the frame) stops contributing
+            rates[tracks] = np.where(np.isnan(instant), np.nan, smoothed)
+            previous[tracks] = current
+        self.measured_at[tracks] = self.now
+    
+    def _time_to_contact(self, rows):
+        """
+        Seconds until each track reaches the camera plane (NaN if not approaching)
+        
+        The inverse TTC is the scale rate, averaged with the ground-plane rate
+        where that cue applies; the estimate counts down between measurements.
+        """
+        ttc = np.full(len(rows), np.nan, np.float32)
+        if self.now is None or not len(rows):
+            return ttc
+        scale_rate = self.scale_rate[rows]
+        ground_rate = self.ground_rate[rows]
+        rate = np.where(np.isnan(ground_rate), scale_rate, (scale_rate + ground_rate) / 2)
+        approaching = (rate > 1.0 / self.max_ttc) & (self.hits[rows] >= self.ttc_min_hits)
+        if approaching.any():
+            since = self.now - self.measured_at[rows][approaching]
+            ttc[approaching] = np.maximum(1.0 / rate[approaching] - since, 0.1)
+        return ttc
+    
+    def _predict(self):
+        if not len(self):
+            return
+        heights = self.mean[:, 3]
+        std = np.concatenate([
+            np.repeat((_STD_POSITION * heights)[:, None], 4, axis=1),
+            np.repeat((_STD_VELOCITY * heights)[:, None], 4, axis=1),
+        ], axis=1)
+        motion_noise = np.einsum('ni,ij->nij', std ** 2, np.eye(_STATE_DIM))
+        
+        self.mean = self.mean @ _TRANSITION.T
+        self.covariance = _TRANSITION @ self.covariance @ _TRANSITION.T + motion_noise
+        self.mean[:, 2:4] = np.maximum(self.mean[:, 2:4], 1.0)
+        self.age += 1
+    
+    def _correct(self, tracks, boxes):
+        """Kalman update of the given tracks with measured xyxy boxes (batched)"""
+        measurement = _xyxy_to_cxcywh(boxes)
+        mean = self.mean[tracks]
+        covariance = self.covariance[tracks]
+        
+        std = (_STD_POSITION * mean[:, 3])[:, None].repeat(_MEASURE_DIM, axis=1)
+        measurement_noise = np.einsum('ni,ij->nij', std ** 2, np.eye(_MEASURE_DIM))
+        
+        projected_cov = _OBSERVATION @ covariance @ _OBSERVATION.T + measurement_noise
+        cross_cov = covariance @ _OBSERVATION.T  # (n, 8, 4)
+        gain = np.linalg.solve(projected_cov, cross_cov.transpose(0, 2, 1)).transpose(0, 2, 1)
+        
+        innovation = measurement - mean @ _OBSERVATION.T
+        self.mean[tracks] = mean + np.einsum('nij,nj->ni', gain, innovation)
+        self.covariance[tracks] = covariance - gain @ _OBSERVATION @ covariance
+    
+    def _start(self, boxes, confidence, class_id, frame_shape=None):
+        n = len(boxes)
+        mean = np.zeros((n, _STATE_DIM))
+        mean[:, :4] = _xyxy_to_cxcywh(boxes)
+        heights = np.maximum(mean[:, 3], 1.0)
+        std = np.concatenate([
+            np.repeat((2 * _STD_POSITION * heights)[:, None], 4, axis=1),
+            np.repeat((10 * _STD_VELOCITY * heights)[:, None], 4, axis=1),
+        ], axis=1)
+        
+        self.mean = np.concatenate([self.mean, mean])
+        self.covariance = np.concatenate([self.covariance, np.einsum('ni,ij->nij', std ** 2, np.eye(_STATE_DIM))])
+        self.track_ids = np.concatenate([self.track_ids, np.arange(self.next_id, self.next_id + n, dtype=np.int32)])
+        self.class_id = np.concatenate([self.class_id, np.asarray(class_id, np.int32)])
+        self.confidence = np.concatenate([self.confidence, np.asarray(confidence, np.float32)])
+        self.hits = np.concatenate([self.hits, np.ones(n, np.int32)])
+        self.misses = np.concatenate([self.misses, np.zeros(n, np.int32)])
+        self.age = np.concatenate([self.age, np.zeros(n, np.int32)])
+        log_scale, log_ground = self._approach_cues(boxes, frame_shape)
+        self.log_scale = np.concatenate([self.log_scale, log_scale])
+        self.log_ground = np.concatenate([self.log_ground, log_ground])
+        self.measured_at = np.concatenate([self.measured_at, np.full(n, np.nan if self.now is None else self.now)])
+        self.scale_rate = np.concatenate([self.scale_rate, np.full(n, np.nan)])
+        self.ground_rate = np.concatenate([self.ground_rate, np.full(n, np.nan)])
+        self.next_id += n
+    
+    def _drop(self, mask):
+        if not mask.any():
+            return
+        keep = ~mask
+        for name in ('mean', 'covariance', 'track_ids', 'class_id', 'confidence', 'hits', 'misses', 'age',
+                     'log_scale', 'log_ground', 'measured_at', 'scale_rate', 'ground_rate'):
+            setattr(self, name, getattr(self, name)[keep])
+    
+    def _output(self, frame_shape):
+        """Reported tracks as Detections with 'track_id' and 'ttc' columns"""
+        reported = (self.hits >= self.min_hits) & (self.misses <= self.coast_misses)
+        ttc = self._time_to_contact(np.flatnonzero(reported))
+        xyxy = _cxcywh_to_xyxy(self.mean[reported, :4]).astype(np.float32)
+        if frame_shape is not None and len(xyxy):
+            h, w = frame_shape[:2]
+            xyxy[:, 0::2] = np.clip(xyxy[:, 0::2], 0, w)
+            xyxy[:, 1::2] = np.clip(xyxy[:, 1::2], 0, h)
+        return Detections(
+            xyxy, self.confidence[reported], self.class_id[reported], self.names,
+            {'track_id': self.track_ids[reported].copy(), 'ttc': ttc}
+        )
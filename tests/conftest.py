@@ -0,0 +1,7 @@
+"""
+Shared test setup: modules are imported from src/ like the apps do
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,67 @@
+"""
+Detections arrays and their dict-style per-object view
+"""
+import numpy as np
+import pytest
+
+from vision.detections import Detections
+
+NAMES = {0: 'person', 2: 'car'}
+
+def detections():
+    return Detections(np.array([[10, 20, 110, 220], [300, 200, 400, 330]]), [0.9, 0.7], [0, 2], NAMES)
+
+def test_view_behaves_like_the_old_detection_dict():
+    person = detections()[0]
+    assert person['name'] == 'person' and person['class_id'] == 0
+    assert person['confidence'] == pytest.approx(0.9)
+    assert person['bbox'].tolist() == [10, 20, 110, 220]
+    assert person.keys() == ['name', 'confidence', 'bbox', 'class_id']
+    assert 'distance_val' not in person and person.get('distance_val', 'far') == 'far'
+    with pytest.raises(KeyError):
+        person['distance_val']
+    assert isinstance(person['class_id'], int) and isinstance(person['confidence'], float)
+
+def test_columns_show_up_in_the_views():
+    dets = detections()
+    dets.set_column('distance_val', np.array([1.5, 4.0]))
+    dets.set_column('distance_text', np.array(['near', 'far'], dtype=object))
+    assert [det['distance_val'] for det in dets] == [1.5, 4.0]
+    assert dets[1].to_dict()['distance_text'] == 'far'
+    with pytest.raises(ValueError):
+        dets.set_column('distance_val', np.array([1.0]))
+
+def test_setting_a_key_on_one_view_leaves_the_others_missing():
+    dets = detections()
+    dets[1]['track_id'] = 7
+    dets[0]['note'] = 'left'
+    assert dets[1]['track_id'] == 7 and 'track_id' not in dets[0]
+    assert dets[0]['note'] == 'left' and 'note' not in dets[1]
+    dets[1]['distance_val'] = 2.5
+    assert np.isnan(dets.get_column('distance_val')[0])
+    with pytest.raises(KeyError):
+        dets[0]['name'] = 'dog'
+
+def test_writes_through_the_view_change_the_arrays():
+    dets = detections()
+    dets[0]['bbox'] = [0, 0, 5, 5]
+    dets[-1]['confidence'] = 0.5
+    assert dets.xyxy[0].tolist() == [0, 0, 5, 5]
+    assert dets.confidence[1] == pytest.approx(0.5)
+
+def test_subsets_and_copies_carry_columns():
+    dets = detections()
+    dets.set_column('distance_val', np.array([1.5, 4.0]))
+    cars = dets[dets.class_id == 2]
+    assert len(cars) == 1 and cars.labels() == ['car'] and cars[0]['distance_val'] == 4.0
+    copy = dets.copy()
+    copy.xyxy[0, 0] = 99
+    copy.get_column('distance_val')[0] = 9.0
+    assert dets.xyxy[0, 0] == 10 and dets[0]['distance_val'] == 1.5
+    with pytest.raises(IndexError):
+        dets[2]
+
+def test_empty_and_serialization():
+    empty = Detections.empty(NAMES)
+    assert len(empty) == 0 and not empty and empty.labels() == [] and empty.xyxy.shape == (0, 4)
+    assert [d['name'] for d in detections().to_dicts()] == ['person', 'car']
@@ -0,0 +1,55 @@
+"""
+Batched distance estimation against the per-box reference
+"""
+import sys
+import types
+
+import numpy as np
+import pytest
+
+@pytest.fixture
+def depth_module(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'torch', types.ModuleType('torch'))
+    monkeypatch.delitem(sys.modules, 'vision.depth_estimator', raising=False)
+    import vision.depth_estimator as depth_module
+    return depth_module
+
+def test_batched_categories_match_the_scalar_estimate(depth_module):
+    rng = np.random.default_rng(0)
+    # Smooth depth map: nearer (larger) towards the bottom, as on a street
+    rows = np.linspace(0.0, 1.0, 240, dtype=np.float32)[:, None]
+    depth_map = np.clip(rows + 0.05 * rng.standard_normal((240, 320)).astype(np.float32), 0, 1)
+    estimator = depth_module.BaseDepthEstimator()
+    
+    x1 = rng.uniform(0, 280, 200)
+    y1 = rng.uniform(0, 200, 200)
+    boxes = np.stack([x1, y1, x1 + rng.uniform(20, 80, 200), y1 + rng.uniform(20, 80, 200)], axis=1)
+    texts, values, categories = estimator.estimate_distances(depth_map, boxes)
+    
+    expected = [estimator.estimate_distance(depth_map, box) for box in boxes]
+    agree = np.mean([text == reference[0] for text, reference in zip(texts, expected)])
+    assert agree >= 0.9  # a 7x7 sample grid rarely moves the median across a threshold
+    reference = np.array([list(depth_module.DISTANCE_TEXT).index(text) for text, _, _ in expected])
+    assert np.abs(categories - reference).max() <= 1
+    assert values.tolist() == [depth_module.DISTANCE_VALUES[c] for c in categories]
+    assert ((categories >= 0) & (categories < len(depth_module.DISTANCE_TEXT))).all()
+
+def test_boxes_are_scaled_from_frame_to_map_coordinates(depth_module):
+    depth_map = np.zeros((60, 80), np.float32)
+    depth_map[30:, :] = 0.9  # bottom half very near
+    boxes = [[0, 0, 640, 200], [0, 300, 640, 480]]
+    texts, _, categories = depth_module.BaseDepthEstimator.estimate_distances(depth_map, boxes, (480, 640, 3))
+    assert categories.tolist() == [0, 4]
+    assert texts.tolist() == [depth_module.DISTANCE_TEXT[0], depth_module.DISTANCE_TEXT[4]]
+
+def test_boxes_outside_the_map_are_unknown(depth_module):
+    depth_map = np.full((60, 80), 0.5, np.float32)
+    texts, values, categories = depth_module.BaseDepthEstimator.estimate_distances(
+        depth_map, [[700, 10, 800, 50], [10, 10, 10.2, 50], [10, 10, 50, 50]], (480, 640, 3)
+    )
+    assert categories.tolist()[:2] == [-1, -1] and categories[2] >= 0
+    assert texts.tolist()[:2] == [depth_module.UNKNOWN_DISTANCE[0]] * 2
+    assert values.tolist()[:2] == [depth_module.UNKNOWN_DISTANCE[1]] * 2
+    
+    empty = depth_module.BaseDepthEstimator.estimate_distances(depth_map, np.zeros((0, 4)))
+    assert [len(part) for part in empty] == [0, 0, 0]
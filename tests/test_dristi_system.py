@@ -0,0 +1,146 @@
+"""
+DristiSystem wiring with stub models: detection, tracking, hazards, streams and pipelining
+"""
+import time
+
+import numpy as np
+
+from audio.speech_queue import PRIORITY_HAZARD
+from core.dristi_system import DristiSystem
+from core.scheduler import AdaptiveScheduler
+from vision.detections import Detections
+
+NAMES = {0: 'person', 2: 'car'}
+FRAME = np.zeros((480, 640, 3), np.uint8)
+
+class StubDetector:
+    """Sees a person on the left and a car ahead in every frame"""
+    
+    names = NAMES
+    input_size = 320
+    last_candidates = None
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+    
+    def detect(self, frame, annotate=True):
+        time.sleep(self.delay)
+        self.calls += 1
+        return None, Detections(np.array([[10, 20, 110, 220], [300, 200, 400, 330]], np.float32),
+                                np.array([0.9, 0.8], np.float32), np.array([0, 2], np.int32), NAMES)
+
+class StubAnalyzer:
+    """Records which scene cache each call used"""
+    
+    def __init__(self):
+        self.caches = []
+    
+    def new_cache(self):
+        return object()
+    
+    def analyze(self, frame, cache=None):
+        self.caches.append(cache)
+        return {'scene_type': 'a street', 'scene_confidence': 80.0}
+
+class StubVoice:
+    def __init__(self):
+        self.said = []
+        self.keys = []
+    
+    def speak(self, text, priority=None, key=None, **kwargs):
+        self.said.append((text, priority))
+        self.keys.append(key)
+
+def system(**kwargs):
+    settings = {'render': False, 'motion_gate': False, 'scheduler': AdaptiveScheduler(adaptive=False)}
+    settings.update(kwargs)
+    return DristiSystem(StubDetector(), **settings)
+
+def test_sequential_frame_tracks_and_warns():
+    voice = StubVoice()
+    dristi = system(voice_engine=voice)
+    annotated, objects, scene = dristi.process_frame(FRAME)
+    assert annotated is FRAME and scene is None
+    assert objects.labels() == ['person', 'car']
+    assert objects.get_column('track_id').tolist() == [1, 2]
+    assert dristi.hazards.count('vehicles') == 1
+    assert voice.said == [('Car ahead', PRIORITY_HAZARD)]
+    
+    dristi.process_frame(FRAME)
+    assert dristi.detected_objects.get_column('track_id').tolist() == [1, 2]
+    assert len(voice.said) == 1  # the same car is not announced again
+
+def test_tracker_fills_skipped_detection_frames():
+    dristi = system()
+    dristi.detection_interval = 2
+    counts = [len(dristi.process_frame(FRAME)[1]) for _ in range(6)]
+    assert dristi.detector.calls == 3
+    assert counts[1:] == [2] * 5
+
+def test_disabled_tracker_passes_detections_through():
+    dristi = system(tracker=False)
+    _, objects, _ = dristi.process_frame(FRAME)
+    assert dristi.tracker is None
+    assert objects.get_column('track_id') is None and len(objects) == 2
+
+def test_supplied_detections_skip_the_detector():
+    dristi = system()
+    _, detections = StubDetector().detect(FRAME)
+    _, objects, _ = dristi.process_frame(FRAME, detections=detections)
+    assert dristi.detector.calls == 0 and len(objects) == 2
+
+def test_motion_gate_skips_detection_on_a_static_scene():
+    dristi = system(motion_gate=None)
+    for _ in range(5):
+        dristi.process_frame(FRAME)
+    assert dristi.detector.calls == 1
+    assert len(dristi.detected_objects) == 2
+
+def test_new_stream_shares_models_but_not_state():
+    analyzer = StubAnalyzer()
+    first = system(scene_analyzer=analyzer, voice_engine=StubVoice())
+    first.scene_analysis_interval = 1
+    second = first.new_stream()
+    assert second.detector is first.detector and second.analyzer is analyzer and second.voice is first.voice
+    for attribute in ('tracker', 'scheduler', 'hazard_watcher', 'scene_cache'):
+        assert getattr(second, attribute) is not getattr(first, attribute)
+    assert second.scene_analysis_interval == 1
+    
+    first.process_frame(FRAME)
+    second.process_frame(FRAME)
+    assert analyzer.caches == [first.scene_cache, second.scene_cache]
+    assert len(second.tracker) == 2 and second.current_scene['scene_type'] == 'a street'
+    assert first.new_stream(tracker=False).tracker is None
+
+def test_pipelined_results_reach_the_scheduler():
+    dristi = system(pipelined=True)
+    dristi.detector.delay = 0.005
+    try:
+        deadline = time.time() + 2.0
+        while dristi.scheduler.modules['detection'].latency is None and time.time() < deadline:
+            dristi.process_frame(FRAME)
+            time.sleep(0.01)
+        assert dristi.scheduler.modules['detection'].latency >= 0.005
+        assert len(dristi.detected_objects) == 2
+    finally:
+        dristi.stop_pipeline()
+    assert not dristi.processing_threads and not dristi.pipelined
+
+def test_streams_do_not_share_speech_keys():
+    voice = StubVoice()
+    base = system(voice_engine=voice)
+    first, second = base.new_stream(), base.new_stream(stream_id='door')
+    first.process_frame(FRAME)
+    second.process_frame(FRAME)
+    assert voice.keys == [f'hazard_warning:{first.stream_id}', 'hazard_warning:door']
+    assert first.stream_id != base.stream_id
+
+def test_pending_capture_times_stay_bounded():
+    dristi = system()
+    for frame_id in range(1, 101):
+        dristi.pending_capture_times.append((frame_id, float(frame_id)))
+    assert len(dristi.pending_capture_times) == dristi.pending_capture_times.maxlen
+    dristi.consumed_frame_ids['detection'] = 97
+    assert dristi._detection_capture_time({'detection': None}, 0.0) == 97.0
+    assert [frame_id for frame_id, _ in dristi.pending_capture_times] == [98, 99, 100]
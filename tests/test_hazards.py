@@ -0,0 +1,83 @@
+"""
+HazardEngine ranking and the HazardWatcher fast path
+"""
+import numpy as np
+import pytest
+
+from core.hazard_watch import HazardWatcher
+from vision.detections import Detections
+from vision.hazards import HazardEngine
+
+NAMES = {0: 'person', 1: 'bicycle', 2: 'car', 11: 'stop sign', 13: 'bench', 16: 'dog'}
+FRAME_WIDTH = 640
+
+def objects(class_ids, distances=None, distance_categories=None, ttc=None, track_ids=None, centres=None):
+    count = len(class_ids)
+    centres = centres if centres is not None else [320] * count
+    boxes = np.array([[x - 20, 200, x + 20, 260] for x in centres], np.float32).reshape(-1, 4)
+    result = Detections(boxes, np.full(count, 0.9, np.float32), np.asarray(class_ids, np.int32), NAMES)
+    for name, values, dtype in (('distance_val', distances, np.float32),
+                                ('distance_category', distance_categories, np.int8),
+                                ('ttc', ttc, np.float32),
+                                ('track_id', track_ids, np.int32)):
+        if values is not None:
+            result.set_column(name, np.asarray(values, dtype))
+    return result
+
+def test_non_hazards_are_ignored():
+    report = HazardEngine().assess(objects([0, 0]))
+    assert len(report) == 0 and report.top is None
+
+def test_severity_ranks_without_depth():
+    report = HazardEngine().assess(objects([11, 0, 13, 2, 16]))
+    assert report.categories_by_urgency() == ['vehicles', 'animals', 'obstacles', 'traffic']
+    assert report.indices.tolist() == [3, 4, 2, 0]
+    assert report.count('vehicles') == 1
+
+def test_near_hazard_outranks_a_far_severe_one():
+    report = HazardEngine().assess(objects([2, 16], distances=[10.0, 0.5], distance_categories=[3, 0]))
+    assert report.indices.tolist() == [1, 0]
+    assert report.scores[0] == pytest.approx(0.6 / 1.5)
+    assert report.scores[1] == pytest.approx(1.0 / 11.0)
+
+def test_unknown_distance_is_not_treated_as_close():
+    report = HazardEngine().assess(objects([2, 2], distances=[0.5, 3.0], distance_categories=[-1, 2]))
+    # The unplaced car gets the default proximity, not 1 / (1 + 0.5)
+    assert report.scores.tolist() == pytest.approx([0.4, 0.25])
+
+def test_approaching_hazard_moves_up():
+    report = HazardEngine().assess(objects([2, 2], ttc=[np.nan, 2.0]))
+    assert report.indices.tolist() == [1, 0]
+    assert report.approach.tolist() == pytest.approx([1.0, 0.0])
+    capped = HazardEngine(max_approach=2.0).assess(objects([2], ttc=[0.1]))
+    assert capped.approach[0] == pytest.approx(2.0)
+
+def test_lists_of_dicts_are_still_supported():
+    report = HazardEngine().assess([{'name': 'person'}, {'name': 'dog'}, {'name': 'bus'}])
+    assert report.indices.tolist() == [2, 1]
+    assert report.by_category()['animals'] == [{'name': 'dog'}]
+
+def watch(watcher, frame_objects, now):
+    return watcher.check(HazardEngine().assess(frame_objects), FRAME_WIDTH, now)
+
+def test_watcher_announces_new_tracks_once_per_cooldown():
+    watcher = HazardWatcher(cooldowns={'vehicles': 3.0})
+    assert watch(watcher, objects([2], track_ids=[1], centres=[100]), 0.0) == 'Car on your left'
+    assert watch(watcher, objects([2], track_ids=[1], centres=[100]), 1.0) is None
+    assert watch(watcher, objects([2, 2], track_ids=[1, 2]), 2.0) is None  # class cooldown
+    assert watch(watcher, objects([2, 2], track_ids=[1, 2]), 3.5) == 'Car ahead'
+    assert watch(watcher, objects([11], track_ids=[3]), 10.0) is None  # traffic is not announced
+
+def test_watcher_repeats_when_a_track_comes_closer():
+    watcher = HazardWatcher(cooldowns={'vehicles': 1.0}, closer_by=0.5)
+    assert watch(watcher, objects([2], [5.0], [3], track_ids=[1], centres=[600]), 0.0) == 'Car on your right'
+    assert watch(watcher, objects([2], [4.8], [3], track_ids=[1], centres=[600]), 2.0) is None
+    assert watch(watcher, objects([2], [4.2], [2], track_ids=[1], centres=[600]), 4.0) == \
+        'Car approaching on your right'
+
+def test_watcher_ignores_unknown_distances_for_closer():
+    watcher = HazardWatcher(cooldowns={'vehicles': 1.0}, closer_by=0.5)
+    assert watch(watcher, objects([2], [5.0], [3], track_ids=[1]), 0.0) == 'Car ahead'
+    # An unplaced box reports the 0.5 m fallback; it must not read as 4.5 m closer
+    assert watch(watcher, objects([2], [0.5], [-1], track_ids=[1]), 2.0) is None
+    assert watcher.announced[1] == 5.0
@@ -0,0 +1,74 @@
+"""
+MotionGate: per-module change thresholds, staleness and exposure robustness
+"""
+import numpy as np
+
+from core.motion import MotionGate
+
+def scene(seed=0):
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(40, 200, (12, 16, 3), dtype=np.uint8)
+    return np.kron(blocks, np.ones((40, 40, 1), np.uint8))  # 480x640 of flat blocks
+
+def moved(frame, fraction):
+    """frame with a bright patch over about fraction of its area"""
+    frame = frame.copy()
+    frame[:, :int(frame.shape[1] * fraction)] = 255
+    return frame
+
+def run(gate, frame, now):
+    gate.update(frame)
+    due = {name: gate.should_run(name, now) for name in gate.gates}
+    for name, run_now in due.items():
+        if run_now:
+            gate.mark_run(name, now)
+    return due
+
+def test_first_frame_runs_everything_and_a_static_scene_nothing():
+    gate = MotionGate()
+    frame = scene()
+    assert run(gate, frame, 0.0) == {'detection': True, 'depth': True, 'scene': True}
+    assert run(gate, frame, 0.1) == {'detection': False, 'depth': False, 'scene': False}
+    assert gate.frame_change == 0.0
+    assert gate.skipped == {'detection': 1, 'depth': 1, 'scene': 1}
+
+def test_each_module_has_its_own_threshold():
+    gate = MotionGate()
+    frame = scene()
+    run(gate, frame, 0.0)
+    # About 5% of the frame changed: above detection (1%) and depth (2%), below scene (10%)
+    assert run(gate, moved(frame, 0.05), 0.1) == {'detection': True, 'depth': True, 'scene': False}
+    assert 0.02 < gate.change('scene') < 0.10
+
+def test_slow_drift_accumulates_against_the_last_run():
+    gate = MotionGate()
+    frame = scene()
+    run(gate, frame, 0.0)
+    scene_runs = [run(gate, moved(frame, step * 0.02), step * 0.1)['scene'] for step in range(1, 8)]
+    # Each step adds only 2%, but the scene reference stays at frame 0 until 10% is crossed,
+    # and the next step is compared with the frame it then ran on
+    first = scene_runs.index(True)
+    assert first >= 2 and scene_runs[:first] == [False] * first
+    assert scene_runs[first + 1] is False
+
+def test_stale_results_rerun_without_change():
+    gate = MotionGate()
+    frame = scene()
+    run(gate, frame, 0.0)
+    assert run(gate, frame, 1.5) == {'detection': True, 'depth': False, 'scene': False}
+    assert run(gate, frame, 2.5) == {'detection': True, 'depth': True, 'scene': False}
+
+def test_exposure_shift_is_not_motion():
+    gate = MotionGate()
+    frame = scene()
+    run(gate, frame, 0.0)
+    brighter = np.clip(frame.astype(np.int16) + 25, 0, 255).astype(np.uint8)
+    assert run(gate, brighter, 0.1)['detection'] is False
+
+def test_reset_and_resolution_change_force_a_run():
+    gate = MotionGate()
+    frame = scene()
+    run(gate, frame, 0.0)
+    gate.reset()
+    assert all(run(gate, frame, 0.1).values())
+    assert all(run(gate, frame[:240], 0.2).values())
@@ -0,0 +1,67 @@
+"""
+ObjectDetector construction and the torch path, with a stub YOLO model
+"""
+import sys
+import types
+
+import numpy as np
+import pytest
+
+NAMES = {0: 'person', 2: 'car'}
+
+class StubBoxes:
+    def __init__(self, data):
+        self.data = types.SimpleNamespace(cpu=lambda: types.SimpleNamespace(numpy=lambda: data))
+    
+    def __len__(self):
+        return len(self.data.cpu().numpy())
+
+class StubYOLO:
+    """ultralytics.YOLO stand-in: one car in the centre of every (resized) image"""
+    
+    def __init__(self, model_path):
+        self.names = NAMES
+        self.device = None
+        self.calls = []
+    
+    def to(self, device):
+        self.device = device
+        return self
+    
+    def __call__(self, images, conf, imgsz, verbose, device):
+        self.calls.append((len(images), conf, imgsz))
+        results = []
+        for image in images:
+            h, w = image.shape[:2]
+            data = np.array([[w / 4, h / 4, 3 * w / 4, 3 * h / 4, 0.9, 2],
+                             [0, 0, 10, 10, 0.3, 0]], np.float32)
+            results.append(types.SimpleNamespace(boxes=StubBoxes(data[data[:, 4] >= conf])))
+        return results
+
+@pytest.fixture
+def ObjectDetector(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'ultralytics', types.SimpleNamespace(YOLO=StubYOLO))
+    monkeypatch.setitem(sys.modules, 'torch', types.ModuleType('torch'))  # warmup is skipped
+    monkeypatch.delitem(sys.modules, 'vision.object_detector', raising=False)
+    from vision.object_detector import ObjectDetector
+    return ObjectDetector
+
+def test_constructor_takes_names_from_the_model(ObjectDetector):
+    detector = ObjectDetector('stub.pt', confidence=0.5, input_size=320, device='cpu')
+    assert detector.names is NAMES
+    assert detector.last_detections.names is NAMES
+    assert detector.model.device == 'cpu'
+    assert detector.input_size == 320 and detector.confidence == 0.5
+
+def test_constructor_rejects_unknown_backend(ObjectDetector):
+    with pytest.raises(ValueError):
+        ObjectDetector('stub.pt', backend='tensorrt')
+
+def test_detect_maps_boxes_back_and_keeps_candidates(ObjectDetector):
+    detector = ObjectDetector('stub.pt', input_size=320, device='cpu', candidate_confidence=0.2)
+    annotated, objects = detector.detect(np.zeros((480, 640, 3), np.uint8), annotate=False)
+    assert annotated is None
+    assert objects.labels() == ['car']
+    assert objects.xyxy[0].tolist() == pytest.approx([160, 120, 480, 360])
+    assert detector.model.calls[-1][1] == 0.2  # candidates need the lower threshold
+    assert detector.last_candidates.shape == (1, 4)
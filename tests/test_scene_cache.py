@@ -0,0 +1,68 @@
+"""
+Scene-change cache of BaseSceneAnalyzer.analyze, with a stub CLIP
+"""
+import sys
+import types
+
+import numpy as np
+import pytest
+
+@pytest.fixture
+def StubAnalyzer(monkeypatch):
+    for name in ('torch', 'clip', 'PIL'):
+        monkeypatch.setitem(sys.modules, name, types.ModuleType(name))
+    sys.modules['PIL'].Image = types.ModuleType('PIL.Image')
+    monkeypatch.delitem(sys.modules, 'vision.scene_analyzer', raising=False)
+    from vision.scene_analyzer import BaseSceneAnalyzer
+    
+    class StubAnalyzer(BaseSceneAnalyzer):
+        """Every frame has the same embedding, so only the cache decides what reruns"""
+        
+        def encode_frame(self, frame):
+            return np.ones((1, 4), np.float32) / 2.0
+        
+        def classify_batch(self, image_features):
+            return [{'scene_type': 'a street', 'condition': 'a well-lit bright environment'}
+                    for _ in image_features]
+    
+    return StubAnalyzer
+
+def frame(level, width=64, height=48):
+    image = np.full((height, width, 3), level, np.uint8)
+    image[:, :width // 2] //= 2  # some structure for the thumbnail
+    return image
+
+def test_unchanged_scene_skips_clip(StubAnalyzer):
+    analyzer = StubAnalyzer()
+    analyzer.analyze(frame(200))
+    analyzer.analyze(frame(200))
+    analyzer.analyze(frame(210))  # small exposure shift
+    assert analyzer.scene_stats == {'full': 1, 'embedding_hits': 0, 'thumbnail_hits': 2}
+
+def test_lights_off_is_a_scene_change(StubAnalyzer):
+    analyzer = StubAnalyzer()
+    analyzer.analyze(frame(200))
+    analyzer.analyze(frame(40))
+    assert analyzer.scene_stats['full'] == 2
+    analyzer.analyze(frame(40))
+    assert analyzer.scene_stats['thumbnail_hits'] == 1
+
+def test_new_frame_size_and_max_age_force_analysis(StubAnalyzer):
+    analyzer = StubAnalyzer()
+    analyzer.analyze(frame(200))
+    analyzer.analyze(frame(200, width=48, height=48))
+    assert analyzer.scene_stats['full'] == 2
+    
+    uncached = StubAnalyzer(max_scene_age=0)
+    for _ in range(3):
+        uncached.analyze(frame(200))
+    assert uncached.scene_stats['full'] == 3
+
+def test_caches_are_per_camera(StubAnalyzer):
+    analyzer = StubAnalyzer()
+    first, second = analyzer.new_cache(), analyzer.new_cache()
+    analyzer.analyze(frame(200), first)
+    analyzer.analyze(frame(40), second)
+    analyzer.analyze(frame(200), first)
+    assert first.stats['thumbnail_hits'] == 1 and second.stats['full'] == 1
+    assert analyzer.scene_stats['full'] == 0
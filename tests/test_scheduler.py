@@ -0,0 +1,71 @@
+"""
+AdaptiveScheduler: due checks, deferral and rebalancing against the frame budget
+"""
+from core.scheduler import AdaptiveScheduler
+
+LATENCY = {'detection': 0.030, 'depth': 0.050, 'scene': 0.200, 'tiles': 0.040}
+
+def simulate(scheduler, frames, latency=LATENCY, start=1):
+    """Run the scheduler as DristiSystem does, with fixed module run times. Returns {name: runs}"""
+    runs = {name: 0 for name in scheduler.modules}
+    for frame in range(start, start + frames):
+        scheduler.begin_frame()
+        for name in scheduler.modules:
+            if scheduler.should_run(name, frame):
+                scheduler.record(name, latency[name], frame)
+                runs[name] += 1
+        scheduler.end_frame(frame)
+    return runs
+
+def test_modules_start_on_their_interval():
+    scheduler = AdaptiveScheduler(adaptive=False)
+    due = [frame for frame in range(1, 61) if scheduler.should_run('scene', frame)]
+    assert due[0] == 30
+    assert scheduler.should_run('detection', 1) and not scheduler.should_run('depth', 1)
+    assert not scheduler.should_run('unknown', 1)
+
+def test_fixed_intervals_without_adaptation():
+    scheduler = AdaptiveScheduler(adaptive=False)
+    runs = simulate(scheduler, 120)
+    assert runs == {'detection': 120, 'depth': 60, 'scene': 4, 'tiles': 12}
+    assert scheduler.status()['scene']['interval'] == 30
+
+def test_overload_slows_the_least_important_modules_first():
+    scheduler = AdaptiveScheduler(target_fps=15)
+    simulate(scheduler, 300)
+    assert scheduler.load() <= scheduler.frame_budget
+    assert scheduler.interval('detection') == 1
+    assert scheduler.interval('tiles') > 10 and scheduler.interval('scene') > 30
+
+def test_detection_slows_only_when_everything_else_is_at_max():
+    scheduler = AdaptiveScheduler(target_fps=30)
+    simulate(scheduler, 600, {**LATENCY, 'detection': 0.040})
+    assert scheduler.load() <= scheduler.frame_budget
+    assert scheduler.interval('detection') > 1
+    for name in ('depth', 'scene', 'tiles'):
+        assert scheduler.interval(name) == scheduler.modules[name].max_interval
+
+def test_headroom_speeds_modules_back_up():
+    scheduler = AdaptiveScheduler(target_fps=15)
+    simulate(scheduler, 300)
+    assert scheduler.interval('scene') > 30
+    simulate(scheduler, 600, {name: 0.002 for name in LATENCY}, start=301)
+    for name, module in scheduler.modules.items():
+        assert module.interval == module.min_interval, name
+
+def test_over_budget_frames_defer_but_do_not_starve_a_module():
+    scheduler = AdaptiveScheduler(target_fps=15, adjust_every=10 ** 6)
+    scheduler.record('depth', 0.050, 0)
+    scheduler.begin_frame()
+    scheduler.record('detection', 0.030, 2)
+    assert not scheduler.should_run('depth', 2)  # 30 + 50 ms > 53 ms budget
+    assert scheduler.should_run('detection', 3)  # the top priority is never deferred
+    scheduler.begin_frame()
+    scheduler.record('detection', 0.030, 4)
+    assert scheduler.should_run('depth', 4)  # two intervals overdue
+
+def test_pinned_interval_is_not_adapted():
+    scheduler = AdaptiveScheduler(target_fps=15)
+    scheduler.set_interval('scene', 45)
+    simulate(scheduler, 300)
+    assert scheduler.interval('scene') == 45
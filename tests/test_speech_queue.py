@@ -0,0 +1,133 @@
+"""
+SpeechQueue ordering/coalescing/expiry and VoiceEngine preemption
+"""
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from audio.speech_queue import (
+    PRIORITY_COMMAND, PRIORITY_HAZARD, PRIORITY_NARRATION, SpeechQueue, SpeechRequest
+)
+
+def drain(queue):
+    texts = []
+    while True:
+        request = queue.get(timeout=0)
+        if request is None:
+            return texts
+        texts.append(request.text)
+
+def test_most_urgent_first_then_fifo():
+    queue = SpeechQueue()
+    queue.put(SpeechRequest('narration', PRIORITY_NARRATION))
+    queue.put(SpeechRequest('command 1', PRIORITY_COMMAND))
+    queue.put(SpeechRequest('hazard', PRIORITY_HAZARD))
+    queue.put(SpeechRequest('command 2', PRIORITY_COMMAND))
+    assert drain(queue) == ['hazard', 'command 1', 'command 2', 'narration']
+
+def test_same_key_replaces_queued_request():
+    queue = SpeechQueue()
+    old = SpeechRequest('car ahead', PRIORITY_HAZARD, key='car')
+    queue.put(old)
+    queue.put(SpeechRequest('person', PRIORITY_COMMAND))
+    queue.put(SpeechRequest('car approaching', PRIORITY_HAZARD, key='car'))
+    assert len(queue) == 2
+    assert old.cancelled and old.done.is_set()
+    assert queue.dropped == 1
+    assert drain(queue) == ['car approaching', 'person']
+
+def test_expired_requests_are_dropped():
+    queue = SpeechQueue()
+    stale = SpeechRequest('old scene', PRIORITY_NARRATION, max_age=0.01)
+    queue.put(stale)
+    queue.put(SpeechRequest('fresh', PRIORITY_NARRATION))
+    time.sleep(0.02)
+    assert drain(queue) == ['fresh']
+    assert stale.done.is_set() and queue.dropped == 1
+
+def test_get_times_out_and_close_releases_waiters():
+    queue = SpeechQueue()
+    assert queue.get(timeout=0.01) is None
+    
+    pending = SpeechRequest('never spoken')
+    queue.put(pending)
+    queue.close()
+    assert pending.done.is_set()
+    assert queue.get(timeout=1.0) is None
+    late = SpeechRequest('after close')
+    queue.put(late)
+    assert late.done.is_set() and len(queue) == 0
+
+class FakeEngine:
+    """pyttsx3 stand-in that 'speaks' word by word and honours stop()"""
+    
+    def __init__(self):
+        self.callbacks = {}
+        self.pending = []
+        self.spoken = []
+        self.stopped = False
+        self.first_word = threading.Event()
+        self.resume = threading.Event()
+    
+    def setProperty(self, name, value):
+        pass
+    
+    def getProperty(self, name):
+        return []
+    
+    def connect(self, topic, callback):
+        self.callbacks[topic] = callback
+    
+    def say(self, text):
+        self.pending.append(text)
+    
+    def stop(self):
+        self.stopped = True
+    
+    def runAndWait(self):
+        text, self.pending = ' '.join(self.pending), []
+        self.stopped = False
+        self.callbacks['started-utterance']('utterance')
+        words = []
+        for position, word in enumerate(text.split()):
+            self.callbacks['started-word']('utterance', position, len(word))
+            if self.stopped:
+                break
+            words.append(word)
+            if not self.first_word.is_set():
+                self.first_word.set()
+                self.resume.wait(1.0)
+        self.spoken.append(' '.join(words))
+
+@pytest.fixture
+def voice(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setitem(sys.modules, 'pyttsx3', types.SimpleNamespace(init=lambda: engine))
+    monkeypatch.delitem(sys.modules, 'audio.voice_engine', raising=False)
+    from audio.voice_engine import VoiceEngine
+    voice = VoiceEngine()
+    yield voice, engine
+    voice.shutdown()
+
+def test_hazard_interrupts_narration(voice):
+    voice, engine = voice
+    voice.speak('you are in a quiet park with two benches', priority=PRIORITY_NARRATION)
+    assert engine.first_word.wait(1.0)
+    
+    hazard = voice.speak('car ahead', priority=PRIORITY_HAZARD)
+    engine.resume.set()
+    assert hazard.done.wait(1.0)
+    assert engine.spoken == ['you', 'car ahead']
+
+def test_equal_priority_waits_its_turn(voice):
+    voice, engine = voice
+    voice.speak('two people ahead', priority=PRIORITY_COMMAND)
+    assert engine.first_word.wait(1.0)
+    
+    second = voice.speak('one chair', priority=PRIORITY_COMMAND)
+    engine.resume.set()
+    assert second.done.wait(1.0)
+    assert engine.spoken == ['two people ahead', 'one chair']
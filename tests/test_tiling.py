@@ -0,0 +1,85 @@
+"""
+Tile pass: tile layout, cut-box removal and cross-tile NMS
+"""
+import numpy as np
+
+from vision.detections import Detections
+from vision.tiling import TilePass, corridor_tiles, drop_cut_boxes, merge_detections, roi_tiles
+
+NAMES = {0: 'person', 64: 'mouse'}
+FRAME_SHAPE = (720, 1280, 3)
+
+def detections(boxes, class_ids, confidence):
+    return Detections(np.asarray(boxes, np.float32).reshape(-1, 4), np.asarray(confidence, np.float32),
+                      np.asarray(class_ids, np.int32), NAMES)
+
+def test_corridor_tiles_cover_the_corridor_inside_the_frame():
+    tiles = corridor_tiles(FRAME_SHAPE, (0.2, 0.3, 0.8, 1.0), tile_size=320, overlap=0.2)
+    assert (tiles[:, 2] - tiles[:, 0] == 320).all() and (tiles[:, 3] - tiles[:, 1] == 320).all()
+    assert tiles[:, 0].min() == 256 and tiles[:, 2].max() == 1024
+    assert tiles[:, 1].min() == 216 and tiles[:, 3].max() == 720
+    xs = np.unique(tiles[:, 0])
+    assert (np.diff(xs) <= 320 * 0.8).all()
+
+def test_roi_tiles_stay_inside_the_frame():
+    tiles = roi_tiles([[0, 0, 10, 10], [600, 340, 680, 380]], FRAME_SHAPE, 320)
+    assert tiles.tolist() == [[0, 0, 320, 320], [480, 200, 800, 520]]
+
+def test_boxes_cut_by_inner_tile_edges_are_dropped():
+    found = detections([[330, 10, 360, 40], [500, 100, 640, 200], [330, 280, 360, 320]], [64, 0, 64],
+                       [0.9, 0.9, 0.9])
+    kept = drop_cut_boxes(found, (320, 0, 640, 320), FRAME_SHAPE)
+    # The box on the top frame edge stays; right and bottom tile edges are inside the frame
+    assert kept.xyxy.tolist() == [[330, 10, 360, 40]]
+
+def test_merge_suppresses_duplicates_across_passes_per_class():
+    full = detections([[100, 100, 200, 300]], [0], [0.6])
+    tile_a = detections([[102, 98, 201, 302], [400, 400, 420, 415]], [0, 64], [0.8, 0.5])
+    tile_b = detections([[401, 401, 421, 416], [100, 100, 200, 300]], [64, 64], [0.7, 0.4])
+    merged = merge_detections([full, tile_a, tile_b], iou=0.5)
+    # One person (the more confident tile copy), one mouse, and the mouse-class box
+    # on top of the person survives because NMS is class-aware
+    assert merged.confidence.tolist() == np.float32([0.8, 0.7, 0.4]).tolist()
+    assert merged.class_id.tolist() == [0, 64, 64]
+    assert merged.names is NAMES
+
+def test_merge_of_nothing_is_empty():
+    merged = merge_detections([detections(np.zeros((0, 4)), [], [])] * 2)
+    assert len(merged) == 0
+
+class TileDetector:
+    """Detector stand-in that sees one small mouse, but only in tiles containing it whole"""
+    
+    input_size = 320
+    last_candidates = None
+    
+    def __init__(self, mouse):
+        self.mouse = np.asarray(mouse, np.float32)
+        self.tiles = None
+    
+    def detect_tiles(self, frame, tiles):
+        """Per-tile Detections in frame coordinates, like ObjectDetector.detect_tiles"""
+        self.tiles = np.asarray(tiles)
+        results = []
+        for x1, y1, x2, y2 in self.tiles.tolist():
+            mx1, my1, mx2, my2 = self.mouse.tolist()
+            if x1 <= mx1 and y1 <= my1 and mx2 <= x2 and my2 <= y2:
+                results.append(detections([self.mouse], [64], [0.7]))
+            else:
+                results.append(detections(np.zeros((0, 4)), [], []))
+        return results
+
+def test_tile_pass_adds_and_carries_tile_only_objects():
+    frame = np.zeros(FRAME_SHAPE, np.uint8)
+    detector = TileDetector([620, 560, 640, 575])
+    tile_pass = TilePass(max_tiles=8, max_carry=2)
+    full = detections([[100, 100, 200, 300]], [0], [0.9])
+    
+    merged = tile_pass.run(detector, frame, full)
+    assert merged.class_id.tolist() == [0, 64]
+    assert len(merged) == 2 and tile_pass.added == 1
+    assert len(detector.tiles) <= 8
+    
+    assert len(tile_pass.carry(full)) == 2
+    assert len(tile_pass.carry(full)) == 2
+    assert len(tile_pass.carry(full)) == 1  # max_carry reached
@@ -0,0 +1,110 @@
+"""
+ObjectTracker: IoU association across detector runs and time to contact
+"""
+import numpy as np
+import pytest
+
+from vision.detections import Detections
+from vision.tracker import ObjectTracker, box_iou, greedy_match
+
+NAMES = {0: 'person', 2: 'car'}
+FRAME_SHAPE = (480, 640, 3)
+
+def detections(boxes, class_ids, confidence=0.9):
+    boxes = np.asarray(boxes, np.float32).reshape(-1, 4)
+    return Detections(boxes, np.full(len(boxes), confidence, np.float32), np.asarray(class_ids, np.int32), NAMES)
+
+def test_box_iou():
+    a = np.array([[0, 0, 10, 10]], np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], np.float32)
+    assert box_iou(a, b) == pytest.approx(np.array([[1.0, 50 / 150, 0.0]]))
+
+def test_greedy_match_is_one_to_one_by_descending_iou():
+    iou = np.array([[0.9, 0.8], [0.85, 0.1]])
+    rows, cols = greedy_match(iou, 0.3)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+    rows, cols = greedy_match(iou, 0.05)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0), (1, 1)]
+
+def test_ids_persist_while_boxes_move():
+    tracker = ObjectTracker()
+    first = tracker.update(detections([[100, 100, 200, 200], [300, 100, 400, 300]], [2, 0]), FRAME_SHAPE)
+    ids = dict(zip(first.class_id.tolist(), first.get_column('track_id').tolist()))
+    for step in range(1, 6):
+        out = tracker.update(detections([[100 + 5 * step, 100, 200 + 5 * step, 200],
+                                         [300 - 5 * step, 100, 400 - 5 * step, 300]], [2, 0]), FRAME_SHAPE)
+        assert dict(zip(out.class_id.tolist(), out.get_column('track_id').tolist())) == ids
+
+def test_classes_are_not_associated_with_each_other():
+    tracker = ObjectTracker()
+    car_id = tracker.update(detections([[100, 100, 200, 200]], [2]), FRAME_SHAPE).get_column('track_id')[0]
+    out = tracker.update(detections([[100, 100, 200, 200]], [0]), FRAME_SHAPE)
+    person = out.class_id.tolist().index(0)
+    assert out.get_column('track_id')[person] != car_id
+    assert len(tracker) == 2  # the car track coasts alongside the new person track
+
+def test_predicted_tracks_bridge_skipped_frames():
+    tracker = ObjectTracker(coast_misses=1)
+    for step in range(4):
+        tracker.update(detections([[100 + 10 * step, 100, 200 + 10 * step, 200]], [2]), FRAME_SHAPE)
+    predicted = tracker.predict(FRAME_SHAPE)
+    assert len(predicted) == 1
+    assert predicted.xyxy[0, 0] > 130  # keeps moving right between detector runs
+
+def test_weak_detections_keep_tracks_but_do_not_start_them():
+    tracker = ObjectTracker(high_confidence=0.5)
+    assert len(tracker.update(detections([[0, 0, 50, 50]], [2], confidence=0.3), FRAME_SHAPE)) == 0
+    tracker.update(detections([[100, 100, 200, 200]], [2]), FRAME_SHAPE)
+    for _ in range(5):
+        out = tracker.update(detections([[100, 100, 200, 200]], [2], confidence=0.3), FRAME_SHAPE)
+    assert len(out) == 1
+
+def test_unmatched_tracks_are_dropped_after_max_misses():
+    tracker = ObjectTracker(max_misses=2, coast_misses=1)
+    tracker.update(detections([[100, 100, 200, 200]], [2]), FRAME_SHAPE)
+    empty = detections(np.zeros((0, 4)), [])
+    assert len(tracker.update(empty, FRAME_SHAPE)) == 1  # coasting
+    assert len(tracker.update(empty, FRAME_SHAPE)) == 0  # no longer reported
+    tracker.update(empty, FRAME_SHAPE)
+    assert len(tracker) == 0
+
+def approach(speed, start_distance=20.0, fps=15, detect_every=3, duration=3.0):
+    """Car of 1.5 m approaching a level camera: (time, true ttc, estimated ttc) per detector frame"""
+    tracker = ObjectTracker()
+    focal, horizon = 500.0, 240.0
+    samples = []
+    for frame in range(int(duration * fps)):
+        t = frame / fps
+        distance = start_distance - speed * t
+        height = focal * 1.5 / distance
+        bottom = horizon + focal * 1.5 / distance
+        box = [[320 - height * 0.8, bottom - height, 320 + height * 0.8, bottom]]
+        if frame % detect_every == 0:
+            out = tracker.update(detections(box, [2]), FRAME_SHAPE, t)
+        else:
+            out = tracker.predict(FRAME_SHAPE, t)
+        if len(out):
+            samples.append((t, distance / speed, float(out.get_column('ttc')[0])))
+    return samples
+
+def test_ttc_matches_a_steady_approach():
+    samples = approach(speed=5.0)
+    estimated = [(true, ttc) for _, true, ttc in samples if np.isfinite(ttc)]
+    assert len(estimated) > 10
+    for true, ttc in estimated:
+        assert ttc == pytest.approx(true, abs=0.05)
+
+def test_ttc_needs_hits_and_timestamps():
+    tracker = ObjectTracker(ttc_min_hits=3)
+    out = tracker.update(detections([[300, 200, 340, 260]], [2]), FRAME_SHAPE, 0.0)
+    assert np.isnan(out.get_column('ttc')[0])
+    no_time = ObjectTracker()
+    for step in range(5):
+        out = no_time.update(detections([[300 - step, 200 - step, 340 + step, 260 + step]], [2]), FRAME_SHAPE)
+    assert np.isnan(out.get_column('ttc')[0])
+
+def test_static_object_is_not_approaching():
+    tracker = ObjectTracker()
+    for frame in range(30):
+        out = tracker.update(detections([[300, 200, 340, 300]], [2]), FRAME_SHAPE, frame / 15)
+    assert np.isnan(out.get_column('ttc')[0])